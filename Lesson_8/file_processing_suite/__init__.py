@@ -7,13 +7,48 @@ A collection of modules for various file and directory operations,
 including directory scanning, path parsing, and batch file renaming.
 """
 
-from .directory_scanner import DirectoryScanner, DirectoryEntry
+from .directory_entry import DirectoryEntry
+from .directory_scanner import DirectoryScanner, ScanSnapshot
+from .columnar_results import ColumnarScanResult
+from .binary_snapshot import BinarySnapshotReader, BinarySnapshotWriter
+from .scan_exporter import ScanExporter
+from .scan_diff import ScanDiffer, ScanChange
+from .scan_index import ScanIndex
+from .duplicate_finder import DuplicateFinder, DuplicateGroup
+from .scan_metrics import ScanMetrics, ScanProgress
+from .scan_filter import ScanFilter
+from .scan_checkpoint import ScanCheckpoint
+from .size_estimator import DirectorySizeEstimator, SizeEstimate
+from .async_scanner import AsyncDirectoryScanner
 from .path_parser import FilePathParser
 from .file_renamer import BatchFileRenamer
+from .file_mover import FileMover
+from .rename_journal import RenameJournal
+from .rename_template import RenameTemplate
 
 __all__ = [
     "DirectoryScanner",
+    "AsyncDirectoryScanner",
     "DirectoryEntry", 
+    "ScanSnapshot",
+    "ColumnarScanResult",
+    "BinarySnapshotReader",
+    "BinarySnapshotWriter",
+    "ScanExporter",
+    "ScanDiffer",
+    "ScanChange",
+    "ScanIndex",
+    "DuplicateFinder",
+    "DuplicateGroup",
+    "ScanMetrics",
+    "ScanProgress",
+    "ScanFilter",
+    "ScanCheckpoint",
+    "DirectorySizeEstimator",
+    "SizeEstimate",
     "FilePathParser",
-    "BatchFileRenamer"
+    "BatchFileRenamer",
+    "FileMover",
+    "RenameJournal",
+    "RenameTemplate"
 ] 
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+asyncio API for DirectoryScanner.
+
+The blocking traversal (DirectoryScanner.iter_scan) is advanced in batches on a thread
+pool: every `await` hands one batch of filesystem work to the executor, so the event
+loop is never blocked and no executor thread is held while the consumer processes a
+batch. The executor bounds the filesystem work of all concurrent scans; scans beyond
+its size simply wait for a free thread.
+
+Cancelling the consuming task (or closing the iterator early) stops the scan: the
+traversal is closed as soon as the batch in flight, if any, is finished.
+"""
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterator, Generator, Iterator, List, Optional
+
+from .directory_entry import DirectoryEntry
+from .directory_scanner import DirectoryScanner
+from .scan_filter import ScanFilter
+from .scan_metrics import ScanMetrics
+
+_DEFAULT_MAX_THREADS = 8
+_default_executor: Optional[ThreadPoolExecutor] = None
+_default_executor_lock = threading.Lock()
+
+
+def _get_default_executor() -> ThreadPoolExecutor:
+    """Returns the executor shared by all AsyncDirectoryScanners created without one."""
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(max_workers=_DEFAULT_MAX_THREADS, thread_name_prefix="async-scan")
+        return _default_executor
+
+
+class AsyncDirectoryScanner:
+    """Scans a directory from asyncio code without blocking the event loop."""
+
+    def __init__(self, root_dir: str, workers: int = 1, snapshot_path: Optional[str] = None,
+                 metrics: Optional[ScanMetrics] = None, scan_filter: Optional[ScanFilter] = None,
+                 executor: Optional[Executor] = None, batch_size: int = 512):
+        """
+        Args:
+            root_dir, workers, snapshot_path, metrics, scan_filter: As for DirectoryScanner.
+                Progress callbacks of `metrics` run on executor threads.
+            executor: The executor running the filesystem work. Defaults to a thread pool of
+                      8 threads shared by all scanners created without an executor.
+            batch_size: Entries listed per executor call; smaller batches make cancellation
+                        more responsive, larger ones reduce the per-batch overhead.
+
+        Raises:
+            ValueError: As for DirectoryScanner, or if batch_size is not positive.
+        """
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("batch_size must be a positive integer.")
+        self._scanner = DirectoryScanner(root_dir, workers=workers, snapshot_path=snapshot_path, metrics=metrics,
+                                         scan_filter=scan_filter)
+        self._executor = executor
+        self._batch_size = batch_size
+
+    @property
+    def scanner(self) -> DirectoryScanner:
+        """The underlying DirectoryScanner."""
+        return self._scanner
+
+    async def iter_scan(self) -> AsyncIterator[DirectoryEntry]:
+        """
+        Scans the root directory, yielding entries as they are discovered, in the
+        bottom-up order of DirectoryScanner.iter_scan. The scan snapshot, if enabled,
+        is written once the iterator is exhausted.
+        """
+        executor = self._executor if self._executor is not None else _get_default_executor()
+        entries = self._scanner.iter_scan()
+        in_flight: Optional["Future[List[DirectoryEntry]]"] = None
+        finished = False
+        try:
+            while True:
+                in_flight = executor.submit(self._next_batch, entries, self._batch_size)
+                batch = await asyncio.wrap_future(in_flight)
+                in_flight = None
+                if not batch:
+                    finished = True
+                    return
+                for entry in batch:
+                    yield entry
+        finally:
+            if not finished:
+                self._close_traversal(entries, in_flight, executor)
+
+    async def scan_directory(self) -> List[DirectoryEntry]:
+        """
+        Scans the root directory and returns all entries sorted like
+        DirectoryScanner.scan_directory (the root first, then by depth and path).
+        """
+        collected = [entry async for entry in self.iter_scan()]
+        executor = self._executor if self._executor is not None else _get_default_executor()
+        await asyncio.wrap_future(executor.submit(DirectoryScanner.sort_entries, collected))
+        return collected
+
+    @staticmethod
+    def _next_batch(entries: Iterator[DirectoryEntry], batch_size: int) -> List[DirectoryEntry]:
+        return list(islice(entries, batch_size))
+
+    @staticmethod
+    def _close_traversal(entries: Generator[DirectoryEntry, None, None], in_flight: Optional[Future],
+                         executor: Executor) -> None:
+        """
+        Closes an unfinished traversal without blocking the event loop. A generator cannot be
+        closed while it runs, so a batch in flight is allowed to finish first.
+        """
+        if in_flight is not None and not in_flight.cancel() and not in_flight.done():
+            # Runs on the executor thread that finishes the batch
+            in_flight.add_done_callback(lambda _: entries.close())
+        else:
+            executor.submit(entries.close)
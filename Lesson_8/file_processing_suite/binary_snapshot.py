@@ -0,0 +1,333 @@
+"""
+Memory-mapped binary snapshot format for DirectoryScanner results.
+
+Unlike a pickle, a snapshot does not have to be deserialized before use: the reader
+maps the file into memory and only touches the records needed to answer a query.
+
+File layout (all integers little-endian):
+
+    Header (64 bytes)
+        magic                 8s   b"FPSSNAP\\0"
+        version               u32  currently 1
+        record_size           u32  size of one record in bytes (36)
+        record_count          u64  number of records
+        string_table_offset   u64  file offset of the string table
+        string_table_size     u64  size of the string table in bytes
+        records_offset        u64  file offset of the first record (8-byte aligned)
+        root_parent_offset    u64  string table offset of the root's parent_directory
+        root_parent_length    u32  its length in bytes
+        reserved              u32
+
+    Records (record_count x 36 bytes, starting right after the header), one per entry
+        size_bytes            i64
+        name_offset           u64  offset of the name in the string table
+        name_length           u32
+        parent                u32  record number of the parent directory, 0xFFFFFFFF for the root
+        first_child           u32  record number of the first child (directories only)
+        child_count           u32  number of children (directories only)
+        flags                 u32  bit 0 set for directories
+
+    String table (after the records)
+        UTF-8 (surrogateescape) encoded names, each distinct name stored once, no separators.
+
+Records are stored breadth-first starting with the root (record 0), so the children of a
+directory occupy the contiguous range first_child .. first_child + child_count - 1 and are
+sorted by their encoded name. The fixed record width makes the record array an offset
+index: record n lives at records_offset + n * record_size. A path lookup is therefore one
+binary search over the children of each path component.
+"""
+import mmap
+import os
+import struct
+from array import array
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .columnar_results import ColumnarScanResult
+from .directory_entry import DirectoryEntry
+
+_MAGIC = b"FPSSNAP\0"
+_VERSION = 1
+_HEADER = struct.Struct("<8sIIQQQQQII")
+_RECORD = struct.Struct("<qQIIIII")
+_NO_PARENT = 0xFFFFFFFF
+_FLAG_DIRECTORY = 1
+
+
+def _encode_name(name: str) -> bytes:
+    return name.encode("utf-8", "surrogateescape")
+
+
+def _decode_name(data: bytes) -> str:
+    return data.decode("utf-8", "surrogateescape")
+
+
+class BinarySnapshotWriter:
+    """Writes scan results in the binary snapshot format."""
+
+    _WRITE_CHUNK_BYTES = 1 << 20
+
+    def __init__(self):
+        pass
+
+    def write(self, entries: Iterable[DirectoryEntry], output_filepath: str) -> int:
+        """
+        Writes entries (a list, a ColumnarScanResult or any iterable of DirectoryEntry dicts,
+        in any order) to a snapshot file. Returns the number of records written.
+
+        Raises:
+            ValueError: If the entries have no root directory or more records than the format allows.
+        """
+        if isinstance(entries, ColumnarScanResult):
+            results = entries
+        else:
+            results = ColumnarScanResult.from_entries(entries)
+        if len(results) >= _NO_PARENT:
+            raise ValueError("Too many entries for the binary snapshot format.")
+
+        root_row = -1
+        children: Dict[int, List[int]] = {}
+        for row in range(len(results)):
+            parent_row = results.parent_index(row)
+            if parent_row == -1:
+                root_row = row
+            else:
+                children.setdefault(parent_row, []).append(row)
+        if root_row == -1:
+            raise ValueError("Scan results have no root directory entry.")
+
+        string_table = bytearray()
+        string_offsets: Dict[str, int] = {}
+
+        def intern(name: str) -> int:
+            offset = string_offsets.get(name)
+            if offset is None:
+                offset = len(string_table)
+                string_table.extend(_encode_name(name))
+                string_offsets[name] = offset
+            return offset
+
+        # Assign record numbers breadth-first so that siblings are contiguous
+        order = array('q', [root_row])
+        first_child: Dict[int, int] = {}
+        child_count: Dict[int, int] = {}
+        position = 0
+        while position < len(order):
+            row = order[position]
+            position += 1
+            row_children = children.pop(row, None)
+            if row_children:
+                row_children.sort(key=lambda child: _encode_name(results.name(child)))
+                first_child[row] = len(order)
+                child_count[row] = len(row_children)
+                order.extend(row_children)
+
+        record_of_row = array('q', bytes(8 * len(results)))
+        for record, row in enumerate(order):
+            record_of_row[row] = record
+
+        root_parent_offset = intern(results.root_parent_name)
+        records = bytearray()
+        os.makedirs(os.path.dirname(output_filepath) or ".", exist_ok=True)
+        with open(output_filepath, 'wb') as f:
+            # Records are written in chunks while their names are interned; the string table
+            # is complete only afterwards, so it follows the records and the header comes last
+            records_offset = _HEADER.size
+            f.seek(records_offset)
+            for record, row in enumerate(order):
+                name = results.name(row)
+                parent_row = results.parent_index(row)
+                records += _RECORD.pack(
+                    results.size_bytes(row),
+                    intern(name),
+                    len(_encode_name(name)),
+                    _NO_PARENT if parent_row == -1 else record_of_row[parent_row],
+                    first_child.get(row, 0),
+                    child_count.get(row, 0),
+                    _FLAG_DIRECTORY if results.is_directory(row) else 0,
+                )
+                if len(records) >= self._WRITE_CHUNK_BYTES:
+                    f.write(records)
+                    records.clear()
+            f.write(records)
+
+            string_table_offset = records_offset + _RECORD.size * len(order)
+            f.write(string_table)
+            f.seek(0)
+            f.write(_HEADER.pack(
+                _MAGIC, _VERSION, _RECORD.size, len(order),
+                string_table_offset, len(string_table), records_offset,
+                root_parent_offset, len(_encode_name(results.root_parent_name)), 0
+            ))
+        return len(order)
+
+
+class BinarySnapshotReader:
+    """
+    Reads a binary snapshot through mmap. Opening is O(1); lookups only touch the
+    records along the path and the children of the listed directory.
+    Use as a context manager or call close() when done.
+    """
+
+    def __init__(self, filepath: str):
+        """
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file is not a binary snapshot of a supported version.
+        """
+        self._file = open(filepath, 'rb')
+        try:
+            file_size = os.fstat(self._file.fileno()).st_size
+            if file_size < _HEADER.size:
+                raise ValueError(f"'{filepath}' is not a binary scan snapshot.")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+
+        (magic, version, record_size, self._record_count, self._strings_offset, strings_size,
+         self._records_offset, root_parent_offset, root_parent_length, _) = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION or record_size != _RECORD.size:
+            self.close()
+            raise ValueError(f"'{filepath}' is not a binary scan snapshot of version {_VERSION}.")
+        if self._records_offset + record_size * self._record_count > file_size or \
+                self._strings_offset + strings_size > file_size:
+            self.close()
+            raise ValueError(f"'{filepath}' is truncated.")
+        self.root_parent_name = self._string(root_parent_offset, root_parent_length)
+
+    def close(self) -> None:
+        """Unmaps and closes the snapshot file."""
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "BinarySnapshotReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._record_count
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_offset + offset
+        return _decode_name(self._map[start:start + length])
+
+    def _record(self, record: int) -> tuple:
+        return _RECORD.unpack_from(self._map, self._records_offset + record * _RECORD.size)
+
+    def _name_bytes(self, record: int) -> bytes:
+        _, name_offset, name_length, _, _, _, _ = self._record(record)
+        start = self._strings_offset + name_offset
+        return self._map[start:start + name_length]
+
+    def _entry(self, record: int, path: str, parent_directory: str) -> DirectoryEntry:
+        size_bytes, name_offset, name_length, _, _, _, flags = self._record(record)
+        return {
+            "name": self._string(name_offset, name_length),
+            "path": path,
+            "parent_directory": parent_directory,
+            "type": "directory" if flags & _FLAG_DIRECTORY else "file",
+            "size_bytes": size_bytes
+        }
+
+    def _find_record(self, path: str) -> Optional[int]:
+        """Returns the record number of a relative path, or None if it is not in the snapshot."""
+        if self._record_count == 0:
+            return None
+        record = 0
+        if path == ".":
+            return record
+        for component in path.split("/"):
+            _, _, _, _, first_child, child_count, flags = self._record(record)
+            if not flags & _FLAG_DIRECTORY:
+                return None
+            wanted = _encode_name(component)
+            low, high = first_child, first_child + child_count
+            while low < high:
+                middle = (low + high) // 2
+                if self._name_bytes(middle) < wanted:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low == first_child + child_count or self._name_bytes(low) != wanted:
+                return None
+            record = low
+        return record
+
+    def lookup(self, path: str) -> Optional[DirectoryEntry]:
+        """Returns the entry for a relative path ("." for the root), or None if it is not in the snapshot."""
+        record = self._find_record(path)
+        if record is None:
+            return None
+        if record == 0:
+            return self._entry(0, ".", self.root_parent_name)
+        parent_directory = path.rpartition("/")[0] or "."
+        return self._entry(record, path, parent_directory)
+
+    def list_children(self, path: str) -> List[DirectoryEntry]:
+        """
+        Returns the entries directly inside a directory, sorted by name.
+
+        Raises:
+            FileNotFoundError: If the path is not in the snapshot.
+            NotADirectoryError: If the path is a file.
+        """
+        record = self._find_record(path)
+        if record is None:
+            raise FileNotFoundError(f"Path not found in snapshot: {path}")
+        _, _, _, _, first_child, child_count, flags = self._record(record)
+        if not flags & _FLAG_DIRECTORY:
+            raise NotADirectoryError(f"Not a directory in snapshot: {path}")
+        prefix = "" if path == "." else path + "/"
+        children = []
+        for child in range(first_child, first_child + child_count):
+            entry = self._entry(child, "", path)
+            entry["path"] = prefix + entry["name"]
+            children.append(entry)
+        return children
+
+    def iter_entries(self) -> Iterator[DirectoryEntry]:
+        """Yields every entry in record (breadth-first) order."""
+        if self._record_count == 0:
+            return
+        yield self._entry(0, ".", self.root_parent_name)
+        pending = deque([(0, ".")])
+        while pending:
+            record, path = pending.popleft()
+            _, _, _, _, first_child, child_count, flags = self._record(record)
+            prefix = "" if path == "." else path + "/"
+            for child in range(first_child, first_child + child_count):
+                entry = self._entry(child, "", path)
+                entry["path"] = prefix + entry["name"]
+                yield entry
+                if entry["type"] == "directory":
+                    pending.append((child, entry["path"]))
+
+    def iter_entries_by_path(self) -> Iterator[DirectoryEntry]:
+        """
+        Yields every entry depth-first with siblings in name order, i.e. sorted by path
+        components. Memory use is proportional to the tree depth, not its size.
+        """
+        if self._record_count == 0:
+            return
+        yield self._entry(0, ".", self.root_parent_name)
+        _, _, _, _, first_child, child_count, _ = self._record(0)
+        # Each frame is [next child record, end of the child range, directory path]
+        stack = [[first_child, first_child + child_count, "."]]
+        while stack:
+            frame = stack[-1]
+            child, end, path = frame
+            if child == end:
+                stack.pop()
+                continue
+            frame[0] = child + 1
+            entry = self._entry(child, "", path)
+            entry["path"] = entry["name"] if path == "." else path + "/" + entry["name"]
+            yield entry
+            if entry["type"] == "directory":
+                _, _, _, _, first_child, child_count, _ = self._record(child)
+                if child_count:
+                    stack.append([first_child, first_child + child_count, entry["path"]])
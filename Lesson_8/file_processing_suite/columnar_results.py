@@ -0,0 +1,200 @@
+"""
+Compact columnar container for DirectoryScanner results.
+
+A list of DirectoryEntry dicts costs several hundred bytes per entry, most of it in
+per-row dict overhead and repeated path strings. ColumnarScanResult stores the same
+data column by column instead:
+
+    names:    index into an interned string table (each distinct name is stored once)
+    parents:  array('q') with the row index of the parent directory (-1 for the root)
+    types:    a bitmap with one bit per row (set for directories)
+    sizes:    array('q') with size_bytes
+
+Full paths are rebuilt from the parent chain on access, so rows can still be read as
+DirectoryEntry dicts by existing callers.
+"""
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Union, overload
+
+from .directory_entry import DirectoryEntry
+
+
+class ColumnarScanResult(Sequence):
+    """Scan results stored as columns, with dict-like (DirectoryEntry) row access."""
+
+    def __init__(self, root_parent_name: str = ""):
+        self.root_parent_name = root_parent_name
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._name_ids = array('I')
+        self._parents = array('q')
+        self._sizes = array('q')
+        self._type_bits = bytearray()
+        # Paths of directory rows only; files are far more numerous and rebuilt on demand
+        self._directory_paths: Dict[int, str] = {}
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[DirectoryEntry]) -> "ColumnarScanResult":
+        """
+        Builds a columnar result from DirectoryEntry dicts, in the order they are given.
+        Works both for the sorted output of scan_directory and the bottom-up stream of
+        iter_scan, where children arrive before their parent directory.
+        """
+        result = cls()
+        directory_rows: Dict[str, int] = {}
+        # Rows whose parent directory has not been seen yet, keyed by the parent's path
+        orphans: Dict[str, List[int]] = {}
+
+        for entry in entries:
+            path = entry["path"]
+            is_directory = entry["type"] == "directory"
+            if path == ".":
+                result.root_parent_name = entry["parent_directory"]
+                parent_row = -1
+            else:
+                parent_row = directory_rows.get(entry["parent_directory"], -1)
+
+            row = result.append(entry["name"], parent_row, is_directory, entry["size_bytes"])
+            if parent_row == -1 and path != ".":
+                orphans.setdefault(entry["parent_directory"], []).append(row)
+            if is_directory:
+                directory_rows[path] = row
+                for child_row in orphans.pop(path, ()):
+                    result._parents[child_row] = row
+
+        if orphans:
+            missing = ", ".join(sorted(orphans)[:5])
+            raise ValueError(f"Entries reference parent directories that are not in the results: {missing}")
+        return result
+
+    def append(self, name: str, parent_row: int, is_directory: bool, size_bytes: int) -> int:
+        """Appends one row and returns its index. parent_row is -1 for the root directory."""
+        name_id = self._string_ids.get(name)
+        if name_id is None:
+            name_id = len(self._strings)
+            self._strings.append(name)
+            self._string_ids[name] = name_id
+
+        row = len(self._sizes)
+        self._name_ids.append(name_id)
+        self._parents.append(parent_row)
+        self._sizes.append(size_bytes)
+        if row % 8 == 0:
+            self._type_bits.append(0)
+        if is_directory:
+            self._type_bits[row >> 3] |= 1 << (row & 7)
+        return row
+
+    def sort(self) -> None:
+        """
+        Reorders the rows in place into the order of DirectoryScanner.scan_directory:
+        the root first, then by depth and path.
+        """
+        order = sorted(range(len(self)), key=self._sort_key)
+        new_row_of = array('q', bytes(8 * len(order)))
+        for new_row, old_row in enumerate(order):
+            new_row_of[old_row] = new_row
+
+        type_bits = bytearray(len(self._type_bits))
+        for new_row, old_row in enumerate(order):
+            if self.is_directory(old_row):
+                type_bits[new_row >> 3] |= 1 << (new_row & 7)
+
+        self._name_ids = array('I', (self._name_ids[row] for row in order))
+        self._sizes = array('q', (self._sizes[row] for row in order))
+        self._parents = array('q', (
+            -1 if self._parents[row] == -1 else new_row_of[self._parents[row]] for row in order
+        ))
+        self._type_bits = type_bits
+        self._directory_paths = {}
+
+    def _sort_key(self, row: int):
+        path = self.path(row)
+        return (path != '.', path.count('/'), path)
+
+    def name(self, row: int) -> str:
+        """Returns the name of the item in a row."""
+        return self._strings[self._name_ids[row]]
+
+    def parent_index(self, row: int) -> int:
+        """Returns the row index of the parent directory, or -1 for the root."""
+        return self._parents[row]
+
+    def is_directory(self, row: int) -> bool:
+        """Returns True if the row is a directory."""
+        return bool(self._type_bits[row >> 3] & (1 << (row & 7)))
+
+    def size_bytes(self, row: int) -> int:
+        """Returns size_bytes of a row."""
+        return self._sizes[row]
+
+    def path(self, row: int) -> str:
+        """Returns the relative path of a row, "." for the root."""
+        parent_row = self._parents[row]
+        if parent_row == -1:
+            return "."
+        parent_path = self._directory_path(parent_row)
+        name = self._strings[self._name_ids[row]]
+        return name if parent_path == "." else parent_path + "/" + name
+
+    def _directory_path(self, row: int) -> str:
+        path = self._directory_paths.get(row)
+        if path is None:
+            path = self.path(row)
+            self._directory_paths[row] = path
+        return path
+
+    def _entry(self, row: int) -> DirectoryEntry:
+        parent_row = self._parents[row]
+        return {
+            "name": self._strings[self._name_ids[row]],
+            "path": self.path(row),
+            "parent_directory": self.root_parent_name if parent_row == -1 else self._directory_path(parent_row),
+            "type": "directory" if self.is_directory(row) else "file",
+            "size_bytes": self._sizes[row]
+        }
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    @overload
+    def __getitem__(self, index: int) -> DirectoryEntry: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[DirectoryEntry]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[DirectoryEntry, List[DirectoryEntry]]:
+        """Returns a row (or a list of rows for a slice) as a DirectoryEntry dict."""
+        if isinstance(index, slice):
+            return [self._entry(row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ColumnarScanResult index out of range")
+        return self._entry(index)
+
+    def __iter__(self) -> Iterator[DirectoryEntry]:
+        for row in range(len(self)):
+            yield self._entry(row)
+
+    def __getstate__(self) -> dict:
+        # The lookup dict and path cache are rebuilt on load; arrays pickle as raw bytes
+        return {
+            "root_parent_name": self.root_parent_name,
+            "strings": self._strings,
+            "name_ids": self._name_ids,
+            "parents": self._parents,
+            "sizes": self._sizes,
+            "type_bits": self._type_bits,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.root_parent_name = state["root_parent_name"]
+        self._strings = state["strings"]
+        self._string_ids = {name: name_id for name_id, name in enumerate(self._strings)}
+        self._name_ids = state["name_ids"]
+        self._parents = state["parents"]
+        self._sizes = state["sizes"]
+        self._type_bits = state["type_bits"]
+        self._directory_paths = {}
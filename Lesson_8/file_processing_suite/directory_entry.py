@@ -0,0 +1,16 @@
+"""
+The DirectoryEntry type shared by the scanner, its result containers and exporters.
+
+It lives in a module of its own, without imports from the package, so that every
+module can import it, including those that directory_scanner itself imports.
+"""
+from typing import Literal, TypedDict
+
+
+class DirectoryEntry(TypedDict):
+    """Structure for storing information about a directory item."""
+    name: str
+    path: str  # Relative path from the root_dir
+    parent_directory: str # Relative path of the parent from root_dir, or special value for root's parent
+    type: Literal["file", "directory"]
+    size_bytes: int
@@ -1,53 +1,651 @@
 """
 Lesson 8, Task 1: Directory Traversal and Serialization (Core Logic)
 
-This module contains the DirectoryScanner class and DirectoryEntry type definition.
+This module contains the DirectoryScanner class (DirectoryEntry is defined in directory_entry).
 """
 import os
 import json
 import csv
 import pickle
-from typing import List, TypedDict, Literal
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import ContextManager, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from .binary_snapshot import BinarySnapshotWriter
+from .columnar_results import ColumnarScanResult
+from .directory_entry import DirectoryEntry
+from .duplicate_finder import DuplicateFinder, DuplicateGroup
+from .scan_checkpoint import ScanCheckpoint, StackState
+from .scan_filter import ScanFilter
+from .scan_index import ScanIndex
+from .scan_metrics import ScanMetrics
+from .size_estimator import DirectorySizeEstimator, SizeEstimate
+
+
+class ScanSnapshot:
+    """
+    Per-directory listing cache persisted between scans, used for incremental rescans.
+
+    `directories` maps the relative path of every scanned directory to a plain tuple
+    (mtime_ns, files, subdirs, linked_subdirs):
+        mtime_ns: The directory's st_mtime_ns when it was listed, or -1 if it cannot be trusted.
+        files: List of (name, size_bytes, counted) tuples; counted is False for symlinked files,
+               which do not count towards directory totals.
+        subdirs: Names of the subdirectories that are descended into.
+        linked_subdirs: List of (name, size_bytes, counted) tuples for the subdirectories that
+               are not descended into: symlinked directories (counted is False) and,
+               with a ScanFilter.max_depth, directories at the depth limit (counted is True).
+
+    A directory's mtime changes whenever an entry is added, removed or renamed in it, so an
+    unchanged mtime means its listing can be reused without calling scandir or stat on its files.
+    Files rewritten in place (same name, new size) are not detected in such directories;
+    a scan without a snapshot always gives exact results. Listings are stored after
+    filtering, so `filter_key` records the ScanFilter (if any) that produced them.
+    """
+
+    _FORMAT = "file_processing_suite.scan_snapshot"
+    _VERSION = 2
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self.filter_key: Optional[tuple] = None
+        self.directories: Dict[str, Tuple[int, list, list, list]] = {}
+
+    def save(self, filepath: str) -> None:
+        """Writes the snapshot to a file, replacing it atomically."""
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        temp_filepath = filepath + ".tmp"
+        with open(temp_filepath, 'wb') as f:
+            pickle.dump(
+                {"format": self._FORMAT, "version": self._VERSION,
+                 "root_dir": self.root_dir, "filter_key": self.filter_key, "directories": self.directories},
+                f, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(temp_filepath, filepath)
+
+    @classmethod
+    def load(cls, filepath: str) -> "ScanSnapshot":
+        """
+        Reads a snapshot written by save().
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file is not a snapshot of a supported version.
+        """
+        with open(filepath, 'rb') as f:
+            try:
+                data = pickle.load(f)
+            except (pickle.UnpicklingError, EOFError) as e:
+                raise ValueError(f"'{filepath}' is not a valid scan snapshot: {e}") from e
+        if not isinstance(data, dict) or data.get("format") != cls._FORMAT or data.get("version") != cls._VERSION:
+            raise ValueError(f"'{filepath}' is not a scan snapshot of version {cls._VERSION}.")
+        snapshot = cls(data["root_dir"])
+        snapshot.filter_key = data.get("filter_key")
+        snapshot.directories = data["directories"]
+        return snapshot
+
+
+class _PendingDirectory:
+    """A directory whose subtree is still being traversed by ScandirTraversal."""
+
+    __slots__ = ("name", "path", "parent_directory", "subdirs", "next_subdir", "size_bytes")
+
+    def __init__(self, name: str, path: str, parent_directory: str):
+        self.name = name
+        self.path = path
+        self.parent_directory = parent_directory
+        self.subdirs: List[Tuple[str, str]] = []  # (name, absolute path)
+        self.next_subdir = 0
+        self.size_bytes = 0
+
+
+class ScandirTraversal:
+    """
+    Traversal engine built on os.scandir.
+
+    Entries are yielded bottom-up: files as soon as their directory is listed, and each
+    directory once its whole subtree is done, so its size_bytes is already aggregated.
+    The root directory (path ".") is yielded last. Relative paths are built by string
+    concatenation and sizes come from the DirEntry stat cache, so a regular file costs
+    at most one lstat call (none on Windows).
+
+    With a `snapshot` to record into, every listing is stored in it; with a `previous`
+    snapshot as well, directories whose mtime is unchanged are replayed from it instead
+    of being listed again (see ScanSnapshot). With `metrics`, syscalls, errors and the
+    time spent sizing symlinked and depth-limited directories are recorded in it (see ScanMetrics). With a
+    `scan_filter`, excluded directories are pruned without being listed and excluded
+    files are skipped without being stat'd (see ScanFilter). With a `checkpoint`, every
+    step is journaled and the traversal state saved every `checkpoint_interval` seconds,
+    so an interrupted scan can be resumed (see ScanCheckpoint).
+    """
+
+    # Directories modified this close to the start of the scan may change again within the same
+    # mtime tick, so their mtime is not trusted by the next incremental scan.
+    _RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+    def __init__(self, root_dir: str, root_name: str, root_parent_name: str,
+                 snapshot: Optional[ScanSnapshot] = None, previous: Optional[ScanSnapshot] = None,
+                 metrics: Optional[ScanMetrics] = None, scan_filter: Optional[ScanFilter] = None,
+                 checkpoint: Optional[ScanCheckpoint] = None, checkpoint_interval: float = 60.0):
+        self._root_dir = root_dir
+        self._root_name = root_name
+        self._root_parent_name = root_parent_name
+        self._snapshot = snapshot
+        self._previous_directories = previous.directories if previous is not None else {}
+        self._scan_started_ns = time.time_ns()
+        self._metrics = metrics
+        self._filter = scan_filter
+        self._checkpoint = checkpoint
+        self._checkpoint_interval = checkpoint_interval
+
+    def iter_entries(self) -> Iterator[DirectoryEntry]:
+        """Yields a DirectoryEntry for every item under the root, and finally the root itself."""
+        if self._checkpoint is not None:
+            yield from self._iter_entries_checkpointed(self._checkpoint)
+            return
+        root = _PendingDirectory(self._root_name, ".", self._root_parent_name)
+        yield from self._list_directory(self._root_dir, root)
+        stack = [root]
+
+        while stack:
+            current = stack[-1]
+            if current.next_subdir < len(current.subdirs):
+                name, abs_path = current.subdirs[current.next_subdir]
+                current.next_subdir += 1
+                child_path = name if current.path == "." else current.path + "/" + name
+                child = _PendingDirectory(name, child_path, current.path)
+                yield from self._list_directory(abs_path, child)
+                stack.append(child)
+                continue
+
+            stack.pop()
+            if stack:
+                stack[-1].size_bytes += current.size_bytes
+            yield self._finished_directory_entry(current)
+
+    def _iter_entries_checkpointed(self, checkpoint: ScanCheckpoint) -> Iterator[DirectoryEntry]:
+        """
+        Same traversal as iter_entries, but journals every step and saves checkpoints. When
+        resuming, the journaled entries are yielded again first, then the walk continues.
+        """
+        state = checkpoint.load_state()
+        try:
+            if state is None:
+                checkpoint.start()
+                root = _PendingDirectory(self._root_name, ".", self._root_parent_name)
+                batch = self._list_directory(self._root_dir, root)
+                stack = [root]
+                checkpoint.append(batch, self._recorded_listing(root.path))
+                yield from batch
+            else:
+                stack_state, journal_length = state
+                stack = [self._restore_pending(item) for item in stack_state]
+                for batch, listing in checkpoint.replay(journal_length):
+                    if listing is not None and self._snapshot is not None:
+                        self._snapshot.directories[listing[0]] = listing[1]
+                    yield from batch
+
+            next_save = time.monotonic() + self._checkpoint_interval
+            while stack:
+                current = stack[-1]
+                if current.next_subdir < len(current.subdirs):
+                    name, abs_path = current.subdirs[current.next_subdir]
+                    current.next_subdir += 1
+                    child_path = name if current.path == "." else current.path + "/" + name
+                    child = _PendingDirectory(name, child_path, current.path)
+                    batch = self._list_directory(abs_path, child)
+                    stack.append(child)
+                    listing = self._recorded_listing(child_path)
+                else:
+                    stack.pop()
+                    if stack:
+                        stack[-1].size_bytes += current.size_bytes
+                    batch = [self._finished_directory_entry(current)]
+                    listing = None
+
+                checkpoint.append(batch, listing)
+                if time.monotonic() >= next_save:
+                    checkpoint.save(self._stack_state(stack))
+                    next_save = time.monotonic() + self._checkpoint_interval
+                yield from batch
+            checkpoint.finish()
+        finally:
+            # Keeps the last checkpoint if the scan was interrupted
+            checkpoint.close()
+
+    def _recorded_listing(self, path: str) -> Optional[Tuple[str, tuple]]:
+        """Returns (path, listing) of a directory just recorded into the snapshot, if snapshots are enabled."""
+        if self._snapshot is None:
+            return None
+        return path, self._snapshot.directories[path]
+
+    @staticmethod
+    def _stack_state(stack: List[_PendingDirectory]) -> StackState:
+        return [(pending.name, pending.path, pending.parent_directory, pending.subdirs, pending.next_subdir,
+                 pending.size_bytes) for pending in stack]
+
+    @staticmethod
+    def _restore_pending(item: Tuple[str, str, str, List[Tuple[str, str]], int, int]) -> _PendingDirectory:
+        name, path, parent_directory, subdirs, next_subdir, size_bytes = item
+        pending = _PendingDirectory(name, path, parent_directory)
+        pending.subdirs = subdirs
+        pending.next_subdir = next_subdir
+        pending.size_bytes = size_bytes
+        return pending
+
+    @staticmethod
+    def _finished_directory_entry(pending: _PendingDirectory) -> DirectoryEntry:
+        """Builds the entry of a directory whose subtree size has been fully aggregated."""
+        return {
+            "name": pending.name,
+            "path": pending.path,
+            "parent_directory": pending.parent_directory,
+            "type": "directory",
+            "size_bytes": pending.size_bytes
+        }
+
+    def _list_directory(self, dir_path: str, pending: _PendingDirectory) -> List[DirectoryEntry]:
+        """
+        Lists one directory: returns entries for its files and the subdirectories not descended into,
+        adds the sizes that count towards totals to pending.size_bytes and stores the
+        subdirectories to descend into in pending.subdirs.
+        """
+        if self._snapshot is None:
+            listing = self._read_listing(dir_path, -1, pending.path)
+        else:
+            try:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                mtime_ns = -1
+            listing = self._previous_directories.get(pending.path)
+            if listing is None or mtime_ns == -1 or listing[0] != mtime_ns:
+                if mtime_ns >= self._scan_started_ns - self._RACY_MTIME_WINDOW_NS:
+                    mtime_ns = -1
+                listing = self._read_listing(dir_path, mtime_ns, pending.path)
+            elif self._metrics is not None:
+                self._metrics.add(directories_reused=1)
+            if self._metrics is not None:
+                self._metrics.add(stat_calls=1)
+            self._snapshot.directories[pending.path] = listing
+
+        _, files, subdirs, linked_subdirs = listing
+        prefix = "" if pending.path == "." else pending.path + "/"
+        parent_directory = pending.path
+        entries: List[DirectoryEntry] = []
+        size_bytes = 0
+        for name, file_size, counted in files:
+            if counted:
+                size_bytes += file_size
+            entries.append({
+                "name": name,
+                "path": prefix + name,
+                "parent_directory": parent_directory,
+                "type": "file",
+                "size_bytes": file_size
+            })
+        for name, linked_size, counted in linked_subdirs:
+            if counted:
+                size_bytes += linked_size
+            entries.append({
+                "name": name,
+                "path": prefix + name,
+                "parent_directory": parent_directory,
+                "type": "directory",
+                "size_bytes": linked_size
+            })
+        pending.size_bytes += size_bytes
+        pending.subdirs = [(name, os.path.join(dir_path, name)) for name in subdirs]
+        return entries
+
+    def _read_listing(self, dir_path: str, mtime_ns: int, relative_path: str = ".") -> Tuple[int, list, list, list]:
+        """
+        Reads one directory with os.scandir into a ScanSnapshot listing tuple.
+        Unreadable directories are treated as empty, like os.walk does.
+        """
+        files: List[Tuple[str, int, bool]] = []
+        subdirs: List[str] = []
+        linked_subdirs: List[Tuple[str, int, bool]] = []
+        errors = 0
+        scan_filter = self._filter
+        prefix = "" if relative_path == "." else relative_path + "/"
+        # Subdirectories at the depth limit are reported (like symlinked ones) but not descended into;
+        # their entries report the filtered size of their subtree, which counts towards the parent
+        at_depth_limit = (scan_filter is not None and scan_filter.max_depth is not None
+                          and (0 if relative_path == "." else relative_path.count("/") + 1) + 1 >= scan_filter.max_depth)
+        try:
+            with os.scandir(dir_path) as it:
+                for dir_entry in it:
+                    try:
+                        is_dir = dir_entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                        errors += 1
+                    if scan_filter is not None:
+                        name = dir_entry.name
+                        if is_dir:
+                            if scan_filter.is_excluded(prefix + name, name, True):
+                                continue
+                        elif not scan_filter.is_file_included(prefix + name, name):
+                            continue
+                    if is_dir:
+                        if dir_entry.is_symlink():
+                            # Symlinked directories are not descended into and do not count towards
+                            # their parent; their own entry reports the size of the target.
+                            linked_subdirs.append((dir_entry.name, self._linked_directory_size(dir_entry.path), False))
+                        elif at_depth_limit:
+                            linked_subdirs.append((dir_entry.name, self._linked_directory_size(
+                                dir_entry.path, prefix + dir_entry.name), True))
+                        else:
+                            subdirs.append(dir_entry.name)
+                        continue
+
+                    try:
+                        if dir_entry.is_symlink():
+                            # Symlinked files are listed with their target size but not added to totals
+                            files.append((dir_entry.name, dir_entry.stat().st_size, False))
+                        else:
+                            files.append((dir_entry.name, dir_entry.stat(follow_symlinks=False).st_size, True))
+                    except OSError as e:
+                        # Vanished files, symlink loops and unreadable targets are listed with
+                        # size 0; the rest of the directory is still read
+                        print(f"Warning: Could not stat file during scan: {dir_entry.path} ({e})")
+                        files.append((dir_entry.name, 0, False))
+                        errors += 1
+        except OSError:
+            # The directory itself could not be listed (or its listing broke off)
+            errors += 1
+        if self._metrics is not None:
+            # Every file costs exactly one stat call (successful or not)
+            self._metrics.add(directories_listed=1, scandir_calls=1, stat_calls=len(files), errors=errors)
+        if scan_filter is not None and scan_filter.min_size > 0:
+            files = [file for file in files if file[1] >= scan_filter.min_size]
+        if at_depth_limit and linked_subdirs:
+            # The sizes below the depth limit are not covered by this directory's mtime
+            mtime_ns = -1
+        return mtime_ns, files, subdirs, linked_subdirs
+
+    def _linked_directory_size(self, dir_path: str, relative_path: Optional[str] = None) -> int:
+        """
+        Sizes the target of a symlinked directory or, given its relative path, a directory at
+        the depth limit (with the scan filter applied), timed as the "size_calculation" phase.
+        """
+        scan_filter = self._filter if relative_path is not None else None
+        if self._metrics is None:
+            return self.directory_size(dir_path, None, scan_filter, relative_path)
+        with self._metrics.phase("size_calculation"):
+            return self.directory_size(dir_path, self._metrics, scan_filter, relative_path)
+
+    @staticmethod
+    def directory_size(dir_path: str, metrics: Optional[ScanMetrics] = None, scan_filter: Optional[ScanFilter] = None,
+                       relative_path: Optional[str] = None) -> int:
+        """
+        Calculates the total size of all regular files within a directory (recursively).
+        Its scandir and stat calls and errors are counted in metrics, if given. With a
+        scan_filter, only the files it would report are counted (its depth limit aside);
+        relative_path is then the directory's path relative to the filter's root.
+        """
+        total_size = 0
+        scandir_calls = stat_calls = errors = 0
+        pending_dirs = [(dir_path, relative_path)]
+        while pending_dirs:
+            scandir_calls += 1
+            current_path, current_relative_path = pending_dirs.pop()
+            try:
+                with os.scandir(current_path) as it:
+                    for dir_entry in it:
+                        try:
+                            if dir_entry.is_symlink():
+                                continue
+                            if scan_filter is None:
+                                if dir_entry.is_dir(follow_symlinks=False):
+                                    pending_dirs.append((dir_entry.path, None))
+                                else:
+                                    stat_calls += 1
+                                    total_size += dir_entry.stat(follow_symlinks=False).st_size
+                                continue
+                            name = dir_entry.name
+                            entry_relative_path = current_relative_path + "/" + name
+                            if dir_entry.is_dir(follow_symlinks=False):
+                                if not scan_filter.is_excluded(entry_relative_path, name, True):
+                                    pending_dirs.append((dir_entry.path, entry_relative_path))
+                            elif scan_filter.is_file_included(entry_relative_path, name):
+                                stat_calls += 1
+                                size = dir_entry.stat(follow_symlinks=False).st_size
+                                if size >= scan_filter.min_size:
+                                    total_size += size
+                        except OSError as e:
+                            print(f"Warning: Could not stat file during size calculation: {dir_entry.path} ({e})")
+                            errors += 1
+            except OSError:
+                errors += 1
+                continue
+        if metrics is not None:
+            metrics.add(scandir_calls=scandir_calls, stat_calls=stat_calls, errors=errors)
+        return total_size
+
+
+class _SharedPendingDirectory(_PendingDirectory):
+    """A directory tracked by ParallelScandirTraversal, which knows its parent and unfinished subdirectories."""
+
+    __slots__ = ("abs_path", "parent", "unfinished_subdirs")
+
+    def __init__(self, name: str, path: str, parent_directory: str, abs_path: str,
+                 parent: Optional["_SharedPendingDirectory"]):
+        super().__init__(name, path, parent_directory)
+        self.abs_path = abs_path
+        self.parent = parent
+        self.unfinished_subdirs = 0
+
+
+class ParallelScandirTraversal(ScandirTraversal):
+    """
+    Multi-threaded variant of ScandirTraversal.
+
+    Each worker thread owns a deque of directories to list. It pops work from its own end
+    (depth-first, good locality) and, when idle, steals from the opposite end of other
+    workers' deques (the oldest, typically largest subtrees). os.scandir and stat release
+    the GIL, so on high-latency storage the workers overlap their syscalls.
+
+    Entries are yielded in the calling thread as workers produce them. A directory is
+    emitted once all of its subdirectories are finished, so sizes are aggregated exactly
+    as in the serial engine, but the order between sibling subtrees is not deterministic.
+    """
+
+    _IDLE_WAIT_SECONDS = 0.05
+
+    def __init__(self, root_dir: str, root_name: str, root_parent_name: str, workers: int,
+                 snapshot: Optional[ScanSnapshot] = None, previous: Optional[ScanSnapshot] = None,
+                 metrics: Optional[ScanMetrics] = None, scan_filter: Optional[ScanFilter] = None):
+        super().__init__(root_dir, root_name, root_parent_name, snapshot, previous, metrics, scan_filter)
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("workers must be a positive integer.")
+        self._workers = workers
+
+    def iter_entries(self) -> Iterator[DirectoryEntry]:
+        """Yields a DirectoryEntry for every item under the root, and finally the root itself."""
+        deques: List[Deque[_SharedPendingDirectory]] = [deque() for _ in range(self._workers)]
+        # Bounded so that a slow consumer applies back-pressure instead of buffering the whole tree
+        output: "queue.Queue[object]" = queue.Queue(maxsize=self._workers * 64)
+        finish_lock = threading.Lock()
+        work_available = threading.Condition()
+        stop = threading.Event()
+        scan_finished = object()
+
+        def emit(item: object) -> None:
+            while not stop.is_set():
+                try:
+                    output.put(item, timeout=self._IDLE_WAIT_SECONDS)
+                    return
+                except queue.Full:
+                    continue
+
+        def next_directory(worker_index: int) -> Optional[_SharedPendingDirectory]:
+            try:
+                return deques[worker_index].pop()
+            except IndexError:
+                pass
+            for offset in range(1, self._workers):
+                try:
+                    return deques[(worker_index + offset) % self._workers].popleft()
+                except IndexError:
+                    continue
+            return None
+
+        def finish(pending: Optional[_SharedPendingDirectory]) -> None:
+            # Emit the directory and propagate its size upwards while parents become complete
+            while pending is not None:
+                emit([self._finished_directory_entry(pending)])
+                parent = pending.parent
+                if parent is None:
+                    emit(scan_finished)
+                    return
+                with finish_lock:
+                    parent.size_bytes += pending.size_bytes
+                    parent.unfinished_subdirs -= 1
+                    parent_complete = parent.unfinished_subdirs == 0
+                pending = parent if parent_complete else None
+
+        def process(worker_index: int, pending: _SharedPendingDirectory) -> None:
+            batch = self._list_directory(pending.abs_path, pending)
+            prefix = "" if pending.path == "." else pending.path + "/"
+            children = [
+                _SharedPendingDirectory(name, prefix + name, pending.path, abs_path, pending)
+                for name, abs_path in pending.subdirs
+            ]
+            pending.subdirs = []
+            # Set before the children are published, so they can never finish first
+            pending.unfinished_subdirs = len(children)
+            if batch:
+                emit(batch)
+            if not children:
+                finish(pending)
+                return
+            deques[worker_index].extend(children)
+            with work_available:
+                work_available.notify_all()
+
+        def run_worker(worker_index: int) -> None:
+            while not stop.is_set():
+                pending = next_directory(worker_index)
+                if pending is None:
+                    with work_available:
+                        work_available.wait(self._IDLE_WAIT_SECONDS)
+                    continue
+                try:
+                    process(worker_index, pending)
+                except BaseException as e:
+                    emit(e)
+                    return
+
+        deques[0].append(_SharedPendingDirectory(
+            self._root_name, ".", self._root_parent_name, self._root_dir, None
+        ))
+        threads = [
+            threading.Thread(target=run_worker, args=(i,), name=f"scandir-worker-{i}", daemon=True)
+            for i in range(self._workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = output.get()
+                if item is scan_finished:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield from item  # type: ignore[misc]
+        finally:
+            # Also reached when the consumer stops iterating early
+            stop.set()
+            with work_available:
+                work_available.notify_all()
+            for thread in threads:
+                thread.join()
 
-class DirectoryEntry(TypedDict):
-    """Structure for storing information about a directory item."""
-    name: str
-    path: str  # Relative path from the root_dir
-    parent_directory: str # Relative path of the parent from root_dir, or special value for root's parent
-    type: Literal["file", "directory"]
-    size_bytes: int
 
 class DirectoryScanner:
     """Scans a directory and saves its structure to various file formats."""
 
-    def __init__(self, root_dir: str):
+    def __init__(self, root_dir: str, workers: int = 1, snapshot_path: Optional[str] = None,
+                 metrics: Optional[ScanMetrics] = None, scan_filter: Optional[ScanFilter] = None,
+                 checkpoint_path: Optional[str] = None, resume: bool = False, checkpoint_interval: float = 60.0):
+        """
+        Args:
+            root_dir: The directory to scan.
+            workers: Number of threads listing directories in parallel. 1 (the default)
+                     scans serially; higher values pay off on high-latency storage such as NFS.
+            snapshot_path: Optional path of a ScanSnapshot file for incremental rescans. If it
+                           exists, directories whose mtime has not changed since it was written
+                           are not listed again; after every complete scan it is overwritten
+                           with the new snapshot.
+            metrics: Optional ScanMetrics that receives progress callbacks, per-phase timings
+                     ("walk", "sort", "export_json", ...) and syscall and error counters.
+            scan_filter: Optional ScanFilter (include/exclude patterns, ignore files, depth
+                         limit, minimum size) applied during the walk, so excluded
+                         directories are never listed.
+            checkpoint_path: Optional path of a ScanCheckpoint file. The scan journals its
+                             progress there and saves its state every checkpoint_interval
+                             seconds; the checkpoint is removed when the scan completes.
+                             Requires a serial scan (workers=1).
+            resume: Continue the interrupted scan saved at checkpoint_path instead of
+                    starting over; entries emitted before the interruption are read back
+                    from the checkpoint rather than walked again.
+            checkpoint_interval: Seconds between checkpoints.
+        """
         if not os.path.isdir(root_dir):
             raise ValueError(f"Provided root directory '{root_dir}' does not exist or is not a directory.")
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("workers must be a positive integer.")
+        if checkpoint_path is not None and workers > 1:
+            raise ValueError("Checkpoints require a serial scan (workers=1).")
+        if resume and checkpoint_path is None:
+            raise ValueError("resume requires a checkpoint_path.")
+        if checkpoint_interval <= 0:
+            raise ValueError("checkpoint_interval must be positive.")
         self._root_dir = os.path.abspath(root_dir)
-        self._collected_data: List[DirectoryEntry] = []
+        self._workers = workers
+        self._snapshot_path = snapshot_path
+        self._metrics = metrics
+        self._filter = scan_filter
+        self._checkpoint_path = checkpoint_path
+        self._resume = resume
+        self._checkpoint_interval = checkpoint_interval
+        self._snapshot: Optional[ScanSnapshot] = None
+        self._previous_snapshot: Optional[ScanSnapshot] = None
+        self._collected_data: Sequence[DirectoryEntry] = []
+
+    @property
+    def metrics(self) -> Optional[ScanMetrics]:
+        """The ScanMetrics instrumenting this scanner, if any."""
+        return self._metrics
+
+    def _phase(self, name: str) -> ContextManager[None]:
+        """Times a block as a metrics phase; does nothing without metrics."""
+        return self._metrics.phase(name) if self._metrics is not None else nullcontext()
 
     def _get_directory_size(self, dir_path: str) -> int:
         """Calculates the total size of all files within a directory (recursively)."""
-        total_size = 0
-        for path, _, filenames in os.walk(dir_path):
-            for f in filenames:
-                fp = os.path.join(path, f)
-                if not os.path.islink(fp):
-                    try:
-                        total_size += os.path.getsize(fp)
-                    except FileNotFoundError:
-                        print(f"Warning: File not found during size calculation: {fp}")
-                        continue
-        return total_size
+        return ScandirTraversal.directory_size(dir_path)
 
-    def scan_directory(self) -> List[DirectoryEntry]:
+    def estimate_size(self, dir_path: Optional[str] = None, time_budget: float = 2.0, exact_budget: int = 1000,
+                      confidence: float = 0.95, seed: Optional[int] = None) -> SizeEstimate:
         """
-        Recursively scans the root directory and collects information
-        about all files and subdirectories.
-        The root directory itself is the first entry in the list.
+        Estimates the total size and file count of a directory (the root by default) by
+        sampling its subdirectories instead of walking all of them. Trees with at most
+        exact_budget directories are sized exactly. Filters are not applied.
+        See DirectorySizeEstimator for the arguments.
         """
-        self._collected_data = []
-        
+        estimator = DirectorySizeEstimator(time_budget=time_budget, exact_budget=exact_budget,
+                                           confidence=confidence, seed=seed, metrics=self._metrics)
+        with self._phase("estimate"):
+            return estimator.estimate(dir_path if dir_path is not None else self._root_dir)
+
+    def _create_traversal(self) -> ScandirTraversal:
+        """Builds the (serial or parallel) traversal engine for the root directory."""
         root_name = os.path.basename(self._root_dir)
         # Determine the parent of the root. For display, this could be the name of the directory containing root_dir.
         parent_of_root_abs_path = os.path.dirname(self._root_dir)
@@ -59,57 +657,132 @@ class DirectoryScanner:
         elif parent_of_root_abs_path == os.getcwd() and not os.path.isabs(self._root_dir):
              parent_of_root_display_name = "." # If root_dir was relative like "my_folder"
 
-        root_entry: DirectoryEntry = {
-            "name": root_name,
-            "path": ".", 
-            "parent_directory": parent_of_root_display_name, 
-            "type": "directory",
-            "size_bytes": self._get_directory_size(self._root_dir)
-        }
-        self._collected_data.append(root_entry)
-
-        for dirpath, dirnames, filenames in os.walk(self._root_dir, topdown=True):
-            current_scan_dir_relative_path = os.path.relpath(dirpath, self._root_dir)
-            # Parent for items directly under dirpath, relative to root_dir
-            parent_for_children = current_scan_dir_relative_path.replace("\\\\", "/")
-
-            for dirname in dirnames:
-                full_subdir_path = os.path.join(dirpath, dirname)
-                relative_subdir_path = os.path.relpath(full_subdir_path, self._root_dir)
-                
-                entry: DirectoryEntry = {
-                    "name": dirname,
-                    "path": relative_subdir_path.replace("\\\\", "/"),
-                    "parent_directory": parent_for_children,
-                    "type": "directory",
-                    "size_bytes": self._get_directory_size(full_subdir_path)
-                }
-                self._collected_data.append(entry)
-
-            for filename in filenames:
-                full_file_path = os.path.join(dirpath, filename)
-                relative_file_path = os.path.relpath(full_file_path, self._root_dir)
-                
-                try:
-                    file_size = os.path.getsize(full_file_path)
-                except FileNotFoundError:
-                    print(f"Warning: File not found during scan: {full_file_path}")
-                    file_size = 0 
-
-                entry: DirectoryEntry = {
-                    "name": filename,
-                    "path": relative_file_path.replace("\\\\", "/"),
-                    "parent_directory": parent_for_children,
-                    "type": "file",
-                    "size_bytes": file_size
-                }
-                self._collected_data.append(entry)
-        
-        self._collected_data.sort(key=lambda x: (x['path'] != '.', x['path'].count('/'), x['path']))
+        if self._snapshot_path is not None:
+            self._previous_snapshot = self._load_previous_snapshot()
+            self._snapshot = ScanSnapshot(self._root_dir)
+            self._snapshot.filter_key = self._filter.key if self._filter is not None else None
+
+        if self._workers > 1:
+            return ParallelScandirTraversal(self._root_dir, root_name, parent_of_root_display_name, self._workers,
+                                            self._snapshot, self._previous_snapshot, self._metrics, self._filter)
+        checkpoint = None
+        if self._checkpoint_path is not None:
+            checkpoint = ScanCheckpoint(self._checkpoint_path, self._root_dir,
+                                        self._filter.key if self._filter is not None else None, self._resume)
+            # Only the first scan resumes; a completed scan removes its checkpoint anyway
+            self._resume = False
+        return ScandirTraversal(self._root_dir, root_name, parent_of_root_display_name,
+                                self._snapshot, self._previous_snapshot, self._metrics, self._filter,
+                                checkpoint, self._checkpoint_interval)
+
+    def _traverse(self) -> Iterator[DirectoryEntry]:
+        """Starts a traversal of the root directory; with metrics, its entries are counted for progress reports."""
+        entries = self._create_traversal().iter_entries()
+        return self._metrics.observe(entries) if self._metrics is not None else entries
+
+    def _load_previous_snapshot(self) -> Optional[ScanSnapshot]:
+        """Loads the snapshot of the previous scan, or returns None if there is no usable one."""
+        if not os.path.exists(self._snapshot_path):
+            return None
+        try:
+            previous = ScanSnapshot.load(self._snapshot_path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring scan snapshot '{self._snapshot_path}': {e}")
+            return None
+        if previous.root_dir != self._root_dir:
+            print(f"Warning: Ignoring scan snapshot '{self._snapshot_path}': it was taken of '{previous.root_dir}'.")
+            return None
+        if previous.filter_key != (self._filter.key if self._filter is not None else None):
+            print(f"Warning: Ignoring scan snapshot '{self._snapshot_path}': it was taken with different filters.")
+            return None
+        return previous
+
+    def _save_snapshot(self) -> None:
+        """Persists the snapshot recorded during the scan that just completed, if snapshots are enabled."""
+        if self._snapshot is None:
+            return
+        with self._phase("snapshot_save"):
+            if self._previous_snapshot is not None:
+                previous_directories = self._previous_snapshot.directories
+                # Replayed listings are the very same objects as in the previous snapshot
+                reused = sum(1 for path, listing in self._snapshot.directories.items()
+                             if previous_directories.get(path) is listing)
+                print(f"Incremental scan: reused {reused} of {len(self._snapshot.directories)} directories from the snapshot.")
+            self._snapshot.save(self._snapshot_path)
+            self._snapshot = None
+            self._previous_snapshot = None
+
+    def scan_directory(self) -> List[DirectoryEntry]:
+        """
+        Recursively scans the root directory and collects information
+        about all files and subdirectories.
+        The root directory itself is the first entry in the list.
+        """
+        with self._phase("walk"):
+            self._collected_data = list(self._traverse())
+        self._save_snapshot()
+        with self._phase("sort"):
+            self.sort_entries(self._collected_data)
         return self._collected_data
 
-    def get_collected_data(self) -> List[DirectoryEntry]:
-        """Returns the collected directory scan data. Scans if not already done."""
+    @staticmethod
+    def sort_entries(entries: List[DirectoryEntry]) -> None:
+        """Sorts entries in place into the order of scan_directory: the root first, then by depth and path."""
+        entries.sort(key=lambda x: (x['path'] != '.', x['path'].count('/'), x['path']))
+
+    def scan_directory_columnar(self) -> ColumnarScanResult:
+        """
+        Same as scan_directory, but collects the results into a compact ColumnarScanResult
+        instead of a list of dicts. Rows are in the same order and read back as DirectoryEntry
+        dicts; the result becomes the collected data used by the save_to_* exporters.
+        """
+        with self._phase("walk"):
+            result = ColumnarScanResult.from_entries(self._traverse())
+        self._save_snapshot()
+        with self._phase("sort"):
+            result.sort()
+        self._collected_data = result
+        return result
+
+    def build_index(self) -> ScanIndex:
+        """
+        Builds a ScanIndex over the collected data (scanning first if needed) for fast
+        top-N, per-extension and path-prefix queries.
+        """
+        data = self.get_collected_data()
+        with self._phase("index"):
+            return ScanIndex(data)
+
+    def find_duplicates(self, workers: int = 4, min_size: int = 1) -> List[DuplicateGroup]:
+        """
+        Finds files with identical content in the collected data (scanning first if needed),
+        bucketing by size and hashing only files that could still be duplicates.
+        See DuplicateFinder for the arguments.
+        """
+        data = self.get_collected_data()
+        with self._phase("duplicates"):
+            return DuplicateFinder(self._root_dir, workers=workers, min_size=min_size).find_duplicates(data)
+
+    def iter_scan(self) -> Iterator[DirectoryEntry]:
+        """
+        Scans the root directory lazily, yielding entries as they are discovered.
+
+        Nothing is kept in memory besides the directories still being traversed, so the
+        scan can be written straight to disk. Entries come bottom-up rather than in the
+        sorted order of scan_directory: files first, each directory after its subtree,
+        and the root directory (path ".") last. Does not touch the collected data.
+        The scan snapshot, if enabled, is only written once the iterator is exhausted.
+        With metrics, progress and counters are recorded, but no "walk" phase is timed,
+        since the walk interleaves with whatever the caller does with the entries.
+        """
+        yield from self._traverse()
+        self._save_snapshot()
+
+    def get_collected_data(self) -> Sequence[DirectoryEntry]:
+        """
+        Returns the collected directory scan data: a list from scan_directory, or a
+        ColumnarScanResult from scan_directory_columnar. Scans if not already done.
+        """
         if not self._collected_data:
             self.scan_directory()
         return self._collected_data
@@ -118,8 +791,8 @@ class DirectoryScanner:
         """Saves the collected data to a JSON file."""
         data = self.get_collected_data()
         os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
-        with open(output_filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        with self._phase("export_json"), open(output_filepath, 'w', encoding='utf-8') as f:
+            _write_json(data, f)
         print(f"Successfully saved directory scan to JSON: {output_filepath}")
 
     def save_to_csv(self, output_filepath: str) -> None:
@@ -131,16 +804,95 @@ class DirectoryScanner:
         
         os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
         fieldnames = list(DirectoryEntry.__annotations__.keys())
-        with open(output_filepath, 'w', newline='', encoding='utf-8') as f:
+        with self._phase("export_csv"), open(output_filepath, 'w', newline='', encoding='utf-8') as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
             writer.writerows(data)
         print(f"Successfully saved directory scan to CSV: {output_filepath}")
 
     def save_to_pickle(self, output_filepath: str) -> None:
-        """Saves the collected data to a Pickle file."""
+        """
+        Saves the collected data to a Pickle file. Columnar results are pickled as a
+        ColumnarScanResult, which stays compact on disk and when loaded back.
+        """
         data = self.get_collected_data()
         os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
-        with open(output_filepath, 'wb') as f:
+        with self._phase("export_pickle"), open(output_filepath, 'wb') as f:
             pickle.dump(data, f)
-        print(f"Successfully saved directory scan to Pickle: {output_filepath}") 
\ No newline at end of file
+        print(f"Successfully saved directory scan to Pickle: {output_filepath}") 
+
+    def save_to_binary_snapshot(self, output_filepath: str) -> None:
+        """
+        Saves the collected data to a binary snapshot file, which BinarySnapshotReader can
+        query through mmap without loading it (see binary_snapshot for the format).
+        """
+        data = self.get_collected_data()
+        with self._phase("export_binary_snapshot"):
+            records_written = BinarySnapshotWriter().write(data, output_filepath)
+        print(f"Successfully saved directory scan to binary snapshot ({records_written} records): {output_filepath}")
+
+    def save_to_jsonl(self, output_filepath: str) -> None:
+        """Saves the collected data to a JSON Lines file (one entry per line)."""
+        data = self.get_collected_data()
+        os.makedirs(os.path.dirname(output_filepath) or ".", exist_ok=True)
+        with self._phase("export_jsonl"), open(output_filepath, 'w', encoding='utf-8') as f:
+            _write_jsonl(data, f)
+        print(f"Successfully saved directory scan to JSON Lines: {output_filepath}")
+
+    def stream_to_jsonl(self, output_filepath: str) -> int:
+        """
+        Scans the root directory and writes each entry to a JSON Lines file as soon as it
+        is discovered, with flat memory use. Returns the number of entries written.
+        """
+        os.makedirs(os.path.dirname(output_filepath) or ".", exist_ok=True)
+        with open(output_filepath, 'w', encoding='utf-8') as f:
+            entries_written = _write_jsonl(self.iter_scan(), f)
+        print(f"Successfully streamed directory scan to JSON Lines: {output_filepath}")
+        return entries_written
+
+    def stream_to_csv(self, output_filepath: str) -> int:
+        """
+        Scans the root directory and writes each entry to a CSV file as soon as it
+        is discovered, with flat memory use. Returns the number of entries written.
+        """
+        os.makedirs(os.path.dirname(output_filepath) or ".", exist_ok=True)
+        with open(output_filepath, 'w', newline='', encoding='utf-8') as f:
+            entries_written = _write_csv(self.iter_scan(), f)
+        print(f"Successfully streamed directory scan to CSV: {output_filepath}")
+        return entries_written
+
+
+def _write_json(entries: Iterable[DirectoryEntry], f: TextIO) -> int:
+    """
+    Writes entries as a JSON array to an open text file, one entry at a time. The output is
+    identical to json.dump(list(entries), f, indent=4, ensure_ascii=False).
+    Returns the number of entries written.
+    """
+    count = 0
+    for entry in entries:
+        f.write(",\n    " if count else "[\n    ")
+        f.write(json.dumps(entry, indent=4, ensure_ascii=False).replace("\n", "\n    "))
+        count += 1
+    f.write("\n]" if count else "[]")
+    return count
+
+
+def _write_jsonl(entries: Iterable[DirectoryEntry], f: TextIO) -> int:
+    """Writes entries as JSON Lines to an open text file. Returns the number of entries written."""
+    count = 0
+    for entry in entries:
+        f.write(json.dumps(entry, ensure_ascii=False))
+        f.write("\n")
+        count += 1
+    return count
+
+
+def _write_csv(entries: Iterable[DirectoryEntry], f: TextIO) -> int:
+    """Writes entries as CSV rows (with header) to an open text file. Returns the number of entries written."""
+    writer = csv.DictWriter(f, fieldnames=list(DirectoryEntry.__annotations__.keys()))
+    writer.writeheader()
+    count = 0
+    for entry in entries:
+        writer.writerow(entry)
+        count += 1
+    return count
@@ -0,0 +1,172 @@
+"""
+Content-based duplicate file detection on top of DirectoryScanner results.
+
+Candidates are narrowed down in three rounds, so that only files that are very likely
+duplicates are ever read completely:
+
+    1. size       files are bucketed by size_bytes from the scan; unique sizes drop out
+                  without any I/O
+    2. partial    the first and last block of each remaining file are hashed
+    3. full       files that still collide (and are larger than the two blocks) are
+                  hashed completely with large-buffer reads
+
+Rounds 2 and 3 run on a thread pool; hashlib releases the GIL while hashing large
+buffers, so reading and hashing of different files overlap.
+"""
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, TypedDict
+
+from .directory_entry import DirectoryEntry
+
+
+class DuplicateGroup(TypedDict):
+    """A set of files with identical content."""
+    size_bytes: int  # Size of each file
+    digest: str  # Hex BLAKE2b digest of the content
+    paths: List[str]  # Relative paths from the scanned root, sorted
+    wasted_bytes: int  # Bytes that removing all but one copy would free (hard links count once)
+
+
+# (relative path, (st_dev, st_ino)) of one candidate file
+_Candidate = Tuple[str, Tuple[int, int]]
+
+
+class DuplicateFinder:
+    """Finds groups of files with identical content among scan entries."""
+
+    _BLOCK_SIZE = 64 * 1024
+    _READ_BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self, root_dir: str, workers: int = 4, min_size: int = 1):
+        """
+        Args:
+            root_dir: The directory the entries were scanned from (their paths are relative to it).
+            workers: Number of threads reading and hashing files.
+            min_size: Files smaller than this are ignored. The default skips empty files,
+                      which are all trivially identical.
+
+        Raises:
+            ValueError: If root_dir is not a directory or workers / min_size are out of range.
+        """
+        if not os.path.isdir(root_dir):
+            raise ValueError(f"Provided root directory '{root_dir}' does not exist or is not a directory.")
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("workers must be a positive integer.")
+        if min_size < 0:
+            raise ValueError("min_size must not be negative.")
+        self._root_dir = os.path.abspath(root_dir)
+        self._workers = workers
+        self._min_size = min_size
+
+    def find_duplicates(self, entries: Iterable[DirectoryEntry]) -> List[DuplicateGroup]:
+        """
+        Returns the groups of duplicate files among the entries, most wasted bytes first.
+
+        Args:
+            entries: Scan entries in any order, e.g. get_collected_data(), iter_scan() or
+                     BinarySnapshotReader.iter_entries(). Directories are ignored.
+
+        Files that cannot be read, or whose size changed since the scan, are skipped
+        with a warning.
+        """
+        sizes: Dict[int, List[str]] = {}
+        for entry in entries:
+            if entry["type"] == "file" and entry["size_bytes"] >= self._min_size:
+                sizes.setdefault(entry["size_bytes"], []).append(entry["path"])
+        size_buckets = [(size, paths) for size, paths in sizes.items() if len(paths) > 1]
+        del sizes
+        candidate_count = sum(len(paths) for _, paths in size_buckets)
+
+        groups: List[DuplicateGroup] = []
+        full_hashed = 0
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            # Round 2: first and last block. Up to two blocks this covers the whole file.
+            partial_buckets: Dict[Tuple[int, bytes], List[_Candidate]] = {}
+            jobs = [(size, path) for size, paths in size_buckets for path in paths]
+            for (size, path), result in zip(jobs, executor.map(lambda job: self._hash_partial(job[1], job[0]), jobs)):
+                if result is not None:
+                    digest, file_id = result
+                    partial_buckets.setdefault((size, digest), []).append((path, file_id))
+
+            full_jobs: List[Tuple[int, _Candidate]] = []
+            for (size, digest), candidates in partial_buckets.items():
+                if not self._has_copies(candidates):
+                    continue
+                if size <= 2 * self._BLOCK_SIZE:
+                    groups.append(self._group(size, digest, candidates))
+                else:
+                    full_jobs.extend((size, candidate) for candidate in candidates)
+            del partial_buckets
+
+            # Round 3: complete contents, only for large files that still collide
+            full_buckets: Dict[Tuple[int, bytes], List[_Candidate]] = {}
+            results = executor.map(lambda job: self._hash_full(job[1][0], job[0]), full_jobs)
+            for (size, candidate), digest in zip(full_jobs, results):
+                if digest is not None:
+                    full_buckets.setdefault((size, digest), []).append(candidate)
+            full_hashed = len(full_jobs)
+            groups.extend(self._group(size, digest, candidates)
+                          for (size, digest), candidates in full_buckets.items() if self._has_copies(candidates))
+
+        print(f"Duplicate search: {candidate_count} files share their size with another file, {full_hashed} "
+              f"of them needed a full hash; found {len(groups)} duplicate groups.")
+        groups.sort(key=lambda group: (-group["wasted_bytes"], group["paths"][0]))
+        return groups
+
+    def _hash_partial(self, relative_path: str, size: int) -> Optional[Tuple[bytes, Tuple[int, int]]]:
+        """Hashes the first and last block of a file. Returns (digest, file id), or None if unreadable."""
+        try:
+            with open(os.path.join(self._root_dir, relative_path), 'rb') as f:
+                stat_result = os.fstat(f.fileno())
+                if stat_result.st_size != size:
+                    print(f"Warning: File changed since the scan, skipping: {relative_path}")
+                    return None
+                hasher = hashlib.blake2b()
+                hasher.update(f.read(self._BLOCK_SIZE))
+                if size > self._BLOCK_SIZE:
+                    f.seek(max(self._BLOCK_SIZE, size - self._BLOCK_SIZE))
+                    hasher.update(f.read(self._BLOCK_SIZE))
+        except OSError as e:
+            print(f"Warning: Could not read file during duplicate search: {relative_path} ({e})")
+            return None
+        return hasher.digest(), (stat_result.st_dev, stat_result.st_ino)
+
+    def _hash_full(self, relative_path: str, size: int) -> Optional[bytes]:
+        """Hashes the complete content of a file, or returns None if it is unreadable or changed size."""
+        hasher = hashlib.blake2b()
+        buffer = bytearray(self._READ_BUFFER_SIZE)
+        view = memoryview(buffer)
+        total = 0
+        try:
+            with open(os.path.join(self._root_dir, relative_path), 'rb', buffering=0) as f:
+                while True:
+                    read = f.readinto(buffer)
+                    if not read:
+                        break
+                    hasher.update(view[:read])
+                    total += read
+        except OSError as e:
+            print(f"Warning: Could not read file during duplicate search: {relative_path} ({e})")
+            return None
+        if total != size:
+            print(f"Warning: File changed since the scan, skipping: {relative_path}")
+            return None
+        return hasher.digest()
+
+    @staticmethod
+    def _has_copies(candidates: List[_Candidate]) -> bool:
+        """True if the candidates are more than one distinct file (hard links and symlinks are one file)."""
+        first_id = candidates[0][1]
+        return any(file_id != first_id for _, file_id in candidates)
+
+    @staticmethod
+    def _group(size: int, digest: bytes, candidates: List[_Candidate]) -> DuplicateGroup:
+        distinct_files = len({file_id for _, file_id in candidates})
+        return {
+            "size_bytes": size,
+            "digest": digest.hex(),
+            "paths": sorted(path for path, _ in candidates),
+            "wasted_bytes": size * (distinct_files - 1)
+        }
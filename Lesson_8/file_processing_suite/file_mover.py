@@ -0,0 +1,157 @@
+"""
+Moving files between directories, including across filesystems.
+
+os.rename is tried first; it is atomic and costs one system call, but fails with EXDEV
+when the target is on another mount. The file is then copied without passing its data
+through user space:
+
+    1. os.copy_file_range   copies in the kernel and lets the filesystem clone or
+                            offload the data where it can (Linux 4.5+; across
+                            filesystems since 5.3)
+    2. os.sendfile          copies in the kernel between any two regular files (Linux)
+    3. read/write           the portable fallback
+
+The copy is written to a temporary file next to the target, gets the permission bits,
+timestamps, flags and extended attributes (and, where permitted, the owner) of the
+source, and is renamed onto the target before the source is unlinked, so the target
+never holds a partial file. The source is copied up to its end, and if its size or mtime
+changed while it was being copied, the move fails and the source is left in place. Copies are limited by a semaphore, so a caller may move
+many files on a thread pool without running more than a set number of copies at once.
+"""
+import errno
+import os
+import shutil
+import stat
+import tempfile
+import threading
+
+# copy_file_range/sendfile errors after which the next method is tried
+_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+_COPY_CHUNK = 1 << 30  # bytes per copy_file_range/sendfile call
+_READ_CHUNK = 1 << 20  # bytes per read in the user-space fallback
+
+
+class FileMover:
+    """Moves files, copying them in the kernel when they cross a filesystem boundary."""
+
+    def __init__(self, max_concurrent_copies: int = 4):
+        """
+        Args:
+            max_concurrent_copies: Maximum number of cross-filesystem copies running at once.
+
+        Raises:
+            ValueError: If max_concurrent_copies is not a positive integer.
+        """
+        if not isinstance(max_concurrent_copies, int) or max_concurrent_copies < 1:
+            raise ValueError("max_concurrent_copies must be a positive integer.")
+        self.max_concurrent_copies = max_concurrent_copies
+        self._copy_slots = threading.BoundedSemaphore(max_concurrent_copies)
+
+    def move(self, old_path: str, new_path: str) -> None:
+        """
+        Moves a file, creating the target directory if needed. An existing target is replaced.
+
+        Raises:
+            OSError: If the file cannot be moved; the source is then left in place.
+        """
+        try:
+            os.rename(old_path, new_path)
+            return
+        except FileNotFoundError:
+            # The target directory may not exist yet
+            target_dir = os.path.dirname(new_path)
+            if not target_dir or os.path.isdir(target_dir):
+                raise
+            os.makedirs(target_dir, exist_ok=True)
+            try:
+                os.rename(old_path, new_path)
+                return
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+        with self._copy_slots:
+            self._copy_and_unlink(old_path, new_path)
+
+    @classmethod
+    def _copy_and_unlink(cls, old_path: str, new_path: str) -> None:
+        source_stat = os.stat(old_path, follow_symlinks=False)
+        if not stat.S_ISREG(source_stat.st_mode):
+            raise OSError(errno.EXDEV, "Only regular files can be moved across filesystems", old_path)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(new_path)}.", suffix=".moving",
+                                         dir=os.path.dirname(new_path) or ".")
+        try:
+            with open(old_path, 'rb') as source:
+                with os.fdopen(fd, 'wb') as target:
+                    copied = cls._copy_contents(source.fileno(), target.fileno(), source_stat.st_size)
+                shutil.copystat(old_path, temp_path)
+                if hasattr(os, "chown"):
+                    try:
+                        os.chown(temp_path, source_stat.st_uid, source_stat.st_gid)
+                    except PermissionError:
+                        pass # Only privileged processes may give files away
+                # A file written to during the copy is not moved, so no data is lost
+                copied_stat = os.fstat(source.fileno())
+                if copied_stat.st_size != copied or copied_stat.st_mtime_ns != source_stat.st_mtime_ns:
+                    raise OSError(errno.EBUSY, "File changed while being moved", old_path)
+                os.rename(temp_path, new_path)
+        except BaseException:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+            raise
+        try:
+            os.unlink(old_path)
+        except OSError:
+            # Do not leave the file in both places
+            os.remove(new_path)
+            raise
+
+    @staticmethod
+    def _copy_contents(source_fd: int, target_fd: int, size: int) -> int:
+        """
+        Copies source_fd from its start to its end into target_fd, in the kernel where possible,
+        and returns the number of bytes copied. size, the size of the file when the copy
+        started, is only used to tell an empty result of a method that cannot copy the file
+        from the end of the file.
+        """
+        copied = 0
+        if hasattr(os, "copy_file_range"):
+            try:
+                while True:
+                    count = os.copy_file_range(source_fd, target_fd, _COPY_CHUNK)
+                    if count == 0:
+                        break
+                    copied += count
+                # Some filesystems report 0 instead of an error for files they cannot copy
+                if copied or not size:
+                    return copied
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED_ERRNOS:
+                    raise
+        if hasattr(os, "sendfile"):
+            try:
+                while True:
+                    # sendfile writes at target_fd's position and reads at an explicit offset
+                    count = os.sendfile(target_fd, source_fd, copied, _COPY_CHUNK)
+                    if count == 0:
+                        break
+                    copied += count
+                if copied or not size:
+                    return copied
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED_ERRNOS:
+                    raise
+        os.lseek(source_fd, copied, os.SEEK_SET)
+        os.lseek(target_fd, copied, os.SEEK_SET)
+        while True:
+            chunk = os.read(source_fd, _READ_CHUNK)
+            if not chunk:
+                return copied
+            view = memoryview(chunk)
+            while view:
+                written = os.write(target_fd, view)
+                copied += written
+                view = view[written:]
@@ -1,20 +1,58 @@
 import os
-from typing import Optional, Tuple, List
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional, Tuple, List, Set, Union
+
+from .file_mover import FileMover
+from .rename_journal import RenameJournal, RenameStep
+from .rename_template import RenameTemplate
+
+# A file to rename: (filename, name without extension, template regex match, os.stat_result)
+_Candidate = Tuple[str, str, Optional[re.Match], Optional[os.stat_result]]
 
 class BatchFileRenamer:
-    """Provides functionality to batch rename files in a directory."""
+    """
+    Provides functionality to batch rename files in a directory (or a directory tree).
+
+    Renaming happens in two phases: plan_renames() lists the directory once and builds
+    the complete list of (old_path, new_path) steps in memory, detecting name collisions
+    against the set of current and planned names instead of checking each target on disk;
+    execute_plan() then renames step by step. With a journal the execution can be resumed
+    after a crash (resume()) or undone (rollback()). In recursive mode every directory is
+    planned on its own, and independent directories are planned and renamed in parallel.
+    With a target directory the files are moved there instead, across filesystems if need be.
+    watch() keeps renaming the files arriving in a directory.
+    """
 
-    def __init__(self):
-        pass
+    _MTIME_GRANULARITY = 2.0 # seconds; the coarsest directory mtime resolution (FAT)
+
+    def __init__(self, max_concurrent_copies: int = 4):
+        """
+        Args:
+            max_concurrent_copies: Maximum number of files copied at once when moving them to
+                                   another filesystem (see FileMover).
+        """
+        self._mover = FileMover(max_concurrent_copies)
 
     def rename_files(
         self,
         directory: str,
-        source_extension: str,
-        target_extension: str,
+        source_extension: Optional[str] = None,
+        target_extension: Optional[str] = None,
         num_digits: int = 3,
         desired_final_name: Optional[str] = None,
         original_name_slice: Optional[Tuple[int, int]] = None,
+        journal_path: Optional[str] = None,
+        recursive: bool = False,
+        global_counter: bool = False,
+        workers: int = 1,
+        extension_map: Optional[Dict[str, str]] = None,
+        template: Optional[Union[str, RenameTemplate]] = None,
+        target_directory: Optional[str] = None,
     ) -> List[Tuple[str, str]]:
         """
         Renames files in a specified directory based on given criteria.
@@ -31,23 +69,294 @@ class BatchFileRenamer:
                                  original filename (excluding extension) to be preserved.
                                  E.g., (3, 6) takes characters from 3rd to 6th.
                                  If None, no part of the original name is preserved this way.
+            journal_path: Optional path of a rename journal. If the run is interrupted, it can be
+                          continued with resume() or undone with rollback().
+            recursive: Also rename the files in all subdirectories (symlinks are not followed).
+            global_counter: In recursive mode, number the files of the whole tree with one counter
+                            (in depth-first order) instead of starting at 1 in each directory.
+            workers: Threads that list, plan and rename independent directories in parallel.
+            extension_map: Several {source_extension: target_extension} mappings (e.g.
+                           {".jpeg": ".jpg", ".txt": ".log"}) applied in one traversal, instead
+                           of source_extension and target_extension. Each mapping is numbered
+                           with its own counter, as if rename_files() were called once per mapping.
+            template: A naming template (see RenameTemplate) used instead of desired_final_name
+                      and original_name_slice, e.g. "{1}_{mtime:%Y%m%d}_{counter}". A string is
+                      compiled with num_digits as the counter padding; the target extension is
+                      appended to the result. Files not matching the template's pattern are left alone.
+            target_directory: Move the renamed files into this directory (mirroring the
+                              subdirectories in recursive mode) instead of renaming them in
+                              place. It may be on another filesystem: the files are then copied
+                              in the kernel, keeping their metadata, and the sources removed.
         
         Returns:
             A list of tuples, where each tuple is (old_path, new_path) for successfully renamed files.
         
         Raises:
             FileNotFoundError: If the specified directory does not exist.
-            ValueError: For invalid parameters (e.g., num_digits <= 0, invalid slice).
+            ValueError: For invalid parameters (e.g., num_digits <= 0, invalid slice, both or
+                        neither of source_extension/target_extension and extension_map).
             TypeError: For incorrect parameter types.
         """
+        plan = self.plan_renames(directory, source_extension, target_extension, num_digits,
+                                 desired_final_name, original_name_slice, recursive, global_counter, workers,
+                                 extension_map, template, target_directory)
+        return self.execute_plan(plan, journal_path, workers)
+
+    def plan_renames(
+        self,
+        directory: str,
+        source_extension: Optional[str] = None,
+        target_extension: Optional[str] = None,
+        num_digits: int = 3,
+        desired_final_name: Optional[str] = None,
+        original_name_slice: Optional[Tuple[int, int]] = None,
+        recursive: bool = False,
+        global_counter: bool = False,
+        workers: int = 1,
+        extension_map: Optional[Dict[str, str]] = None,
+        template: Optional[Union[str, RenameTemplate]] = None,
+        target_directory: Optional[str] = None,
+    ) -> List[RenameStep]:
+        """
+        Builds the rename plan of rename_files() without renaming anything.
+
+        The directory is listed once with os.scandir into an index of the entries by
+        lowercase extension, so only files with a source extension are sorted and checked
+        for being regular files, and collisions are detected in memory. A new name may be
+        the current name of another file renamed in the same run: such chains are ordered so
+        that every name is freed before it is claimed, and cycles (e.g. two files swapping
+        names) are broken with a single temporary name each, so the plan makes the minimum
+        number of renames. A file keeping its name still consumes its counter value, so an
+        already sequenced directory is left alone. A file whose new name is taken by a file
+        that is not renamed is skipped with a warning and does not consume a counter value.
+
+        With a target directory the new names are checked against the names in the
+        corresponding target directory (which need not exist yet) and there are no chains.
+
+        In recursive mode the steps of each directory follow each other, directories in
+        depth-first order. Without a global counter the directories are listed and planned
+        on a pool of workers threads.
+
+        Returns:
+            The (old_path, new_path) steps in execution order.
+
+        Raises:
+            FileNotFoundError, ValueError, TypeError: As rename_files().
+        """
 
         # Parameter Validation
         if not os.path.isdir(directory):
             raise FileNotFoundError(f"Directory not found: {directory}")
-        if not isinstance(source_extension, str) or not source_extension.startswith('.'):
-            raise ValueError("source_extension must be a string starting with '.' (e.g., '.txt')")
-        if not isinstance(target_extension, str) or not target_extension.startswith('.'):
-            raise ValueError("target_extension must be a string starting with '.' (e.g., '.log')")
+        rules = self._prepare_rules(source_extension, target_extension, num_digits, desired_final_name,
+                                    original_name_slice, extension_map, template)
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("workers must be a positive integer.")
+        if target_directory is not None:
+            if os.path.realpath(target_directory) == os.path.realpath(directory):
+                target_directory = None
+            elif recursive and os.path.realpath(target_directory).startswith(
+                    os.path.join(os.path.realpath(directory), "")):
+                raise ValueError("target_directory must not be inside the directory renamed recursively.")
+
+        first_counters = [1] * len(rules.mappings)
+
+        def plan_directory(dir_path: str, first_counters: List[int]) -> Tuple[List[RenameStep], List[int], List[str]]:
+            # Returns the steps of one directory, the next counter values and the subdirectories
+            listing = self._list_directory(dir_path, rules.source_extensions, recursive)
+            if listing is None:
+                return [], first_counters, []
+            target_dir_path = None
+            if target_directory is not None:
+                target_dir_path = os.path.normpath(os.path.join(target_directory, os.path.relpath(dir_path, directory)))
+            steps, next_counters = self._plan_directory(rules, dir_path, listing, first_counters, target_dir_path)
+            return steps, next_counters, [os.path.join(dir_path, name) for name in listing[2]]
+
+        if not recursive:
+            return plan_directory(directory, first_counters)[0]
+
+        if global_counter or workers == 1:
+            # Depth-first, so that a global counter numbers the tree in a predictable order
+            plan: List[RenameStep] = []
+            counters = first_counters
+            stack = [directory]
+            while stack:
+                steps, next_counters, subdirs = plan_directory(stack.pop(), counters)
+                plan.extend(steps)
+                if global_counter:
+                    counters = next_counters
+                stack.extend(reversed(subdirs))
+            return plan
+
+        plans: Dict[str, List[RenameStep]] = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending: Dict[Future, str] = {executor.submit(plan_directory, directory, first_counters): directory}
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    dir_path = pending.pop(future)
+                    steps, _, subdirs = future.result()
+                    plans[dir_path] = steps
+                    for subdir in subdirs:
+                        pending[executor.submit(plan_directory, subdir, first_counters)] = subdir
+
+        def depth_first_key(dir_path: str) -> Tuple[str, ...]:
+            # Sorting by path components gives the same depth-first order as the serial walk
+            return () if dir_path == directory else tuple(os.path.relpath(dir_path, directory).split(os.sep))
+
+        return [step for dir_path in sorted(plans, key=depth_first_key) for step in plans[dir_path]]
+
+    def watch(
+        self,
+        directory: str,
+        source_extension: Optional[str] = None,
+        target_extension: Optional[str] = None,
+        num_digits: int = 3,
+        desired_final_name: Optional[str] = None,
+        original_name_slice: Optional[Tuple[int, int]] = None,
+        extension_map: Optional[Dict[str, str]] = None,
+        template: Optional[Union[str, RenameTemplate]] = None,
+        target_directory: Optional[str] = None,
+        journal_path: Optional[str] = None,
+        poll_interval: float = 1.0,
+        settle_time: float = 1.0,
+        process_existing: bool = True,
+        stop_event: Optional[threading.Event] = None,
+        max_polls: Optional[int] = None,
+    ) -> Iterator[List[Tuple[str, str]]]:
+        """
+        Watches a directory (not its subdirectories) and renames files as they arrive, by the
+        rules of rename_files().
+
+        Each poll costs one stat of the directory; only when its mtime changed is it listed
+        again, and the listing is compared with the names already seen, so the rules are
+        applied to the newly arrived files only. The counters carry on across batches, and
+        counter values whose name is taken are passed over (unlike rename_files(), which
+        skips the file). A new file is renamed once it has not been modified for settle_time
+        seconds, so that files still being written are left alone.
+
+        Args:
+            directory, source_extension, target_extension, num_digits, desired_final_name,
+            original_name_slice, extension_map, template, target_directory: As rename_files().
+            journal_path: Optional rename journal, written for every batch (see execute_plan()).
+            poll_interval: Seconds between polls.
+            settle_time: Seconds a new file must be unmodified before it is renamed.
+            process_existing: Also rename the matching files present when watching starts.
+            stop_event: Watching stops once this event is set (checked at every poll).
+            max_polls: Stop after this many polls; None watches until stop_event is set.
+
+        Yields:
+            The (old_path, new_path) renames of every batch that renamed something.
+
+        Raises:
+            FileNotFoundError, ValueError, TypeError: As rename_files().
+        """
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"Directory not found: {directory}")
+        rules = self._prepare_rules(source_extension, target_extension, num_digits, desired_final_name,
+                                    original_name_slice, extension_map, template)
+        if poll_interval <= 0:
+            raise ValueError("poll_interval must be positive.")
+        if settle_time < 0:
+            raise ValueError("settle_time must not be negative.")
+        if max_polls is not None and (not isinstance(max_polls, int) or max_polls < 1):
+            raise ValueError("max_polls must be a positive integer or None.")
+        if target_directory is not None and os.path.realpath(target_directory) == os.path.realpath(directory):
+            target_directory = None
+
+        counters = [1] * len(rules.mappings)
+        known_names: Optional[Set[str]] = None # Names already seen (renamed, skipped or not matching)
+        pending_names: Set[str] = set() # New matching files that have not settled yet
+        listing = None
+        last_mtime_ns = None
+        polls = 0
+        while stop_event is None or not stop_event.is_set():
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError as e:
+                print(f"Error reading directory {directory}: {e}")
+                mtime_ns = None
+            if mtime_ns is not None and mtime_ns != last_mtime_ns:
+                new_listing = self._list_directory(directory, rules.source_extensions, False)
+                if new_listing is not None:
+                    # Within the mtime granularity a later arrival may not change the mtime again,
+                    # so a directory modified that recently is listed again at the next poll
+                    if time.time() - mtime_ns / 1e9 > self._MTIME_GRANULARITY:
+                        last_mtime_ns = mtime_ns
+                    listing = new_listing
+                    names_in_directory, extension_index, _ = listing
+                    if known_names is None and not process_existing:
+                        known_names = set(names_in_directory)
+                    known_names = (known_names or set()) & names_in_directory
+                    pending_names &= names_in_directory
+                    new_names = names_in_directory - known_names
+                    known_names |= new_names
+                    pending_names.update(name for source in rules.source_extensions
+                                         for name in extension_index.get(source, ()) if name in new_names)
+
+            settled_names = self._settled_files(directory, pending_names, settle_time) if pending_names else set()
+            if settled_names:
+                pending_names -= settled_names
+                rules.now = datetime.now()
+                plan, counters = self._plan_directory(rules, directory, listing, counters, target_directory,
+                                                      only_names=settled_names, advance_past_taken=True)
+                renamed_files_log = self.execute_plan(plan, journal_path) if plan else []
+                # Keep the listing in step with the renames, so they are not taken for arrivals
+                names_in_directory = listing[0]
+                for old_path, new_path in renamed_files_log:
+                    names_in_directory.discard(os.path.basename(old_path))
+                    known_names.discard(os.path.basename(old_path))
+                    if target_directory is None:
+                        names_in_directory.add(os.path.basename(new_path))
+                        known_names.add(os.path.basename(new_path))
+                if renamed_files_log:
+                    yield renamed_files_log
+
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                break
+            if stop_event is not None:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+
+    @staticmethod
+    def _settled_files(directory: str, names: Set[str], settle_time: float) -> Set[str]:
+        """Returns the files not modified for settle_time seconds; vanished files are dropped from names."""
+        if settle_time == 0:
+            return set(names)
+        settled = set()
+        now = time.time()
+        for name in list(names):
+            try:
+                if now - os.stat(os.path.join(directory, name)).st_mtime >= settle_time:
+                    settled.add(name)
+            except FileNotFoundError:
+                names.discard(name)
+            except OSError as e:
+                print(f"Error reading file '{os.path.join(directory, name)}': {e}")
+        return settled
+
+    @staticmethod
+    def _prepare_rules(source_extension: Optional[str], target_extension: Optional[str], num_digits: int,
+                       desired_final_name: Optional[str], original_name_slice: Optional[Tuple[int, int]],
+                       extension_map: Optional[Dict[str, str]],
+                       template: Optional[Union[str, RenameTemplate]]) -> "_RenameRules":
+        """Validates the naming parameters of rename_files() and bundles them."""
+        if extension_map is None:
+            extension_map = {source_extension: target_extension}
+        elif source_extension is not None or target_extension is not None:
+            raise ValueError("Pass either source_extension and target_extension or extension_map, not both.")
+        elif not isinstance(extension_map, dict) or not extension_map:
+            raise ValueError("extension_map must be a non-empty dict of {source_extension: target_extension}.")
+        mappings: List[Tuple[str, str]] = [] # (lowercase source extension, target extension)
+        for source_extension, target_extension in extension_map.items():
+            if not isinstance(source_extension, str) or not source_extension.startswith('.'):
+                raise ValueError("source_extension must be a string starting with '.' (e.g., '.txt')")
+            if not isinstance(target_extension, str) or not target_extension.startswith('.'):
+                raise ValueError("target_extension must be a string starting with '.' (e.g., '.log')")
+            if any(source_extension.lower() == source for source, _ in mappings):
+                raise ValueError(f"Source extension '{source_extension}' is mapped more than once.")
+            mappings.append((source_extension.lower(), target_extension))
         if not isinstance(num_digits, int) or num_digits <= 0:
             raise ValueError("num_digits must be a positive integer.")
         if desired_final_name is not None and not isinstance(desired_final_name, str):
@@ -57,77 +366,532 @@ class BatchFileRenamer:
                     isinstance(original_name_slice[0], int) and isinstance(original_name_slice[1], int) and
                     0 < original_name_slice[0] <= original_name_slice[1]):
                 raise ValueError("original_name_slice must be a tuple of two positive integers (start, end) with start <= end.")
+        if template is not None:
+            if desired_final_name is not None or original_name_slice is not None:
+                raise ValueError("template cannot be combined with desired_final_name or original_name_slice.")
+            if isinstance(template, str):
+                template = RenameTemplate(template, num_digits=num_digits)
+            elif not isinstance(template, RenameTemplate):
+                raise TypeError("template must be a string, a RenameTemplate or None.")
+        return _RenameRules(mappings, num_digits, desired_final_name, original_name_slice, template)
+
+    def _plan_directory(self, rules: "_RenameRules", dir_path: str,
+                        listing: Tuple[Set[str], Dict[str, List[str]], List[str]], first_counters: List[int],
+                        target_dir_path: Optional[str] = None, only_names: Optional[Set[str]] = None,
+                        advance_past_taken: bool = False) -> Tuple[List[RenameStep], List[int]]:
+        """
+        Plans the renames of one listed directory (see _list_directory()), into target_dir_path
+        if given, and returns the steps and the next counter values. With only_names, only
+        those files are renamed; the others keep their names.
+        """
+        names_in_directory, extension_index, _ = listing
+        candidate_groups = []
+        for source_extension, _ in rules.mappings:
+            filenames = extension_index.get(source_extension, ())
+            if only_names is not None:
+                filenames = [filename_full for filename_full in filenames if filename_full in only_names]
+            # Sort to process files in a predictable order, helpful for sequential numbering
+            filenames = sorted(filenames)
+            if rules.template is None:
+                candidate_groups.append([(filename_full, filename_full[:-len(source_extension)], None, None)
+                                         for filename_full in filenames])
+            else:
+                candidate_groups.append(self._template_candidates(dir_path, filenames, len(source_extension),
+                                                                  rules.template))
+        if target_dir_path is None:
+            candidate_names = {candidate[0] for group in candidate_groups for candidate in group}
+            name_key = self._name_key(dir_path, names_in_directory)
+            moves, next_counters = self._assign_new_names(dir_path, names_in_directory - candidate_names,
+                                                          candidate_groups, rules.target_extensions,
+                                                          rules.build_new_filename, first_counters,
+                                                          advance_past_taken=advance_past_taken, name_key=name_key)
+            return self._order_moves(dir_path, moves, names_in_directory, name_key), next_counters
+        try:
+            names_in_target = set(os.listdir(target_dir_path))
+            name_key = self._name_key(target_dir_path, names_in_target)
+        except FileNotFoundError:
+            # Created by the first move; most likely on the filesystem of the source
+            names_in_target = set()
+            name_key = self._name_key(dir_path, names_in_directory)
+        except OSError as e:
+            print(f"Error listing directory {target_dir_path}: {e}")
+            return [], first_counters
+        moves, next_counters = self._assign_new_names(target_dir_path, names_in_target, candidate_groups,
+                                                      rules.target_extensions, rules.build_new_filename,
+                                                      first_counters, in_place=False,
+                                                      advance_past_taken=advance_past_taken, name_key=name_key)
+        steps = [(os.path.join(dir_path, old_filename), os.path.join(target_dir_path, new_filename))
+                 for old_filename, new_filename in moves.items()]
+        return steps, next_counters
+
+    def execute_plan(self, plan: List[RenameStep], journal_path: Optional[str] = None,
+                     workers: int = 1) -> List[Tuple[str, str]]:
+        """
+        Renames the steps of a plan in order. A step that fails is reported and skipped,
+        together with the steps that would rename onto the path it did not free. A step
+        whose target exists when it is reached (e.g. a file created after planning) fails
+        instead of overwriting it; the journal is then kept for resume() or rollback().
+
+        Args:
+            plan: (old_path, new_path) steps, e.g. from plan_renames().
+            journal_path: Optional path of a rename journal, written before the first rename
+                          and removed once every step has succeeded.
+            workers: Threads renaming in parallel. The steps of one directory always run in
+                     order on one thread. Moves to other directories are independent of each
+                     other and run on at least max_concurrent_copies threads.
+
+        Returns:
+            The (old_path, new_path) renames made, with the steps of a file through a
+            temporary name merged into one.
+        """
+        journal = None
+        if journal_path is not None:
+            journal = RenameJournal(journal_path)
+            journal.start(plan)
+        return self._run_plan(plan, set(), journal, workers)
+
+    def resume(self, journal_path: str, workers: int = 1) -> List[Tuple[str, str]]:
+        """
+        Continues an interrupted run from its journal (on workers threads, as execute_plan()).
+
+        Returns:
+            All (old_path, new_path) steps of the plan that are renamed now, including those
+            renamed before the interruption.
 
+        Raises:
+            FileNotFoundError: If the journal does not exist.
+            ValueError: If the file is not a rename journal.
+        """
+        journal = RenameJournal(journal_path)
+        plan, completed = journal.load()
+        return self._run_plan(plan, completed, journal, workers)
+
+    def rollback(self, journal_path: str) -> List[Tuple[str, str]]:
+        """
+        Undoes the completed steps of an interrupted run in reverse order and removes its journal.
+
+        Returns:
+            The (new_path, old_path) renames made to undo the run.
+
+        Raises:
+            FileNotFoundError: If the journal does not exist.
+            ValueError: If the file is not a rename journal.
+        """
+        journal = RenameJournal(journal_path)
+        plan, completed = journal.load()
+        journal.close()
+        reverted_files_log: List[Tuple[str, str]] = []
+        for index in sorted(completed, reverse=True):
+            original_filepath, new_filepath = plan[index]
+            if self._target_taken(new_filepath, original_filepath):
+                print(f"Error reverting rename of '{original_filepath}' to '{new_filepath}': "
+                      f"'{original_filepath}' exists again.")
+                continue
+            try:
+                self._move(new_filepath, original_filepath)
+                reverted_files_log.append((new_filepath, original_filepath))
+            except OSError as e:
+                print(f"Error reverting rename of '{original_filepath}' to '{new_filepath}': {e}")
+        journal.finish()
+        return reverted_files_log
+
+    def _run_plan(self, plan: List[RenameStep], completed: Set[int], journal: Optional[RenameJournal],
+                  workers: int = 1) -> List[Tuple[str, str]]:
+        """
+        Renames the steps of the plan that are not completed yet, journaling each one, with
+        independent groups of steps on up to workers threads.
+        """
+        if any(os.path.dirname(old_path) != os.path.dirname(new_path) for old_path, new_path in plan):
+            # Moves to other directories may become copies; run as many as may copy at once
+            workers = max(workers, self._mover.max_concurrent_copies)
+        groups = self._group_steps(plan) if workers > 1 else [range(len(plan))]
+        try:
+            if len(groups) <= 1:
+                results = [self._run_steps(plan, group, completed, journal) for group in groups]
+            else:
+                with ThreadPoolExecutor(max_workers=min(workers, len(groups))) as executor:
+                    results = list(executor.map(lambda group: self._run_steps(plan, group, completed, journal),
+                                                groups))
+        except BaseException:
+            # Keep the journal of an interrupted run for resume() or rollback()
+            if journal is not None:
+                journal.close()
+            raise
+        renamed_files_log = [entry for log, _ in results for entry in log]
+        if journal is not None:
+            if any(failed for _, failed in results):
+                # Failed steps may have stranded files under temporary names
+                print(f"Some renames failed; keeping journal '{journal.filepath}' for resume() or rollback().")
+                journal.close()
+            else:
+                journal.finish()
+        return renamed_files_log
+
+    def _move(self, old_path: str, new_path: str) -> None:
+        """Renames within a directory, or moves (across filesystems if need be) to another one."""
+        if os.path.dirname(old_path) == os.path.dirname(new_path):
+            os.rename(old_path, new_path)
+        else:
+            self._mover.move(old_path, new_path)
+
+    @staticmethod
+    def _target_taken(old_path: str, new_path: str) -> bool:
+        """
+        True if new_path exists and is not old_path itself (as it is for a change of case on a
+        case-insensitive filesystem). Checked right before each rename, so that nothing
+        created since planning is overwritten.
+        """
+        try:
+            new_stat = os.lstat(new_path)
+        except OSError:
+            return False # Missing, or the rename itself reports the error
+        if os.path.dirname(old_path) != os.path.dirname(new_path) or \
+                os.path.basename(old_path).casefold() != os.path.basename(new_path).casefold():
+            return True
+        try:
+            old_stat = os.lstat(old_path)
+        except OSError:
+            return False
+        return (new_stat.st_dev, new_stat.st_ino) != (old_stat.st_dev, old_stat.st_ino)
+
+    @staticmethod
+    def _group_steps(plan: List[RenameStep]) -> List[List[int]]:
+        """
+        Splits the step indices of a plan into independent groups, in plan order. Renames
+        within one directory form one group per directory; a move to another directory is a
+        group of its own. Groups touching a common path are merged, so steps that depend on
+        each other always run in order on one thread.
+        """
+        parents: Dict[tuple, tuple] = {}
+
+        def find(key: tuple) -> tuple:
+            root = key
+            while parents.get(root, root) != root:
+                root = parents[root]
+            while key != root:
+                parents[key], key = root, parents[key]
+            return root
+
+        step_keys = []
+        path_owners: Dict[str, tuple] = {}
+        for index, (original_filepath, new_filepath) in enumerate(plan):
+            dir_path = os.path.dirname(original_filepath)
+            key = ("dir", dir_path) if os.path.dirname(new_filepath) == dir_path else ("step", index)
+            step_keys.append(key)
+            for path in (original_filepath, new_filepath):
+                owner = find(path_owners.setdefault(path, key))
+                if owner != find(key):
+                    parents[find(key)] = owner
+        groups: Dict[tuple, List[int]] = {}
+        for index, key in enumerate(step_keys):
+            groups.setdefault(find(key), []).append(index)
+        return list(groups.values())
+
+    def _run_steps(self, plan: List[RenameStep], indices, completed: Set[int],
+                   journal: Optional[RenameJournal]) -> Tuple[List[Tuple[str, str]], bool]:
+        """
+        Renames the given steps of the plan in order. Consecutive steps of one file (through
+        a temporary name) are logged as one rename.
+
+        Returns:
+            The renames made and whether any step failed.
+        """
         renamed_files_log: List[Tuple[str, str]] = []
-        counter = 1
+        log_positions: Dict[str, int] = {} # new_path -> position of its entry in the log
+        # Paths still occupied by a file whose step failed; renaming onto them would overwrite it
+        blocked_paths: Set[str] = set()
+        for index in indices:
+            original_filepath, new_filepath = plan[index]
+            if index not in completed:
+                if new_filepath in blocked_paths:
+                    print(f"Skipping rename of '{original_filepath}': '{new_filepath}' was not freed.")
+                    blocked_paths.add(original_filepath)
+                    continue
+                if self._target_taken(original_filepath, new_filepath):
+                    print(f"Error renaming file '{original_filepath}' to '{new_filepath}': the target exists.")
+                    blocked_paths.add(original_filepath)
+                    continue
+                if journal is not None:
+                    journal.begin(index)
+                try:
+                    self._move(original_filepath, new_filepath)
+                except OSError as e:
+                    print(f"Error renaming file '{original_filepath}' to '{new_filepath}': {e}")
+                    blocked_paths.add(original_filepath)
+                    continue
+                if journal is not None:
+                    journal.done(index)
+            position = log_positions.pop(original_filepath, None)
+            if position is None:
+                position = len(renamed_files_log)
+                renamed_files_log.append((original_filepath, new_filepath))
+            else:
+                renamed_files_log[position] = (renamed_files_log[position][0], new_filepath)
+            log_positions[new_filepath] = position
+        return renamed_files_log, bool(blocked_paths)
+
+    @staticmethod
+    def _list_directory(directory: str, extensions: Set[str],
+                        with_subdirs: bool) -> Optional[Tuple[Set[str], Dict[str, List[str]], List[str]]]:
+        """
+        Lists a directory in one os.scandir pass. Only entries with one of the (lowercase)
+        extensions are checked for being regular files; DirEntry caches the file type, so
+        this usually needs no stat call.
 
+        Returns:
+            (all names, {extension: names of regular files with it}, sorted names of
+            subdirectories if with_subdirs), or None if the directory cannot be listed.
+        """
+        names: Set[str] = set()
+        extension_index: Dict[str, List[str]] = {}
+        subdir_names = []
         try:
-            # Sort to process files in a predictable order, helpful for sequential numbering
-            files_in_directory = sorted(os.listdir(directory))
+            with os.scandir(directory) as it:
+                for dir_entry in it:
+                    name = dir_entry.name
+                    names.add(name)
+                    # Same extension as os.path.splitext: after the last dot, ignoring leading dots
+                    dot_index = name.rfind('.')
+                    if dot_index > 0 and name[:dot_index].lstrip('.'):
+                        extension = name[dot_index:].lower()
+                        if extension in extensions:
+                            try:
+                                if dir_entry.is_file():
+                                    extension_index.setdefault(extension, []).append(name)
+                                    continue
+                            except OSError:
+                                continue
+                    if with_subdirs and dir_entry.is_dir(follow_symlinks=False):
+                        subdir_names.append(name)
         except OSError as e:
             # Log error or raise a custom exception if preferred
             print(f"Error listing directory {directory}: {e}")
-            return renamed_files_log # Return empty list on directory access error
-
-        for filename_full in files_in_directory:
-            original_filepath = os.path.join(directory, filename_full)
-
-            if not os.path.isfile(original_filepath):
-                continue # Skip directories or other non-file types
-
-            original_name_part, current_extension = os.path.splitext(filename_full)
-
-            # Case-insensitive extension matching
-            if current_extension.lower() == source_extension.lower():
-                name_slice_component = ""
-                if original_name_slice and original_name_part:
-                    # Adjust slice to be 0-indexed for Python slicing
-                    start_index = original_name_slice[0] - 1 
-                    end_index = original_name_slice[1]
-                    # Ensure slice indices are within bounds of the original name part
-                    if 0 <= start_index < len(original_name_part) and start_index < end_index:
-                        name_slice_component = original_name_part[start_index:min(end_index, len(original_name_part))]
-                
-                desired_name_component = desired_final_name if desired_final_name else ""
-                counter_str = str(counter).zfill(num_digits)
-                
-                # Construct the new filename base from available components
-                new_name_parts = []
-                if name_slice_component: # Part from original name
-                    new_name_parts.append(name_slice_component)
-                if desired_name_component: # User-defined name part
-                    new_name_parts.append(desired_name_component)
-                new_name_parts.append(counter_str) # Sequence number
-                
-                # Join parts with underscore, filtering out empty strings from optional components
-                new_filename_base = "_".join(filter(None, new_name_parts))
-                
-                # Fallback if all optional parts are empty, to ensure a filename is generated
-                if not new_filename_base:
-                    # This case should ideally be avoided by ensuring at least one naming component is active
-                    # or by specific logic if desired_final_name and original_name_slice are both None.
-                    # For now, default to a generic name + counter if all other parts are empty.
-                    new_filename_base = f"renamed_file_{counter_str}"
-
-                new_filename_full = new_filename_base + target_extension
-                new_filepath = os.path.join(directory, new_filename_full)
-
-                # Check for naming conflicts before renaming
-                if os.path.exists(new_filepath):
-                    if new_filepath == original_filepath: # Renaming to itself (e.g. only case change on case-insensitive fs)
-                        # This might be desired or an issue depending on OS.
-                        # For now, let's skip if old and new paths are identical to avoid unnecessary operations or errors.
-                        print(f"Skipping rename: '{original_filepath}' would be renamed to itself.")
-                        continue
-                    else:
-                        print(f"Warning: Target file '{new_filepath}' already exists. Skipping rename of '{filename_full}'.")
-                        continue
+            return None
+        subdir_names.sort()
+        return names, extension_index, subdir_names
 
+    @staticmethod
+    def _template_candidates(directory: str, filenames: List[str], extension_length: int,
+                             template: RenameTemplate) -> List[_Candidate]:
+        """Candidates of a template: the files matching its pattern, stat'd only if it uses stat fields."""
+        candidates = []
+        for filename_full in filenames:
+            original_name_part = filename_full[:-extension_length]
+            match = template.match(original_name_part)
+            if match is None and template.regex is not None:
+                continue
+            stat_result = None
+            if template.needs_stat:
                 try:
-                    os.rename(original_filepath, new_filepath)
-                    renamed_files_log.append((original_filepath, new_filepath))
-                    counter += 1
+                    stat_result = os.stat(os.path.join(directory, filename_full))
                 except OSError as e:
-                    print(f"Error renaming file '{original_filepath}' to '{new_filepath}': {e}")
+                    print(f"Error reading file '{os.path.join(directory, filename_full)}': {e}")
+                    continue
+            candidates.append((filename_full, original_name_part, match, stat_result))
+        return candidates
+
+    @staticmethod
+    def _assign_new_names(directory: str, taken_names: Set[str], candidate_groups: List[List[_Candidate]],
+                          target_extensions: List[str],
+                          build_new_filename: Callable[[_Candidate, int, str], Optional[str]],
+                          first_counters: List[int], in_place: bool = True,
+                          advance_past_taken: bool = False,
+                          name_key: Callable[[str], str] = str) -> Tuple[Dict[str, str], List[int]]:
+        """
+        Numbers the candidates (filename, name without extension, ...) of each extension mapping
+        in order, starting at its first counter, and returns the {old filename: new filename}
+        moves and the next counter values. taken_names are the names in the target directory
+        that are not freed by the moves. In place, names of candidates are free unless their
+        file ends up skipped, in which case the numbering is repeated with that name taken as
+        well. A candidate the naming scheme cannot name (an empty name or one with a path
+        separator) is skipped. With advance_past_taken, counter values whose name is taken are
+        passed over instead of skipping the file. Names are compared by their name_key (see
+        _name_key()), so on a case-insensitive filesystem names differing only in case collide.
+        """
+        taken_keys = {name_key(name) for name in taken_names}
+        while True:
+            moves: Dict[str, str] = {}
+            claimed_keys: Set[str] = set()
+            skipped: List[Tuple[str, str]] = []
+            unnamed: List[str] = []
+            counters = []
+            for candidates, target_extension, counter in zip(candidate_groups, target_extensions, first_counters):
+                for candidate in candidates:
+                    filename_full = candidate[0]
+                    own_key = name_key(filename_full) if in_place else None
+                    new_filename_full = build_new_filename(candidate, counter, target_extension)
+                    if new_filename_full is None:
+                        unnamed.append(filename_full)
+                        continue
+                    new_key = name_key(new_filename_full)
+                    is_taken = new_key in claimed_keys or (new_key in taken_keys and new_key != own_key)
+                    if is_taken and advance_past_taken:
+                        # Every taken name can block at most one counter value
+                        for next_counter in range(counter + 1, counter + len(taken_keys) + len(claimed_keys) + 2):
+                            next_filename_full = build_new_filename(candidate, next_counter, target_extension)
+                            if next_filename_full is None:
+                                continue
+                            next_key = name_key(next_filename_full)
+                            if next_key not in claimed_keys and (next_key not in taken_keys or next_key == own_key):
+                                counter, new_filename_full, new_key, is_taken = \
+                                    next_counter, next_filename_full, next_key, False
+                                break
+                    if is_taken:
+                        skipped.append((filename_full, new_filename_full))
+                        continue
+                    claimed_keys.add(new_key)
+                    if not (in_place and new_filename_full == filename_full):
+                        moves[filename_full] = new_filename_full
+                    counter += 1
+                counters.append(counter)
+            if not in_place:
+                break
+            # A skipped file keeps its name, which an earlier file may have claimed
+            blocked_keys = {name_key(filename) for filename, _ in skipped} & claimed_keys
+            blocked_keys.update(name_key(filename) for filename in unnamed if name_key(filename) in claimed_keys)
+            if not blocked_keys:
+                break
+            taken_keys |= blocked_keys
+        for filename_full, new_filename_full in skipped:
+            print(f"Warning: Target file '{os.path.join(directory, new_filename_full)}' already exists. "
+                  f"Skipping rename of '{filename_full}'.")
+        for filename_full in unnamed:
+            print(f"Warning: The naming template gives no valid name for '{os.path.join(directory, filename_full)}'. "
+                  f"Skipping it.")
+        return moves, counters
+
+    @staticmethod
+    def _order_moves(directory: str, moves: Dict[str, str], names_in_directory: Set[str],
+                     name_key: Callable[[str], str] = str) -> List[RenameStep]:
+        """
+        Orders {old filename: new filename} moves into rename steps. Every name (by its
+        name_key) is the target of at most one move, so the moves form disjoint chains and
+        cycles: a chain is renamed from its free end backwards, and a cycle is opened by
+        moving one of its files to a temporary name and closed by moving that file on last.
+        A file whose new name differs from its old one only in case (on a case-insensitive
+        filesystem) is renamed directly.
+        """
+        plan: List[RenameStep] = []
+        targets = {name_key(new_filename): old_filename for old_filename, new_filename in moves.items()}
+        moved_keys = {name_key(old_filename) for old_filename in moves}
+        used_keys = {name_key(name) for name in names_in_directory} | set(targets)
+        temp_counter = 0
+        done: Set[str] = set()
+
+        def unwind(filename: str, stop: Optional[str] = None) -> None:
+            # Renames filename's move, then the move into filename's old name, and so on
+            while filename is not None and filename != stop and filename not in done:
+                done.add(filename)
+                plan.append((os.path.join(directory, filename), os.path.join(directory, moves[filename])))
+                filename = targets.get(name_key(filename))
+
+        # Chains: start at moves whose target is not renamed itself
+        for old_filename, new_filename in moves.items():
+            new_key = name_key(new_filename)
+            if new_key not in moved_keys or new_key == name_key(old_filename):
+                unwind(old_filename)
+        # Whatever is left lies on cycles
+        for old_filename in moves:
+            if old_filename in done:
+                continue
+            while True:
+                temp_counter += 1
+                temp_filename = f".{old_filename}.renaming-{temp_counter}"
+                if name_key(temp_filename) not in used_keys:
+                    break
+            used_keys.add(name_key(temp_filename))
+            done.add(old_filename)
+            temp_filepath = os.path.join(directory, temp_filename)
+            plan.append((os.path.join(directory, old_filename), temp_filepath))
+            unwind(targets[name_key(old_filename)], stop=old_filename)
+            plan.append((temp_filepath, os.path.join(directory, moves[old_filename])))
+        return plan
+
+    @staticmethod
+    def _name_key(directory: str, names: Set[str]) -> Callable[[str], str]:
+        """
+        Returns the function giving the key under which the filesystem of a directory compares
+        names: str.casefold if it is case-insensitive (as by default on Windows and macOS),
+        otherwise str. This is probed with one lstat of a listed name in swapped case, or,
+        if no name has ASCII letters, with a temporary file.
+        """
+        for name in names:
+            swapped_name = name.swapcase()
+            if name.isascii() and swapped_name != name and swapped_name not in names:
+                return str.casefold if os.path.lexists(os.path.join(directory, swapped_name)) else str
+        try:
+            fd, probe_path = tempfile.mkstemp(prefix=".case-probe-", dir=directory)
+        except OSError:
+            return str
+        try:
+            os.close(fd)
+            probe_dir, probe_name = os.path.split(probe_path)
+            return str.casefold if os.path.lexists(os.path.join(probe_dir, probe_name.upper())) else str
+        finally:
+            os.remove(probe_path)
+
+    @staticmethod
+    def _build_new_filename(original_name_part: str, counter: int, target_extension: str, num_digits: int,
+                            desired_final_name: Optional[str],
+                            original_name_slice: Optional[Tuple[int, int]]) -> str:
+        """Builds the new filename (with extension) of one file."""
+        name_slice_component = ""
+        if original_name_slice and original_name_part:
+            # Adjust slice to be 0-indexed for Python slicing
+            start_index = original_name_slice[0] - 1 
+            end_index = original_name_slice[1]
+            # Ensure slice indices are within bounds of the original name part
+            if 0 <= start_index < len(original_name_part) and start_index < end_index:
+                name_slice_component = original_name_part[start_index:min(end_index, len(original_name_part))]
+        
+        desired_name_component = desired_final_name if desired_final_name else ""
+        counter_str = str(counter).zfill(num_digits)
         
-        return renamed_files_log 
\ No newline at end of file
+        # Construct the new filename base from available components
+        new_name_parts = []
+        if name_slice_component: # Part from original name
+            new_name_parts.append(name_slice_component)
+        if desired_name_component: # User-defined name part
+            new_name_parts.append(desired_name_component)
+        new_name_parts.append(counter_str) # Sequence number
+        
+        # Join parts with underscore, filtering out empty strings from optional components
+        new_filename_base = "_".join(filter(None, new_name_parts))
+        
+        # Fallback if all optional parts are empty, to ensure a filename is generated
+        if not new_filename_base:
+            # This case should ideally be avoided by ensuring at least one naming component is active
+            # or by specific logic if desired_final_name and original_name_slice are both None.
+            # For now, default to a generic name + counter if all other parts are empty.
+            new_filename_base = f"renamed_file_{counter_str}"
+
+        return new_filename_base + target_extension
+
+
+class _RenameRules:
+    """The validated naming parameters of one rename run."""
+
+    __slots__ = ("mappings", "source_extensions", "target_extensions", "num_digits", "desired_final_name",
+                 "original_name_slice", "template", "now")
+
+    def __init__(self, mappings: List[Tuple[str, str]], num_digits: int, desired_final_name: Optional[str],
+                 original_name_slice: Optional[Tuple[int, int]], template: Optional[RenameTemplate]):
+        self.mappings = mappings # (lowercase source extension, target extension)
+        self.source_extensions = {source for source, _ in mappings}
+        self.target_extensions = [target for _, target in mappings]
+        self.num_digits = num_digits
+        self.desired_final_name = desired_final_name
+        self.original_name_slice = original_name_slice
+        self.template = template
+        self.now = datetime.now() # {now} of the template; refreshed by watch() for every batch
+
+    def build_new_filename(self, candidate: _Candidate, counter: int, target_extension: str) -> Optional[str]:
+        """Builds the new filename of a candidate, or None if the template gives no valid name."""
+        if self.template is None:
+            return BatchFileRenamer._build_new_filename(candidate[1], counter, target_extension, self.num_digits,
+                                                        self.desired_final_name, self.original_name_slice)
+        new_filename_base = self.template.formatter(candidate[1], counter, candidate[2], candidate[3], self.now)
+        if not new_filename_base or os.sep in new_filename_base or \
+                (os.altsep is not None and os.altsep in new_filename_base):
+            return None
+        return new_filename_base + target_extension
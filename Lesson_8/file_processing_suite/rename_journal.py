@@ -0,0 +1,105 @@
+"""
+On-disk journal that makes BatchFileRenamer runs resumable and reversible.
+
+The journal is a single text file:
+
+    line 1          a JSON header holding the whole rename plan, a list of
+                    (old_path, new_path) steps in execution order
+    following lines one short record per state change of a step:
+                        b <index>   the step is about to be renamed
+                        d <index>   the step was renamed
+
+Records are appended with one unbuffered write each, so the journal survives a crash of
+the renaming process. A step with a "b" but no "d" record may or may not have been
+renamed; only those steps are checked on disk when the journal is loaded again. The
+journal is removed once the plan has been executed (or rolled back) completely.
+"""
+import json
+import os
+from typing import List, Optional, Set, Tuple
+
+# One step of a rename plan: (old_path, new_path)
+RenameStep = Tuple[str, str]
+
+
+class RenameJournal:
+    """Reads and writes the journal of one rename plan."""
+
+    _FORMAT = "file_processing_suite.rename_journal"
+    _VERSION = 1
+
+    def __init__(self, filepath: str):
+        """
+        Args:
+            filepath: Path of the journal file.
+        """
+        self.filepath = filepath
+        self._fd: Optional[int] = None
+
+    def start(self, plan: List[RenameStep]) -> None:
+        """Writes a new journal for the plan, replacing any existing one."""
+        os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+        header = {"format": self._FORMAT, "version": self._VERSION, "plan": plan}
+        with open(self.filepath, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+        self._open()
+
+    def load(self) -> Tuple[List[RenameStep], Set[int]]:
+        """
+        Reads the journal and reopens it for appending.
+
+        Returns:
+            The plan and the indices of its completed steps. Steps that were begun but not
+            recorded as done are resolved on disk: they count as completed if their old path
+            is gone and their new path exists.
+
+        Raises:
+            FileNotFoundError: If the journal does not exist.
+            ValueError: If the file is not a rename journal of this version.
+        """
+        with open(self.filepath, 'r', encoding='utf-8') as f:
+            try:
+                header = json.loads(f.readline())
+            except json.JSONDecodeError as e:
+                raise ValueError(f"'{self.filepath}' is not a rename journal: {e}") from e
+            if not isinstance(header, dict) or header.get("format") != self._FORMAT or \
+                    header.get("version") != self._VERSION:
+                raise ValueError(f"'{self.filepath}' is not a rename journal of version {self._VERSION}.")
+            plan = [(old_path, new_path) for old_path, new_path in header["plan"]]
+            begun: Set[int] = set()
+            done: Set[int] = set()
+            for line in f:
+                # A torn last record (crash during the write) is ignored
+                kind, _, index = line.strip().partition(" ")
+                if not index.isdigit():
+                    continue
+                (done if kind == "d" else begun).add(int(index))
+        for index in begun - done:
+            old_path, new_path = plan[index]
+            if not os.path.lexists(old_path) and os.path.lexists(new_path):
+                done.add(index)
+        self._open()
+        return plan, done
+
+    def begin(self, index: int) -> None:
+        """Records that a step is about to be renamed."""
+        os.write(self._fd, b"b %d\n" % index)
+
+    def done(self, index: int) -> None:
+        """Records that a step was renamed."""
+        os.write(self._fd, b"d %d\n" % index)
+
+    def finish(self) -> None:
+        """Closes and removes the journal of a completed plan."""
+        self.close()
+        if os.path.exists(self.filepath):
+            os.remove(self.filepath)
+
+    def close(self) -> None:
+        """Closes the journal, keeping it for a later resume or rollback."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _open(self) -> None:
+        self._fd = os.open(self.filepath, os.O_WRONLY | os.O_APPEND)
@@ -0,0 +1,145 @@
+"""
+Naming templates for BatchFileRenamer, compiled once into a fast formatter.
+
+A template is ordinary text with fields in braces, in str.format syntax:
+
+    {name}          the original name without its extension
+    {counter}       the sequential counter, zero-padded to num_digits; {counter:05}
+                    pads to 5 digits, any other spec is an int format spec
+    {0}, {1}, ...   the whole match and the capture groups of the template's regex
+    {year}          a named capture group (named groups take precedence over the
+                    other field names)
+    {size}          the file size in bytes
+    {mtime}         the modification, status change or access date of the file,
+    {ctime}         formatted with a strftime spec, e.g. {mtime:%Y-%m-%d}
+    {atime}         (default %Y%m%d)
+    {now}           the date of the run, formatted like the file dates
+
+Text fields (name, groups) accept str format specs such as {name:.8} (first 8
+characters). "{{" and "}}" are literal braces.
+
+The template is translated into the source of one Python function that concatenates
+literals and field expressions, and compiled once; formatting a name is then a single
+function call. Literal text only ever enters that source through repr(), and field names
+and specs are validated while parsing.
+"""
+import re
+import string
+from datetime import datetime
+from typing import Callable, List, Optional
+
+_TEXT_FIELDS = {"name": "name"}
+_STAT_DATE_FIELDS = {"mtime": "stat.st_mtime", "ctime": "stat.st_ctime", "atime": "stat.st_atime"}
+_DEFAULT_DATE_FORMAT = "%Y%m%d"
+
+
+class RenameTemplate:
+    """A parsed and compiled naming template."""
+
+    def __init__(self, template: str, pattern: Optional[str] = None, num_digits: int = 3):
+        """
+        Args:
+            template: The template text; the new name is built from it without the extension.
+            pattern: Optional regular expression searched in the original name (without
+                     extension); its groups are available as fields. Files whose name does
+                     not match are not renamed.
+            num_digits: Default zero-padding of {counter}.
+
+        Raises:
+            ValueError: If the template or the pattern is invalid, or refers to an unknown
+                        field or capture group.
+        """
+        if not isinstance(template, str) or not template:
+            raise ValueError("template must be a non-empty string.")
+        if not isinstance(num_digits, int) or num_digits <= 0:
+            raise ValueError("num_digits must be a positive integer.")
+        try:
+            self.regex = re.compile(pattern) if pattern is not None else None
+        except re.error as e:
+            raise ValueError(f"Invalid template pattern '{pattern}': {e}") from e
+        self.template = template
+        self.pattern = pattern
+        self.needs_stat = False
+        expressions = self._parse(template, num_digits)
+        source = "def _format(name, counter, match, stat, now):\n    return " + (" + ".join(expressions) or "''")
+        namespace = {"_format_value": format, "_from_timestamp": datetime.fromtimestamp}
+        exec(compile(source, f"<rename template {template!r}>", "exec"), namespace)
+        # The compiled function (name, counter, match, stat, now) -> str, for hot loops
+        self.formatter: Callable = namespace["_format"]
+
+    def match(self, name: str) -> Optional[re.Match]:
+        """Searches the template's regex in a name; without a regex every name matches (with None)."""
+        return self.regex.search(name) if self.regex is not None else None
+
+    def format(self, name: str, counter: int, match: Optional[re.Match] = None, stat=None,
+               now: Optional[datetime] = None) -> str:
+        """
+        Builds a new name (without extension).
+
+        Args:
+            name: The original name without its extension.
+            counter: The counter value of the file.
+            match: The result of match(name), if the template has a regex.
+            stat: os.stat_result of the file, if needs_stat.
+            now: The date of the run, if the template uses {now}.
+        """
+        return self.formatter(name, counter, match, stat, now)
+
+    def _parse(self, template: str, num_digits: int) -> List[str]:
+        """Translates the template into Python expressions whose concatenation is the new name."""
+        group_count = self.regex.groups if self.regex is not None else -1
+        group_names = self.regex.groupindex if self.regex is not None else {}
+        expressions = []
+        try:
+            parsed = list(string.Formatter().parse(template))
+        except ValueError as e:
+            raise ValueError(f"Invalid template '{template}': {e}") from e
+        for literal, field, spec, conversion in parsed:
+            if literal:
+                expressions.append(repr(literal))
+            if field is None:
+                continue
+            if conversion is not None or "{" in spec:
+                raise ValueError(f"Invalid template field '{{{field}}}': conversions and nested fields are not supported.")
+            expressions.append(self._compile_field(field, spec, num_digits, group_count, group_names))
+        return expressions
+
+    def _compile_field(self, field: str, spec: str, num_digits: int, group_count: int, group_names) -> str:
+        if field.isdigit() or field in group_names:
+            if field.isdigit() and int(field) > group_count:
+                raise ValueError(f"Template field '{{{field}}}' refers to a capture group the pattern does not have.")
+            group = int(field) if field.isdigit() else field
+            return self._text_expression(f"(match[{group!r}] or '')", spec, field)
+        if field in _TEXT_FIELDS:
+            return self._text_expression(_TEXT_FIELDS[field], spec, field)
+        if field == "counter":
+            if spec == "" or (spec.isdigit() and spec.startswith("0")):
+                width = int(spec) if spec else num_digits
+                return f"str(counter).zfill({width})"
+            self._check_spec(0, spec, field)
+            return f"_format_value(counter, {spec!r})"
+        if field == "size":
+            self.needs_stat = True
+            if not spec:
+                return "str(stat.st_size)"
+            self._check_spec(0, spec, field)
+            return f"_format_value(stat.st_size, {spec!r})"
+        if field in _STAT_DATE_FIELDS:
+            self.needs_stat = True
+            return f"_from_timestamp({_STAT_DATE_FIELDS[field]}).strftime({spec or _DEFAULT_DATE_FORMAT!r})"
+        if field == "now":
+            return f"now.strftime({spec or _DEFAULT_DATE_FORMAT!r})"
+        raise ValueError(f"Unknown template field '{{{field}}}'.")
+
+    def _text_expression(self, expression: str, spec: str, field: str) -> str:
+        if not spec:
+            return expression
+        self._check_spec("", spec, field)
+        return f"_format_value({expression}, {spec!r})"
+
+    @staticmethod
+    def _check_spec(sample, spec: str, field: str) -> None:
+        try:
+            format(sample, spec)
+        except ValueError as e:
+            raise ValueError(f"Invalid format spec '{spec}' for template field '{field}': {e}") from e
@@ -0,0 +1,125 @@
+"""
+On-disk checkpoints that make long DirectoryScanner runs resumable.
+
+A checkpoint consists of two files:
+
+    <path>           the traversal state: the stack of directories still being walked
+                     (with their listed subdirectories and sizes aggregated so far) and
+                     the length of the journal it belongs to; replaced atomically
+    <path>.journal   an append-only stream of pickled (entries, listing) records, one per
+                     traversal step, holding every entry emitted so far and the
+                     ScanSnapshot listing recorded in that step (if any)
+
+Appending to the journal costs one small write per directory, so checkpointing does not
+rewrite the entries already emitted. On resume the journal is cut back to the length
+recorded in the checkpoint, replayed, and the walk continues from the saved stack; no
+completed subtree is listed again. Both files are removed once the scan completes.
+"""
+import os
+import pickle
+from typing import IO, Iterator, List, Optional, Tuple
+
+# State of one directory on the traversal stack:
+# (name, path, parent_directory, subdirs [(name, abs_path)], next_subdir, size_bytes)
+StackState = List[Tuple[str, str, str, List[Tuple[str, str]], int, int]]
+
+
+class ScanCheckpoint:
+    """Reads and writes the checkpoint of one scan."""
+
+    _FORMAT = "file_processing_suite.scan_checkpoint"
+    _VERSION = 2
+
+    def __init__(self, filepath: str, root_dir: str, filter_key: Optional[tuple] = None, resume: bool = False):
+        """
+        Args:
+            filepath: Path of the checkpoint file; the journal is written next to it.
+            root_dir: Absolute path of the scanned directory (a checkpoint of another root is not resumed).
+            filter_key: ScanFilter.key of the scan, or None (a checkpoint taken with other filters is not resumed).
+            resume: Continue from an existing checkpoint. Otherwise a new scan starts and
+                    replaces any existing checkpoint.
+        """
+        self.filepath = filepath
+        self.journal_filepath = filepath + ".journal"
+        self._root_dir = root_dir
+        self._filter_key = filter_key
+        self._resume = resume
+        self._journal: Optional[IO[bytes]] = None
+
+    def load_state(self) -> Optional[Tuple[StackState, int]]:
+        """
+        Returns (stack state, journal length) of a resumable checkpoint of this scan, or None
+        when not resuming or when there is none (with a warning if a checkpoint exists but
+        cannot be used).
+        """
+        if not self._resume:
+            return None
+        if not os.path.exists(self.filepath):
+            print(f"Warning: No scan checkpoint to resume at '{self.filepath}'; starting a new scan.")
+            return None
+        try:
+            with open(self.filepath, 'rb') as f:
+                data = pickle.load(f)
+            if not isinstance(data, dict) or data.get("format") != self._FORMAT or data.get("version") != self._VERSION:
+                raise ValueError(f"not a scan checkpoint of version {self._VERSION}")
+            if os.path.getsize(self.journal_filepath) < data["journal_length"]:
+                raise ValueError("its journal is incomplete")
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError) as e:
+            print(f"Warning: Ignoring scan checkpoint '{self.filepath}': {e}")
+            return None
+        if data["root_dir"] != self._root_dir:
+            print(f"Warning: Ignoring scan checkpoint '{self.filepath}': it was taken of '{data['root_dir']}'.")
+            return None
+        if data["filter_key"] != self._filter_key:
+            print(f"Warning: Ignoring scan checkpoint '{self.filepath}': it was taken with different filters.")
+            return None
+        return data["stack"], data["journal_length"]
+
+    def start(self) -> None:
+        """Starts a new journal, discarding any previous checkpoint."""
+        self._remove_checkpoint()
+        os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+        self._journal = open(self.journal_filepath, 'wb')
+
+    def replay(self, journal_length: int) -> Iterator[Tuple[list, Optional[tuple]]]:
+        """
+        Cuts the journal back to the length recorded in the checkpoint and yields its
+        (entries, listing) records; afterwards the journal is open for appending.
+        """
+        with open(self.journal_filepath, 'r+b') as f:
+            f.truncate(journal_length)
+            while f.tell() < journal_length:
+                yield pickle.load(f)
+        self._journal = open(self.journal_filepath, 'ab')
+
+    def append(self, entries: list, listing: Optional[tuple]) -> None:
+        """Journals the entries of one traversal step and the snapshot listing recorded in it."""
+        pickle.dump((entries, listing), self._journal, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def save(self, stack: StackState) -> None:
+        """Writes a checkpoint of the traversal state and everything journaled so far."""
+        self._journal.flush()
+        temp_filepath = self.filepath + ".tmp"
+        with open(temp_filepath, 'wb') as f:
+            pickle.dump(
+                {"format": self._FORMAT, "version": self._VERSION, "root_dir": self._root_dir,
+                 "filter_key": self._filter_key, "journal_length": self._journal.tell(), "stack": stack},
+                f, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(temp_filepath, self.filepath)
+
+    def finish(self) -> None:
+        """Closes the journal and removes the checkpoint of a completed scan."""
+        self.close()
+        self._remove_checkpoint()
+
+    def close(self) -> None:
+        """Closes the journal, keeping the last checkpoint for a later resume."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _remove_checkpoint(self) -> None:
+        for filepath in (self.filepath, self.journal_filepath):
+            if os.path.exists(filepath):
+                os.remove(filepath)
@@ -0,0 +1,155 @@
+"""
+Diff engine for DirectoryScanner results.
+
+Two scans are compared with a sorted merge: both sides are read in path order (by path
+components, the order BinarySnapshotReader.iter_entries_by_path produces) and advanced in
+lockstep, so only the current entry of each side is held in memory. Changes are yielded
+as they are found.
+"""
+import csv
+import gzip
+import json
+import lzma
+import pickle
+from typing import IO, Iterable, Iterator, List, Literal, Optional, Tuple, TypedDict
+
+from .binary_snapshot import BinarySnapshotReader
+from .directory_entry import DirectoryEntry
+
+
+class ScanChange(TypedDict):
+    """One difference between two scans."""
+    change: Literal["added", "removed", "resized"]
+    path: str  # Relative path from the scanned root
+    type: Literal["file", "directory"]
+    old_size_bytes: Optional[int]  # None for added entries
+    new_size_bytes: Optional[int]  # None for removed entries
+    size_delta: int  # new - old, with a missing side counting as 0
+
+
+def path_sort_key(path: str) -> Tuple[bytes, ...]:
+    """Merge order of a relative path: its encoded components, with the root (".") first."""
+    if path == ".":
+        return ()
+    return tuple(component.encode("utf-8", "surrogateescape") for component in path.split("/"))
+
+
+class ScanDiffer:
+    """Compares two scans and reports added, removed and resized entries."""
+
+    def __init__(self):
+        pass
+
+    def iter_changes(
+        self, old_entries: Iterable[DirectoryEntry], new_entries: Iterable[DirectoryEntry]
+    ) -> Iterator[ScanChange]:
+        """
+        Yields the changes from old_entries to new_entries.
+
+        Both inputs must be in path order (see path_sort_key), e.g. from
+        BinarySnapshotReader.iter_entries_by_path() or sort_entries(). Directories whose
+        size_bytes changed are reported as "resized" with their (recursive) size delta.
+        An entry that changed type is reported as removed and added.
+
+        Raises:
+            ValueError: If an input is not in path order.
+        """
+        old_iter = self._checked_order(old_entries, "old")
+        new_iter = self._checked_order(new_entries, "new")
+        old_item = next(old_iter, None)
+        new_item = next(new_iter, None)
+
+        while old_item is not None or new_item is not None:
+            if new_item is None or (old_item is not None and old_item[0] < new_item[0]):
+                yield self._change("removed", old_item[1], None)
+                old_item = next(old_iter, None)
+            elif old_item is None or new_item[0] < old_item[0]:
+                yield self._change("added", None, new_item[1])
+                new_item = next(new_iter, None)
+            else:
+                old_entry, new_entry = old_item[1], new_item[1]
+                if old_entry["type"] != new_entry["type"]:
+                    yield self._change("removed", old_entry, None)
+                    yield self._change("added", None, new_entry)
+                elif old_entry["size_bytes"] != new_entry["size_bytes"]:
+                    yield self._change("resized", old_entry, new_entry)
+                old_item = next(old_iter, None)
+                new_item = next(new_iter, None)
+
+    @staticmethod
+    def sort_entries(entries: Iterable[DirectoryEntry]) -> List[DirectoryEntry]:
+        """Returns the entries sorted into path order, for inputs that are not already sorted."""
+        return sorted(entries, key=lambda entry: path_sort_key(entry["path"]))
+
+    @staticmethod
+    def _checked_order(
+        entries: Iterable[DirectoryEntry], side: str
+    ) -> Iterator[Tuple[Tuple[bytes, ...], DirectoryEntry]]:
+        previous_key = None
+        for entry in entries:
+            key = path_sort_key(entry["path"])
+            if previous_key is not None and key <= previous_key:
+                raise ValueError(f"The {side} scan is not in path order at '{entry['path']}'.")
+            previous_key = key
+            yield key, entry
+
+    @staticmethod
+    def _change(change: str, old_entry: Optional[DirectoryEntry], new_entry: Optional[DirectoryEntry]) -> ScanChange:
+        entry = new_entry if new_entry is not None else old_entry
+        old_size = old_entry["size_bytes"] if old_entry is not None else None
+        new_size = new_entry["size_bytes"] if new_entry is not None else None
+        return {
+            "change": change,  # type: ignore[typeddict-item]
+            "path": entry["path"],
+            "type": entry["type"],
+            "old_size_bytes": old_size,
+            "new_size_bytes": new_size,
+            "size_delta": (new_size or 0) - (old_size or 0)
+        }
+
+
+def _open_text(filepath: str) -> IO[str]:
+    if filepath.endswith(".gz"):
+        return gzip.open(filepath, 'rt', encoding='utf-8', newline='')
+    if filepath.endswith(".xz"):
+        return lzma.open(filepath, 'rt', encoding='utf-8', newline='')
+    return open(filepath, 'r', encoding='utf-8', newline='')
+
+
+def load_entries_by_path(filepath: str) -> Iterator[DirectoryEntry]:
+    """
+    Yields the entries of a saved scan in path order.
+
+    Binary snapshots (.snap) are streamed through mmap with memory bounded by the tree depth.
+    JSON, JSON Lines, CSV and Pickle outputs (optionally .gz / .xz compressed) have no
+    path index, so they are loaded and sorted in memory first.
+
+    Raises:
+        ValueError: If the file extension is not a supported scan output.
+    """
+    name = filepath
+    for suffix in (".gz", ".xz"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+
+    if name.endswith(".snap"):
+        with BinarySnapshotReader(filepath) as reader:
+            yield from reader.iter_entries_by_path()
+        return
+
+    if name.endswith(".jsonl"):
+        with _open_text(filepath) as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+    elif name.endswith(".json"):
+        with _open_text(filepath) as f:
+            entries = json.load(f)
+    elif name.endswith(".csv"):
+        with _open_text(filepath) as f:
+            entries = [dict(row, size_bytes=int(row["size_bytes"])) for row in csv.DictReader(f)]
+    elif name.endswith(".pkl"):
+        opener = gzip.open if filepath.endswith(".gz") else lzma.open if filepath.endswith(".xz") else open
+        with opener(filepath, 'rb') as f:
+            entries = pickle.load(f)
+    else:
+        raise ValueError(f"Unsupported scan file '{filepath}'. Expected .snap, .json, .jsonl, .csv or .pkl.")
+    yield from ScanDiffer.sort_entries(entries)
@@ -0,0 +1,262 @@
+"""
+Single-pass export of scan results to several formats at once.
+
+ScanExporter iterates over the entries once and hands each batch to one writer per
+requested format (JSON, JSON Lines, CSV, Pickle), optionally on a thread per format and
+optionally through gzip or xz compression. It accepts any iterable of entries, so it can
+export straight from DirectoryScanner.iter_scan() as well as from collected data.
+"""
+import csv
+import gzip
+import json
+import lzma
+import os
+import pickle
+import queue
+import threading
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .directory_entry import DirectoryEntry
+
+_FIELDNAMES = list(DirectoryEntry.__annotations__.keys())
+
+
+class _ExportSink(ABC):
+    """Writes batches of entries to one output file. Subclasses implement one format."""
+
+    binary = False
+
+    def __init__(self, output_filepath: str, compression: Optional[str]):
+        self.output_filepath = output_filepath
+        mode = 'wb' if self.binary else 'wt'
+        text_options = {} if self.binary else {"encoding": "utf-8", "newline": ""}
+        if compression == "gzip":
+            # Level 6 is zlib's default trade-off; gzip.open defaults to the much slower 9
+            self._file: IO = gzip.open(output_filepath, mode, compresslevel=6, **text_options)
+        elif compression == "xz":
+            self._file = lzma.open(output_filepath, mode, **text_options)
+        else:
+            self._file = open(output_filepath, mode, **text_options)
+
+    @abstractmethod
+    def write_batch(self, entries: Sequence[DirectoryEntry]) -> None:
+        """Writes a batch of entries in the format of the sink."""
+
+    def finish(self) -> None:
+        """Writes whatever the format needs after the last entry."""
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _JsonSink(_ExportSink):
+    """A JSON array; indent=4 like save_to_json, or one compact entry per line."""
+
+    def __init__(self, output_filepath: str, compression: Optional[str], compact: bool):
+        super().__init__(output_filepath, compression)
+        self._compact = compact
+        self._count = 0
+
+    def write_batch(self, entries: Sequence[DirectoryEntry]) -> None:
+        parts = []
+        for entry in entries:
+            if self._compact:
+                parts.append(",\n" if self._count else "[\n")
+                parts.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+            else:
+                parts.append(",\n    " if self._count else "[\n    ")
+                parts.append(json.dumps(entry, indent=4, ensure_ascii=False).replace("\n", "\n    "))
+            self._count += 1
+        self._file.write("".join(parts))
+
+    def finish(self) -> None:
+        self._file.write("\n]" if self._count else "[]")
+
+
+class _JsonLinesSink(_ExportSink):
+    """One compact JSON object per line."""
+
+    def write_batch(self, entries: Sequence[DirectoryEntry]) -> None:
+        self._file.write("".join(
+            json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n" for entry in entries
+        ))
+
+
+class _CsvSink(_ExportSink):
+    """CSV with a header row, same columns as save_to_csv."""
+
+    def __init__(self, output_filepath: str, compression: Optional[str]):
+        super().__init__(output_filepath, compression)
+        self._writer = csv.DictWriter(self._file, fieldnames=_FIELDNAMES)
+        self._writer.writeheader()
+
+    def write_batch(self, entries: Sequence[DirectoryEntry]) -> None:
+        self._writer.writerows(entries)
+
+
+class _PickleSink(_ExportSink):
+    """
+    A pickled list of entries, loadable with pickle.load like save_to_pickle's output.
+
+    The list is emitted opcode by opcode so it never has to exist in memory: EMPTY_LIST,
+    then MARK <items> APPENDS per batch, then STOP. Each item is pickled on its own with
+    protocol 2 (which has no framing); memo slots reused across items are always written
+    before they are read within the same item, so the overlap is harmless.
+    """
+
+    binary = True
+
+    _PROTOCOL = 2
+
+    def __init__(self, output_filepath: str, compression: Optional[str]):
+        super().__init__(output_filepath, compression)
+        self._file.write(pickle.PROTO + bytes([self._PROTOCOL]) + pickle.EMPTY_LIST)
+
+    def write_batch(self, entries: Sequence[DirectoryEntry]) -> None:
+        # Strip the PROTO header (2 bytes) and the STOP opcode of every item
+        body = b"".join(pickle.dumps(entry, self._PROTOCOL)[2:-1] for entry in entries)
+        self._file.write(pickle.MARK + body + pickle.APPENDS)
+
+    def finish(self) -> None:
+        self._file.write(pickle.STOP)
+
+
+class ScanExporter:
+    """Exports scan entries to several formats in a single pass."""
+
+    FORMATS = ("json", "jsonl", "csv", "pickle")
+    COMPRESSIONS = ("gzip", "xz")
+
+    _EXTENSIONS = {"json": ".json", "jsonl": ".jsonl", "csv": ".csv", "pickle": ".pkl"}
+    _COMPRESSION_EXTENSIONS = {"gzip": ".gz", "xz": ".xz"}
+    _BATCH_SIZE = 1024
+    _QUEUED_BATCHES_PER_FORMAT = 8
+
+    def __init__(
+        self,
+        formats: Sequence[str] = ("json", "csv", "pickle"),
+        compact_json: bool = False,
+        compression: Optional[str] = None,
+        parallel: bool = False,
+    ):
+        """
+        Args:
+            formats: Output formats, any of "json", "jsonl", "csv" and "pickle".
+            compact_json: Write JSON without indentation, one entry per line. Much smaller
+                          and faster than the indent=4 layout of save_to_json.
+            compression: None, "gzip" or "xz". Compressed files get a ".gz" / ".xz" suffix.
+            parallel: Serialize and compress each format on its own thread. Compression
+                      releases the GIL, so this pays off mostly together with `compression`.
+
+        Raises:
+            ValueError: For unknown or duplicate formats or an unknown compression.
+        """
+        if not formats:
+            raise ValueError("At least one export format is required.")
+        unknown_formats = [fmt for fmt in formats if fmt not in self.FORMATS]
+        if unknown_formats:
+            raise ValueError(f"Unknown export format(s): {', '.join(unknown_formats)}. Choose from {', '.join(self.FORMATS)}.")
+        if len(set(formats)) != len(formats):
+            raise ValueError("Export formats must not repeat.")
+        if compression is not None and compression not in self.COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}'. Choose from {', '.join(self.COMPRESSIONS)}.")
+        self._formats = list(formats)
+        self._compact_json = compact_json
+        self._compression = compression
+        self._parallel = parallel
+
+    def output_filepath(self, output_base_path: str, fmt: str) -> str:
+        """Returns the file a format is written to, for a base path without extension."""
+        return output_base_path + self._EXTENSIONS[fmt] + self._COMPRESSION_EXTENSIONS.get(self._compression, "")
+
+    def export(self, entries: Iterable[DirectoryEntry], output_base_path: str) -> Dict[str, str]:
+        """
+        Writes all entries to every configured format, iterating over them only once.
+
+        Args:
+            entries: The entries to export, e.g. get_collected_data() or iter_scan().
+            output_base_path: Output path without extension ("results/home_scan").
+
+        Returns:
+            A dict mapping each format to the file it was written to.
+        """
+        os.makedirs(os.path.dirname(output_base_path) or ".", exist_ok=True)
+        sinks: List[_ExportSink] = []
+        try:
+            for fmt in self._formats:
+                sinks.append(self._open_sink(fmt, self.output_filepath(output_base_path, fmt)))
+            if self._parallel and len(sinks) > 1:
+                self._export_parallel(entries, sinks)
+            else:
+                for batch in self._batches(entries):
+                    for sink in sinks:
+                        sink.write_batch(batch)
+            for sink in sinks:
+                sink.finish()
+        finally:
+            for sink in sinks:
+                sink.close()
+
+        written = {fmt: sink.output_filepath for fmt, sink in zip(self._formats, sinks)}
+        for fmt, output_filepath in written.items():
+            print(f"Successfully exported directory scan to {fmt.upper()}: {output_filepath}")
+        return written
+
+    def _open_sink(self, fmt: str, output_filepath: str) -> _ExportSink:
+        if fmt == "json":
+            return _JsonSink(output_filepath, self._compression, self._compact_json)
+        if fmt == "jsonl":
+            return _JsonLinesSink(output_filepath, self._compression)
+        if fmt == "csv":
+            return _CsvSink(output_filepath, self._compression)
+        return _PickleSink(output_filepath, self._compression)
+
+    def _batches(self, entries: Iterable[DirectoryEntry]) -> Iterator[List[DirectoryEntry]]:
+        iterator = iter(entries)
+        while True:
+            batch = list(islice(iterator, self._BATCH_SIZE))
+            if not batch:
+                return
+            yield batch
+
+    def _export_parallel(self, entries: Iterable[DirectoryEntry], sinks: List[_ExportSink]) -> None:
+        """Feeds every batch to one writer thread per sink; re-raises the first writer error."""
+        queues: List["queue.Queue[Optional[List[DirectoryEntry]]]"] = [
+            queue.Queue(maxsize=self._QUEUED_BATCHES_PER_FORMAT) for _ in sinks
+        ]
+        errors: List[BaseException] = []
+
+        def run_writer(sink: _ExportSink, batches: "queue.Queue[Optional[List[DirectoryEntry]]]") -> None:
+            try:
+                while True:
+                    batch = batches.get()
+                    if batch is None:
+                        return
+                    sink.write_batch(batch)
+            except BaseException as e:
+                errors.append(e)
+                # Keep draining so the producer never blocks on a dead writer
+                while batches.get() is not None:
+                    pass
+
+        threads = [
+            threading.Thread(target=run_writer, args=(sink, batches), name=f"export-{fmt}", daemon=True)
+            for sink, batches, fmt in zip(sinks, queues, self._formats)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for batch in self._batches(entries):
+                if errors:
+                    break
+                for batches in queues:
+                    batches.put(batch)
+        finally:
+            for batches in queues:
+                batches.put(None)
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
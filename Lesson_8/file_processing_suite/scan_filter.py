@@ -0,0 +1,156 @@
+"""
+Filters that DirectoryScanner applies during the walk, not after it.
+
+Excluded directories are never listed and excluded files are never stat'd, so pruning
+node_modules, .git or cache directories saves the syscalls for everything below them.
+
+Patterns follow .gitignore syntax, relative to the scanned root:
+
+    *.log         a name anywhere in the tree (no "/" in the pattern)
+    /build        anchored to the root (a "/" anywhere but at the end anchors a pattern)
+    cache/        a trailing "/" matches directories only
+    docs/**/*.md  "**" matches any number of directories
+    !keep.log     "!" re-includes what an earlier pattern excluded; the last match wins
+
+As in git, nothing below an excluded directory can be re-included.
+"""
+import re
+from typing import List, Optional, Pattern, Sequence, Tuple
+
+
+class _Rule:
+    """One compiled gitignore-style pattern."""
+
+    __slots__ = ("pattern", "regex", "negated", "directories_only", "anchored")
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.negated = pattern.startswith("!")
+        if self.negated:
+            pattern = pattern[1:]
+        elif pattern.startswith("\\"):
+            pattern = pattern[1:]  # "\!name" and "\#name" match a literal "!" / "#"
+        self.directories_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        self.anchored = "/" in pattern
+        self.regex: Pattern[str] = re.compile(_translate(pattern.lstrip("/")))
+
+    def matches(self, relative_path: str, name: str, is_directory: bool) -> bool:
+        if self.directories_only and not is_directory:
+            return False
+        return self.regex.match(relative_path if self.anchored else name) is not None
+
+
+def _translate(pattern: str) -> str:
+    """Translates a gitignore glob (without leading/trailing "/") into a full-match regex."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            content = pattern[i + 1:end]
+            if content.startswith("!"):
+                content = "^" + content[1:]
+            parts.append("[" + content.replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(parts) + r"\Z"
+
+
+def _last_match(rules: List[_Rule], relative_path: str, name: str, is_directory: bool) -> Optional[bool]:
+    """True / False if the last matching rule is a plain / negated one, None if no rule matches."""
+    for rule in reversed(rules):
+        if rule.matches(relative_path, name, is_directory):
+            return not rule.negated
+    return None
+
+
+def _parse_rules(lines: Sequence[str]) -> List[_Rule]:
+    rules = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip()
+        if line and not line.startswith("#"):
+            rules.append(_Rule(line))
+    return rules
+
+
+class ScanFilter:
+    """Include/exclude rules, a depth limit and a minimum file size for DirectoryScanner."""
+
+    def __init__(
+        self,
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        ignore_files: Optional[Sequence[str]] = None,
+        max_depth: Optional[int] = None,
+        min_size: int = 0,
+    ):
+        """
+        Args:
+            include: If given, only files matching at least one of these patterns are
+                     reported. Directories are always descended into unless excluded.
+            exclude: Patterns of files and directories to leave out.
+            ignore_files: Paths of .gitignore-style rule files; their rules are applied
+                          after `exclude`, relative to the scanned root.
+            max_depth: Deepest level reported (1 = the root's direct children). Directories
+                       at this depth are reported but not listed; their size_bytes is still
+                       the total of the files below them that the other rules report.
+            min_size: Files smaller than this many bytes are not reported.
+
+        Directory sizes add up the reported files only.
+
+        Raises:
+            ValueError: If max_depth or min_size is out of range or a rule file cannot be read.
+        """
+        if max_depth is not None and (not isinstance(max_depth, int) or max_depth < 1):
+            raise ValueError("max_depth must be a positive integer.")
+        if min_size < 0:
+            raise ValueError("min_size must not be negative.")
+        self.max_depth = max_depth
+        self.min_size = min_size
+        self._include_rules = _parse_rules(include or [])
+        exclude_lines = list(exclude or [])
+        for ignore_file in ignore_files or []:
+            try:
+                with open(ignore_file, 'r', encoding='utf-8') as f:
+                    exclude_lines.extend(f.readlines())
+            except OSError as e:
+                raise ValueError(f"Cannot read ignore file '{ignore_file}': {e}") from e
+        self._exclude_rules = _parse_rules(exclude_lines)
+
+    @property
+    def key(self) -> Tuple:
+        """A value that is equal for filters selecting the same entries (used to validate snapshots)."""
+        return (
+            tuple(rule.pattern for rule in self._include_rules),
+            tuple(rule.pattern for rule in self._exclude_rules),
+            self.max_depth,
+            self.min_size,
+        )
+
+    def is_excluded(self, relative_path: str, name: str, is_directory: bool) -> bool:
+        """True if the exclude rules leave out an entry (the last matching rule decides)."""
+        return _last_match(self._exclude_rules, relative_path, name, is_directory) is True
+
+    def is_file_included(self, relative_path: str, name: str) -> bool:
+        """True if a file passes the include rules and is not excluded."""
+        if self._include_rules and _last_match(self._include_rules, relative_path, name, False) is not True:
+            return False
+        return not self.is_excluded(relative_path, name, False)
@@ -0,0 +1,160 @@
+"""
+Queryable index over DirectoryScanner results.
+
+Building the index costs one sort of the entries; afterwards the common questions are
+answered without another pass over the data:
+
+    largest(n)           top-n entries by size, from a precomputed size order
+    extension_totals()   file count and bytes per extension, aggregated while building
+    under(prefix)        everything below a directory, via binary search in a sorted path array
+"""
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .directory_entry import DirectoryEntry
+
+
+class ScanIndex:
+    """Read-only index over scan entries, built from any iterable of DirectoryEntry dicts."""
+
+    def __init__(self, entries: Iterable[DirectoryEntry]):
+        """
+        Args:
+            entries: Scan entries in any order, e.g. get_collected_data() or iter_scan()
+                     (the latter builds the index while the scan runs).
+        """
+        rows: List[Tuple[str, bool, int]] = []
+        self._extension_totals: Dict[str, List[int]] = {}
+        self._root_name = ""
+        self._root_parent_name = ""
+
+        for entry in entries:
+            path = entry["path"]
+            is_directory = entry["type"] == "directory"
+            size_bytes = entry["size_bytes"]
+            rows.append((path, is_directory, size_bytes))
+            if path == ".":
+                self._root_name = entry["name"]
+                self._root_parent_name = entry["parent_directory"]
+            elif not is_directory:
+                name = entry["name"]
+                dot = name.rfind(".")
+                # Same rule as os.path.splitext: leading dots do not start an extension
+                extension = name[dot:].lower() if dot > 0 and name[:dot].strip(".") else ""
+                totals = self._extension_totals.get(extension)
+                if totals is None:
+                    self._extension_totals[extension] = [1, size_bytes]
+                else:
+                    totals[0] += 1
+                    totals[1] += size_bytes
+
+        rows.sort()
+        self._paths = [path for path, _, _ in rows]
+        self._sizes = array('q', (size_bytes for _, _, size_bytes in rows))
+        self._directory_bits = bytearray((len(rows) + 7) // 8)
+        for row, (_, is_directory, _) in enumerate(rows):
+            if is_directory:
+                self._directory_bits[row >> 3] |= 1 << (row & 7)
+        del rows
+
+        # Row numbers ordered by size, largest first, per entry type
+        rows_by_size = sorted(range(len(self._paths)), key=self._sizes.__getitem__, reverse=True)
+        self._files_by_size = array('q', (row for row in rows_by_size if not self._is_directory(row)))
+        self._directories_by_size = array('q', (row for row in rows_by_size if self._is_directory(row)))
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def _is_directory(self, row: int) -> bool:
+        return bool(self._directory_bits[row >> 3] & (1 << (row & 7)))
+
+    def _entry(self, row: int) -> DirectoryEntry:
+        path = self._paths[row]
+        if path == ".":
+            name, parent_directory = self._root_name, self._root_parent_name
+        else:
+            parent_directory, _, name = path.rpartition("/")
+            parent_directory = parent_directory or "."
+        return {
+            "name": name,
+            "path": path,
+            "parent_directory": parent_directory,
+            "type": "directory" if self._is_directory(row) else "file",
+            "size_bytes": self._sizes[row]
+        }
+
+    def get(self, path: str) -> Optional[DirectoryEntry]:
+        """Returns the entry for a relative path ("." for the root), or None. O(log n)."""
+        row = bisect_left(self._paths, path)
+        if row < len(self._paths) and self._paths[row] == path:
+            return self._entry(row)
+        return None
+
+    def largest(self, n: int = 10, entry_type: Optional[str] = "file") -> List[DirectoryEntry]:
+        """
+        Returns the n largest entries, largest first.
+
+        Args:
+            n: Number of entries to return.
+            entry_type: "file", "directory", or None for both.
+
+        Raises:
+            ValueError: For an unknown entry_type.
+        """
+        if entry_type == "file":
+            return [self._entry(row) for row in self._files_by_size[:n]]
+        if entry_type == "directory":
+            return [self._entry(row) for row in self._directories_by_size[:n]]
+        if entry_type is None:
+            # Merge the two size orders, which are each already sorted
+            files, directories = self._files_by_size, self._directories_by_size
+            result = []
+            file_pos = directory_pos = 0
+            while len(result) < n and (file_pos < len(files) or directory_pos < len(directories)):
+                take_file = directory_pos >= len(directories) or (
+                    file_pos < len(files) and self._sizes[files[file_pos]] >= self._sizes[directories[directory_pos]]
+                )
+                if take_file:
+                    result.append(self._entry(files[file_pos]))
+                    file_pos += 1
+                else:
+                    result.append(self._entry(directories[directory_pos]))
+                    directory_pos += 1
+            return result
+        raise ValueError("entry_type must be 'file', 'directory' or None.")
+
+    def extension_totals(self, extension: str) -> Tuple[int, int]:
+        """
+        Returns (file_count, total_bytes) of the files with an extension, case-insensitively.
+        Pass "" for files without an extension. The leading dot is optional (".log" or "log").
+        """
+        if extension and not extension.startswith("."):
+            extension = "." + extension
+        count, total_bytes = self._extension_totals.get(extension.lower(), (0, 0))
+        return count, total_bytes
+
+    def extension_summary(self) -> Dict[str, Tuple[int, int]]:
+        """Returns {extension: (file_count, total_bytes)} for all extensions, largest total first."""
+        ordered = sorted(self._extension_totals.items(), key=lambda item: item[1][1], reverse=True)
+        return {extension: (count, total_bytes) for extension, (count, total_bytes) in ordered}
+
+    def _prefix_range(self, directory_path: str) -> Tuple[int, int]:
+        """Returns the row range of the entries below a (non-root) directory."""
+        prefix = directory_path.rstrip("/") + "/"
+        # "/" is followed by "0" in code point order, so [prefix, prefix with "0") spans the subtree
+        return bisect_left(self._paths, prefix), bisect_left(self._paths, prefix[:-1] + "0")
+
+    def under(self, directory_path: str) -> List[DirectoryEntry]:
+        """Returns all entries below a directory (recursively), sorted by path. Use "." for the root."""
+        if directory_path in (".", ""):
+            return [self._entry(row) for row in range(len(self._paths)) if self._paths[row] != "."]
+        start, end = self._prefix_range(directory_path)
+        return [self._entry(row) for row in range(start, end)]
+
+    def count_under(self, directory_path: str) -> int:
+        """Returns the number of entries below a directory (recursively) in O(log n)."""
+        if directory_path in (".", ""):
+            return len(self._paths) - (1 if self.get(".") is not None else 0)
+        start, end = self._prefix_range(directory_path)
+        return end - start
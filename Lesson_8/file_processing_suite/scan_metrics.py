@@ -0,0 +1,133 @@
+"""
+Instrumentation for long-running directory scans.
+
+A ScanMetrics object is handed to DirectoryScanner (and from there to the traversal
+engine). It collects:
+
+    progress    entries, files, directories and file bytes seen so far, reported to an
+                optional callback at a fixed time interval
+    phases      wall-clock and CPU time per named phase ("walk", "sort", "export", ...)
+    counters    os.scandir and stat calls, directories listed or replayed from a
+                snapshot, and errors (unreadable directories, vanished files)
+
+Counters are updated once per directory, not per entry, so instrumentation stays cheap.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional, TypedDict
+
+from .directory_entry import DirectoryEntry
+
+
+class ScanProgress(TypedDict):
+    """Progress of a running scan, as passed to progress callbacks."""
+    entries: int  # Entries (files and directories) yielded so far
+    files: int
+    directories: int
+    bytes: int  # Sum of the sizes of the files seen so far
+    elapsed_seconds: float  # Since the first entry was observed
+    entries_per_sec: float
+    done: bool  # True for the final call once the traversal is exhausted
+
+
+COUNTER_NAMES = ("directories_listed", "directories_reused", "scandir_calls", "stat_calls", "errors")
+
+
+class ScanMetrics:
+    """Collects progress, per-phase timings and syscall/error counters of scans."""
+
+    _PROGRESS_CHECK_EVERY = 256  # entries between clock reads
+
+    def __init__(self, progress_callback: Optional[Callable[[ScanProgress], None]] = None,
+                 progress_interval: float = 1.0):
+        """
+        Args:
+            progress_callback: Called with a ScanProgress at most every progress_interval
+                               seconds while entries are observed, and once more when the
+                               traversal is done. Runs in the thread consuming the scan.
+            progress_interval: Seconds between progress callbacks.
+        """
+        if progress_interval < 0:
+            raise ValueError("progress_interval must not be negative.")
+        self._progress_callback = progress_callback
+        self._progress_interval = progress_interval
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {name: 0 for name in COUNTER_NAMES}
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.entries = 0
+        self.files = 0
+        self.directories = 0
+        self.bytes = 0
+        self._started: Optional[float] = None
+
+    def add(self, **counts: int) -> None:
+        """Adds to one or more counters, e.g. add(scandir_calls=1, stat_calls=12). Thread-safe."""
+        with self._lock:
+            for name, count in counts.items():
+                self.counters[name] = self.counters.get(name, 0) + count
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times the enclosed block as (one run of) a named phase. Thread-safe; time spent in
+        the same phase on several threads at once adds up.
+        """
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            yield
+        finally:
+            wall_seconds = time.perf_counter() - wall_started
+            cpu_seconds = time.process_time() - cpu_started
+            with self._lock:
+                totals = self.phases.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "runs": 0})
+                totals["wall_seconds"] += wall_seconds
+                totals["cpu_seconds"] += cpu_seconds
+                totals["runs"] += 1
+
+    def observe(self, entries: Iterable[DirectoryEntry]) -> Iterator[DirectoryEntry]:
+        """Passes entries through, counting them and reporting progress along the way."""
+        if self._started is None:
+            self._started = time.perf_counter()
+        next_report = time.perf_counter() + self._progress_interval
+        until_check = self._PROGRESS_CHECK_EVERY
+        for entry in entries:
+            self.entries += 1
+            if entry["type"] == "directory":
+                self.directories += 1
+            else:
+                self.files += 1
+                self.bytes += entry["size_bytes"]
+            yield entry
+
+            until_check -= 1
+            if until_check == 0:
+                until_check = self._PROGRESS_CHECK_EVERY
+                if self._progress_callback is not None and time.perf_counter() >= next_report:
+                    self._progress_callback(self.progress())
+                    next_report = time.perf_counter() + self._progress_interval
+        if self._progress_callback is not None:
+            self._progress_callback(self.progress(done=True))
+
+    def progress(self, done: bool = False) -> ScanProgress:
+        """Returns the progress observed so far."""
+        elapsed = time.perf_counter() - self._started if self._started is not None else 0.0
+        return {
+            "entries": self.entries,
+            "files": self.files,
+            "directories": self.directories,
+            "bytes": self.bytes,
+            "elapsed_seconds": elapsed,
+            "entries_per_sec": self.entries / elapsed if elapsed > 0 else 0.0,
+            "done": done
+        }
+
+    def report(self) -> Dict[str, object]:
+        """Returns progress, phase timings and counters as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                "progress": self.progress(done=True),
+                "phases": {name: dict(totals) for name, totals in self.phases.items()},
+                "counters": dict(self.counters)
+            }
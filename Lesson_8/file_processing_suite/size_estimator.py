@@ -0,0 +1,249 @@
+"""
+Approximate directory sizing by sampling, for a quick `du` of trees too large to walk.
+
+The estimate is built in two stages:
+
+    1. exact head   the tree is walked breadth-first until a budget of directories has
+                    been listed; a tree that fits into the budget is sized exactly
+    2. sampling     the unlisted directories left on the breadth-first frontier are
+                    sampled uniformly without replacement, and the subtree of every
+                    sampled directory is walked completely
+
+The frontier total is extrapolated from the mean of the sampled subtrees, and its
+confidence interval follows from their variance (Student's t, with the finite population
+correction), as in simple random sampling of clusters. Every subtree is sized exactly, so
+the spread of the sample is only that between subtrees; random descents into single
+paths (Knuth's estimator) multiply branching factors along the way, and their heavy
+tails made normal intervals far too narrow on deep, skewed trees. Sampling stops at a
+time budget (checked between subtrees, so one very large subtree can overrun it), a
+sample size limit or once the interval is narrow enough; once every frontier subtree
+has been walked, the totals are exact.
+"""
+import os
+import math
+import random
+import time
+from collections import deque
+from statistics import NormalDist
+from typing import Deque, Dict, List, Optional, Tuple, TypedDict
+
+from .scan_metrics import ScanMetrics
+
+
+class SizeEstimate(TypedDict):
+    """Estimated totals of a directory tree."""
+    size_bytes: int  # Estimated total size of all files
+    size_bytes_low: int  # Confidence interval of size_bytes
+    size_bytes_high: int
+    files: int  # Estimated number of files
+    files_low: int
+    files_high: int
+    directories: int  # Estimated number of directories below the root
+    confidence: float  # Confidence level of the intervals, e.g. 0.95
+    exact: bool  # True if the whole tree was listed (the intervals are then empty)
+    probes: int  # Frontier subtrees sampled
+    directories_listed: int  # Distinct directories actually listed
+    elapsed_seconds: float
+
+
+# Per-directory totals of one listing: (file bytes, files, subdirectory paths)
+_Listing = Tuple[int, int, List[str]]
+
+
+class DirectorySizeEstimator:
+    """Estimates the total size and file count of a directory tree from a sample of its subtrees."""
+
+    _MIN_PROBES = 30  # sampled subtrees before an interval is reported
+    _MIN_SKEWNESS_SAMPLES = 25  # Cochran's rule: samples needed per squared skewness for an interval
+    _STOP_TEST_INTERVAL = 16  # sampled subtrees between tests of the early stop (each test is O(samples))
+
+    def __init__(self, time_budget: float = 2.0, max_probes: int = 100000, exact_budget: int = 1000,
+                 target_relative_error: float = 0.02, confidence: float = 0.95, seed: Optional[int] = None,
+                 metrics: Optional[ScanMetrics] = None):
+        """
+        Args:
+            time_budget: Seconds to spend sampling (the exact head is not limited by it).
+            max_probes: Maximum number of frontier subtrees sampled.
+            exact_budget: Directories listed breadth-first before sampling starts. Trees
+                          with at most this many directories are sized exactly.
+            target_relative_error: Sampling stops early once the half-width of the size
+                                   interval is below this fraction of the estimate.
+            confidence: Confidence level of the reported intervals.
+            seed: Seed of the sampling, for reproducible estimates.
+            metrics: Optional ScanMetrics that counts the scandir and stat calls and errors.
+
+        Raises:
+            ValueError: If a budget or the confidence level is out of range.
+        """
+        if time_budget <= 0:
+            raise ValueError("time_budget must be positive.")
+        if not isinstance(max_probes, int) or max_probes < 1:
+            raise ValueError("max_probes must be a positive integer.")
+        if not isinstance(exact_budget, int) or exact_budget < 1:
+            raise ValueError("exact_budget must be a positive integer.")
+        if target_relative_error < 0:
+            raise ValueError("target_relative_error must not be negative.")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1.")
+        self._time_budget = time_budget
+        self._max_probes = max_probes
+        self._exact_budget = exact_budget
+        self._target_relative_error = target_relative_error
+        self._confidence = confidence
+        self._z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self._random = random.Random(seed)
+        self._metrics = metrics
+        self._listings: Dict[str, _Listing] = {}
+        self._scandir_calls = self._stat_calls = self._errors = 0
+
+    def estimate(self, dir_path: str) -> SizeEstimate:
+        """
+        Estimates the size of all regular files within a directory (recursively), counted
+        like ScandirTraversal.directory_size: symlinks are not followed.
+        """
+        started = time.perf_counter()
+        self._listings = {}
+        self._scandir_calls = self._stat_calls = self._errors = 0
+
+        # Stage 1: exact breadth-first head
+        known_bytes = known_files = known_directories = 0
+        frontier: Deque[str] = deque([dir_path])
+        while frontier and len(self._listings) < self._exact_budget:
+            size_bytes, files, subdirs = self._list(frontier.popleft())
+            known_bytes += size_bytes
+            known_files += files
+            known_directories += len(subdirs)
+            frontier.extend(subdirs)
+        if not frontier:
+            self._flush_metrics()
+            return self._result(known_bytes, 0.0, known_files, 0.0, known_directories, True, 0, started)
+
+        # Stage 2: complete walks of frontier subtrees, sampled without replacement
+        population = len(frontier)
+        sample_order = self._random.sample(list(frontier), population)
+        samples: List[Tuple[int, int, int]] = []
+        deadline = started + self._time_budget
+        for subtree_path in sample_order:
+            samples.append(self._walk(subtree_path))
+            count = len(samples)
+            if count == population or count >= self._max_probes or time.perf_counter() >= deadline:
+                break
+            if count >= self._MIN_PROBES and count % self._STOP_TEST_INTERVAL == 0:
+                frontier_bytes, half_width = self._extrapolate([sample[0] for sample in samples], population)
+                if half_width <= self._target_relative_error * (known_bytes + frontier_bytes):
+                    break
+        self._flush_metrics()
+        bytes_sum = sum(sample[0] for sample in samples)
+
+        size_bytes, size_half_width = self._extrapolate([sample[0] for sample in samples], population)
+        files, files_half_width = self._extrapolate([sample[1] for sample in samples], population)
+        directories, _ = self._extrapolate([sample[2] for sample in samples], population)
+        estimate = self._result(known_bytes + size_bytes, size_half_width, known_files + files, files_half_width,
+                                known_directories + directories, len(samples) == population, len(samples), started)
+        # The sampled subtrees are known exactly, which bounds the interval from below
+        estimate["size_bytes_low"] = max(estimate["size_bytes_low"], known_bytes + bytes_sum)
+        estimate["files_low"] = max(estimate["files_low"], known_files + sum(sample[1] for sample in samples))
+        return estimate
+
+    def _walk(self, dir_path: str) -> Tuple[int, int, int]:
+        """Lists a whole subtree: returns the bytes, files and directories below dir_path."""
+        size_bytes = files = directories = 0
+        pending = [dir_path]
+        while pending:
+            node_bytes, node_files, subdirs = self._list(pending.pop())
+            size_bytes += node_bytes
+            files += node_files
+            directories += len(subdirs)
+            pending.extend(subdirs)
+        return size_bytes, files, directories
+
+    def _extrapolate(self, samples: List[int], population: int) -> Tuple[float, float]:
+        """
+        Returns the estimated frontier total and the half-width of its confidence interval.
+        The interval is unbounded (inf) while the sample is too small to judge, or too small
+        for its skewness (Cochran's rule: at least 25 * skewness^2 samples), since the t
+        interval would be too narrow then.
+        """
+        count = len(samples)
+        mean = sum(samples) / count
+        if count == population:
+            return population * mean, 0.0
+        if count < self._MIN_PROBES:
+            return population * mean, math.inf
+        second_moment = sum((sample - mean) ** 2 for sample in samples) / count
+        third_moment = sum((sample - mean) ** 3 for sample in samples) / count
+        skewness = third_moment / second_moment ** 1.5 if second_moment > 0 else 0.0
+        if count < self._MIN_SKEWNESS_SAMPLES * skewness ** 2:
+            return population * mean, math.inf
+        variance = second_moment * count / (count - 1)
+        return population * mean, self._half_width(variance, count, population)
+
+    def _half_width(self, variance: float, count: int, population: int) -> float:
+        """Half-width of the interval of a population total estimated from count of population samples."""
+        finite_population_correction = 1 - count / population
+        return self._t_quantile(count - 1) * population * math.sqrt(variance * finite_population_correction / count)
+
+    def _t_quantile(self, degrees_of_freedom: int) -> float:
+        """Student's t quantile of the confidence level (Cornish-Fisher expansion around the normal one)."""
+        z = self._z
+        n = degrees_of_freedom
+        return z + (z ** 3 + z) / (4 * n) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * n ** 2)
+
+    def _list(self, dir_path: str) -> _Listing:
+        """Lists a directory once; unreadable directories count as empty."""
+        listing = self._listings.get(dir_path)
+        if listing is not None:
+            return listing
+        size_bytes = files = 0
+        subdirs = []
+        self._scandir_calls += 1
+        try:
+            with os.scandir(dir_path) as it:
+                for dir_entry in it:
+                    try:
+                        if dir_entry.is_symlink():
+                            continue
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            subdirs.append(dir_entry.path)
+                        else:
+                            self._stat_calls += 1
+                            size_bytes += dir_entry.stat(follow_symlinks=False).st_size
+                            files += 1
+                    except OSError:
+                        # Vanished or unreadable entries are skipped; the rest of the directory is still read
+                        self._errors += 1
+        except OSError:
+            self._errors += 1
+        listing = (size_bytes, files, subdirs)
+        self._listings[dir_path] = listing
+        return listing
+
+    def _flush_metrics(self) -> None:
+        if self._metrics is not None:
+            self._metrics.add(scandir_calls=self._scandir_calls, stat_calls=self._stat_calls, errors=self._errors)
+
+    def _result(self, size_bytes: float, size_half_width: float, files: float, files_half_width: float,
+                directories: float, exact: bool, probes: int, started: float) -> SizeEstimate:
+        return {
+            "size_bytes": round(size_bytes),
+            "size_bytes_low": _floor(size_bytes - size_half_width),
+            "size_bytes_high": _ceil(size_bytes + size_half_width),
+            "files": round(files),
+            "files_low": _floor(files - files_half_width),
+            "files_high": _ceil(files + files_half_width),
+            "directories": round(directories),
+            "confidence": self._confidence,
+            "exact": exact,
+            "probes": probes,
+            "directories_listed": len(self._listings),
+            "elapsed_seconds": time.perf_counter() - started
+        }
+
+
+# An interval that cannot be given is unbounded (high = -1)
+def _floor(value: float) -> int:
+    return max(0, math.floor(value)) if math.isfinite(value) else 0
+
+
+def _ceil(value: float) -> int:
+    return math.ceil(value) if math.isfinite(value) else -1
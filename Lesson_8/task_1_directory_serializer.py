@@ -5,7 +5,13 @@ This script demonstrates the use of the DirectoryScanner class from the
 file_processing_suite package to scan a directory and save its structure.
 """
 import os
+import json
+import time
+import heapq
 import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 import shutil
 
 # Import from the new package
@@ -18,6 +24,9 @@ import shutil
 # or use a more direct import if the structure allows. Let's assume standard package discovery.
 try:
     from file_processing_suite.directory_scanner import DirectoryScanner
+    from file_processing_suite.scan_exporter import ScanExporter
+    from file_processing_suite.scan_metrics import ScanMetrics
+    from file_processing_suite.scan_filter import ScanFilter
 except ImportError:
     # Fallback for simpler execution context or if path issues arise, e.g. when running script directly from Lesson_8
     # This assumes that file_processing_suite is in the same directory or Python's search path.
@@ -32,6 +41,9 @@ except ImportError:
     if package_parent_dir not in sys.path:
         sys.path.insert(0, package_parent_dir)
     from Lesson_8.file_processing_suite.directory_scanner import DirectoryScanner
+    from Lesson_8.file_processing_suite.scan_exporter import ScanExporter
+    from Lesson_8.file_processing_suite.scan_metrics import ScanMetrics
+    from Lesson_8.file_processing_suite.scan_filter import ScanFilter
 
 
 # The DirectoryEntry TypedDict is defined in directory_scanner module and implicitly used by DirectoryScanner.
@@ -72,6 +84,266 @@ def _cleanup_dummy_dir(dir_path: str):
     else:
         print(f"Cleanup skipped: Path {dir_path} does not exist or is not the expected test directory name.")
 
+def _get_base_output_filename(input_dir: str) -> str:
+    """Returns the base name (without extension) for the output files of a scanned directory."""
+    scanned_dir_name = os.path.basename(os.path.normpath(input_dir))
+    if scanned_dir_name == '.' or not scanned_dir_name: # Handle cases like '.' or './'
+        scanned_dir_name = "current_directory"
+    return f"{scanned_dir_name}_scan"
+
+def _get_output_base_names(input_dirs: List[str]) -> List[str]:
+    """Returns an output base name per scanned directory, numbering names that would collide."""
+    base_names = []
+    seen: Dict[str, int] = {}
+    for input_dir in input_dirs:
+        base_name = _get_base_output_filename(input_dir)
+        seen[base_name] = seen.get(base_name, 0) + 1
+        base_names.append(base_name if seen[base_name] == 1 else f"{base_name}_{seen[base_name]}")
+    return base_names
+
+def _collect_scan_summary(index, top_n: int = 10) -> Dict[str, list]:
+    """Returns the largest directories and files and the extensions taking the most space from a ScanIndex."""
+    return {
+        "largest_directories": [(entry["size_bytes"], entry["path"]) for entry in index.largest(top_n, "directory")],
+        "largest_files": [(entry["size_bytes"], entry["path"]) for entry in index.largest(top_n, "file")],
+        "extensions": [(extension, count, total_bytes)
+                       for extension, (count, total_bytes) in index.extension_summary().items()],
+    }
+
+def _merge_scan_summaries(summaries: List[Tuple[str, Dict[str, list]]], top_n: int = 10) -> Dict[str, list]:
+    """Merges per-root summaries (paths are prefixed with their root) into one summary."""
+    extension_totals: Dict[str, List[int]] = {}
+    for _, summary in summaries:
+        for extension, count, total_bytes in summary["extensions"]:
+            totals = extension_totals.setdefault(extension, [0, 0])
+            totals[0] += count
+            totals[1] += total_bytes
+    return {
+        "largest_directories": heapq.nlargest(top_n, (
+            (size, os.path.join(root, path)) for root, summary in summaries for size, path in summary["largest_directories"]
+        )),
+        "largest_files": heapq.nlargest(top_n, (
+            (size, os.path.join(root, path)) for root, summary in summaries for size, path in summary["largest_files"]
+        )),
+        "extensions": sorted(((extension, count, total_bytes) for extension, (count, total_bytes) in extension_totals.items()),
+                             key=lambda item: item[2], reverse=True),
+    }
+
+def _print_scan_summary(summary: Dict[str, list], top_n: int = 10) -> None:
+    """Prints the largest directories and files and the extensions taking the most space."""
+    print("\nLargest directories:")
+    for size_bytes, path in summary["largest_directories"][:top_n]:
+        print(f"  {size_bytes:>14}  {path}")
+    print("Largest files:")
+    for size_bytes, path in summary["largest_files"][:top_n]:
+        print(f"  {size_bytes:>14}  {path}")
+    print("Extensions by total size:")
+    for extension, count, total_bytes in summary["extensions"][:top_n]:
+        print(f"  {total_bytes:>14}  {extension or '<none>'} ({count} files)")
+
+def _save_duplicates_report(groups, output_filepath: str, top_n: int = 10) -> None:
+    """Saves all duplicate groups to a JSON file and prints the ones wasting the most space."""
+    with open(output_filepath, 'w', encoding='utf-8') as f:
+        json.dump(groups, f, indent=4, ensure_ascii=False)
+    total_wasted = sum(group["wasted_bytes"] for group in groups)
+    print(f"\nDuplicate files waste {total_wasted} bytes in {len(groups)} groups (saved to '{output_filepath}').")
+    for group in groups[:top_n]:
+        print(f"  {group['wasted_bytes']:>14}  {len(group['paths'])} x {group['paths'][0]}")
+
+def _print_progress(progress, label: Optional[str] = None) -> None:
+    """
+    Progress callback: overwrites one status line with the entries, bytes and rate so far.
+    With a label (one of several roots scanned at once), prints a new labelled line instead.
+    """
+    line = (f"Scanned {progress['entries']} entries ({progress['files']} files, {progress['bytes']} bytes) "
+            f"in {progress['elapsed_seconds']:.0f} s, {progress['entries_per_sec']:.0f} entries/s")
+    if label is not None:
+        print(f"[{label}] {line}", flush=True)
+    else:
+        print("\r" + line, end="\n" if progress["done"] else "", flush=True)
+
+def _print_size_estimate(root: str, estimate) -> None:
+    """Prints a SizeEstimate of one root with its confidence intervals."""
+    if estimate["exact"]:
+        print(f"{root}: {estimate['size_bytes']} bytes in {estimate['files']} files "
+              f"(exact, {estimate['directories_listed']} directories listed)")
+        return
+    def bounds(low, high):
+        # high == -1: the sample is too small or too skewed for an upper bound
+        return f"[{low}, no upper bound]" if high == -1 else f"[{low}, {high}]"
+
+    print(f"{root}: ~{estimate['size_bytes']} bytes "
+          f"{bounds(estimate['size_bytes_low'], estimate['size_bytes_high'])} in ~{estimate['files']} files "
+          f"{bounds(estimate['files_low'], estimate['files_high'])}, ~{estimate['directories']} directories "
+          f"({estimate['confidence']:.0%} confidence; {estimate['probes']} subtrees sampled, "
+          f"{estimate['directories_listed']} directories listed in {estimate['elapsed_seconds']:.1f} s)")
+
+
+def _save_timing_report(metrics, output_filepath: str) -> None:
+    """Prints the per-phase timings and counters and saves the full report as JSON."""
+    report = metrics.report()
+    print("\nPhase timings (wall / CPU seconds):")
+    for name, totals in report["phases"].items():
+        print(f"  {name:<24} {totals['wall_seconds']:>10.3f} {totals['cpu_seconds']:>10.3f}")
+    print("Counters: " + ", ".join(f"{name}={count}" for name, count in report["counters"].items()))
+    os.makedirs(os.path.dirname(output_filepath) or ".", exist_ok=True)
+    with open(output_filepath, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(f"Timing report saved to '{output_filepath}'.")
+
+def _scan_root(input_directory_to_scan: str, output_directory_for_results: str, output_base_name: str,
+               args: argparse.Namespace, label: Optional[str] = None) -> Dict[str, object]:
+    """
+    Scans one directory and writes its outputs according to the parsed command line arguments.
+    Runs in a worker process when several directories are scanned at once (then `label` is set).
+
+    Returns a summary of the root for the merged report: entry counts, file bytes, wall time,
+    the largest entries (with --summary), the timing report (with --timing_report) and the
+    error message if the scan failed.
+    """
+    result: Dict[str, object] = {"root": os.path.abspath(input_directory_to_scan), "entries": 0, "files": 0,
+                                 "directories": 0, "file_bytes": 0, "seconds": 0.0, "error": None}
+    started = time.perf_counter()
+    try:
+        # Use the DirectoryScanner from the package
+        # Metrics also provide the entry counts of the merged summary; progress is only printed on request
+        progress_callback = functools.partial(_print_progress, label=label) if args.progress else None
+        metrics = ScanMetrics(progress_callback=progress_callback)
+        scan_filter = None
+        if args.include or args.exclude or args.ignore_file or args.max_depth is not None or args.min_size:
+            scan_filter = ScanFilter(include=args.include, exclude=args.exclude, ignore_files=args.ignore_file,
+                                     max_depth=args.max_depth, min_size=args.min_size)
+        snapshot_path = args.snapshot
+        if snapshot_path and label is not None:
+            # With several roots, --snapshot is a directory holding one snapshot per root
+            snapshot_path = os.path.join(snapshot_path, output_base_name + ".snapshot")
+        checkpoint_path = args.checkpoint
+        if checkpoint_path and label is not None:
+            # Likewise, --checkpoint is a directory holding one checkpoint per root
+            checkpoint_path = os.path.join(checkpoint_path, output_base_name + ".checkpoint")
+        scanner = DirectoryScanner(input_directory_to_scan, workers=args.workers, snapshot_path=snapshot_path,
+                                   metrics=metrics, scan_filter=scan_filter, checkpoint_path=checkpoint_path,
+                                   resume=args.resume, checkpoint_interval=args.checkpoint_interval)
+
+        output_base_path = os.path.join(output_directory_for_results, output_base_name)
+
+        if args.stream:
+            # Streaming mode: flat memory use, entries are written in discovery order
+            exporter = ScanExporter(("jsonl", "csv"), compression=args.compression, parallel=args.parallel_export)
+            with metrics.phase("stream"):
+                exporter.export(scanner.iter_scan(), output_base_path)
+            print(f"\nScan complete. Results streamed to '{output_directory_for_results}'.")
+        else:
+            # The scan_directory method is called lazily by get_collected_data or explicitly.
+            # Let's call it explicitly to make sure data is generated before accessing it.
+            scan_data = scanner.scan_directory_columnar() if args.columnar else scanner.scan_directory()
+
+            if not scan_data:
+                print(f"No items found in directory '{input_directory_to_scan}' or directory is empty.")
+                return result
+
+            os.makedirs(output_directory_for_results, exist_ok=True)
+
+            # All text/pickle formats are written in a single pass over the collected data
+            export_formats = ["json", "csv"] + (["pickle"] if args.pickle else [])
+            exporter = ScanExporter(
+                export_formats,
+                compact_json=args.compact_json,
+                compression=args.compression,
+                parallel=args.parallel_export,
+            )
+            with metrics.phase("export"):
+                exporter.export(scan_data, output_base_path)
+            scanner.save_to_binary_snapshot(output_base_path + ".snap")
+
+            print(f"\nScan complete. Results saved in '{output_directory_for_results}'.")
+
+            if args.summary:
+                result["summary"] = _collect_scan_summary(scanner.build_index())
+                if label is None:
+                    _print_scan_summary(result["summary"])
+
+            if args.duplicates:
+                _save_duplicates_report(scanner.find_duplicates(workers=max(args.workers, 4)),
+                                        output_base_path + "_duplicates.json")
+
+        progress = metrics.progress(done=True)
+        result.update(entries=progress["entries"], files=progress["files"], directories=progress["directories"],
+                      file_bytes=progress["bytes"])
+        if args.timing_report:
+            if label is None:
+                _save_timing_report(metrics, args.timing_report)
+            else:
+                result["timing"] = metrics.report()
+        
+        # Optional: Print some data for quick verification
+        # print("\nSample of Collected Data (first 3 entries):")
+        # for item in scan_data[:3]:
+        #     print(item)
+
+    except ValueError as ve:
+        print(f"Configuration Error: {ve}")
+        result["error"] = str(ve)
+    except ImportError as ie:
+        print(f"Import Error: {ie}. Ensure the file_processing_suite package is correctly placed and discoverable.")
+        print("If running from the project root, try: python Lesson_8/task_1_directory_serializer.py ...")
+        result["error"] = str(ie)
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        result["error"] = str(e)
+    finally:
+        result["seconds"] = time.perf_counter() - started
+    return result
+
+def _scan_roots_in_parallel(input_dirs: List[str], output_directory_for_results: str,
+                            args: argparse.Namespace) -> None:
+    """Scans several directories at once in a process pool, then prints and saves a merged summary."""
+    processes = args.processes or min(len(input_dirs), os.cpu_count() or 1)
+    # Flushed so that forked workers do not inherit (and repeat) buffered output
+    print(f"Scanning {len(input_dirs)} directories in {processes} processes...", flush=True)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [
+            pool.submit(_scan_root, input_dir, output_directory_for_results, base_name, args, base_name)
+            for input_dir, base_name in zip(input_dirs, _get_output_base_names(input_dirs))
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            status = f"failed: {result['error']}" if result["error"] else f"{result['entries']} entries"
+            print(f"Finished '{result['root']}' in {result['seconds']:.1f} s, {status}", flush=True)
+        # Report the roots in command line order
+        results = [future.result() for future in futures]
+
+    merged = {
+        "roots": len(results),
+        "failed_roots": sum(1 for result in results if result["error"]),
+        "entries": sum(result["entries"] for result in results),
+        "files": sum(result["files"] for result in results),
+        "directories": sum(result["directories"] for result in results),
+        "file_bytes": sum(result["file_bytes"] for result in results),
+        "per_root": [{key: value for key, value in result.items() if key not in ("summary", "timing")}
+                     for result in results],
+    }
+    summaries = [(result["root"], result["summary"]) for result in results if result.get("summary")]
+    if summaries:
+        merged["summary"] = _merge_scan_summaries(summaries)
+
+    print(f"\nScanned {merged['roots']} directories ({merged['failed_roots']} failed): {merged['entries']} entries, "
+          f"{merged['files']} files, {merged['file_bytes']} bytes.")
+    if "summary" in merged:
+        _print_scan_summary(merged["summary"])
+
+    os.makedirs(output_directory_for_results, exist_ok=True)
+    merged_summary_path = os.path.join(output_directory_for_results, "merged_summary.json")
+    with open(merged_summary_path, 'w', encoding='utf-8') as f:
+        json.dump(merged, f, indent=4, ensure_ascii=False)
+    print(f"Merged summary saved to '{merged_summary_path}'.")
+
+    if args.timing_report:
+        os.makedirs(os.path.dirname(args.timing_report) or ".", exist_ok=True)
+        with open(args.timing_report, 'w', encoding='utf-8') as f:
+            json.dump({result["root"]: result.get("timing") for result in results}, f, indent=4, ensure_ascii=False)
+        print(f"Timing reports saved to '{args.timing_report}'.")
+
 def main():
     """Main function to handle argument parsing and initiate directory scan using the package."""
     parser = argparse.ArgumentParser(
@@ -79,88 +351,198 @@ def main():
     )
     parser.add_argument(
         "input_dir", 
-        nargs='?', 
+        nargs='*', 
         type=str, 
-        help="The directory to scan. (Required if --test_dummy is not set)"
+        help="The directory (or directories) to scan. (Required if --test_dummy is not set)"
     )
     parser.add_argument(
         "--output_dir", 
         type=str, 
         default="scan_results", 
-        help="The directory where JSON, CSV, and Pickle files will be saved. (Default: scan_results)"
+        help="The directory where JSON, CSV, and binary snapshot files will be saved. (Default: scan_results)"
     )
     parser.add_argument(
         "--test_dummy",
         action="store_true",
         help="If set, creates 'test_scan_dir', scans it, places results in 'test_scan_dir_results', and then cleans up 'test_scan_dir'."
     )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="With several input directories: number of processes scanning them at once. "
+             "(Default: one per directory, up to the number of CPUs)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of threads listing directories in parallel. (Default: 1, serial scan)"
+    )
+    parser.add_argument(
+        "--snapshot",
+        type=str,
+        default=None,
+        help="Path of a scan snapshot file for incremental rescans. Directories unchanged since the snapshot "
+             "was written are not listed again; the snapshot is updated after each complete scan."
+    )
+    parser.add_argument(
+        "--estimate",
+        action="store_true",
+        help="Only estimate the total size and file count of each directory by sampling its subdirectories, "
+             "with confidence intervals, instead of scanning it. Small trees are sized exactly. "
+             "Filters are not applied and no output files are written."
+    )
+    parser.add_argument(
+        "--estimate_seconds",
+        type=float,
+        default=2.0,
+        help="With --estimate: seconds to spend sampling each directory. (Default: 2)"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        help="Path of a checkpoint file that an interrupted scan can be resumed from. The scan's progress is "
+             "saved there at intervals and removed once the scan completes. Requires --workers 1."
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the interrupted scan saved at --checkpoint instead of starting over."
+    )
+    parser.add_argument(
+        "--checkpoint_interval",
+        type=float,
+        default=60.0,
+        help="Seconds between checkpoints. (Default: 60)"
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=None,
+        help="Only report files matching this .gitignore-style pattern (e.g. '*.py'). Can be repeated."
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=None,
+        help="Leave out files and directories matching this .gitignore-style pattern (e.g. 'node_modules/'); "
+             "excluded directories are not listed at all. Can be repeated."
+    )
+    parser.add_argument(
+        "--ignore_file",
+        action="append",
+        default=None,
+        help="A .gitignore-style file of exclude rules (its patterns are relative to the scanned directory). Can be repeated."
+    )
+    parser.add_argument(
+        "--max_depth",
+        type=int,
+        default=None,
+        help="Deepest level to report (1 = only the direct children of the scanned directory); directory sizes still include everything below it."
+    )
+    parser.add_argument(
+        "--min_size",
+        type=int,
+        default=0,
+        help="Leave out files smaller than this many bytes. (Default: 0)"
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Keep the scan results in a compact columnar container instead of a list of dicts (much lower memory use)."
+    )
+    parser.add_argument(
+        "--pickle",
+        action="store_true",
+        help="Also write the results as a Pickle file (the binary snapshot is written either way)."
+    )
+    parser.add_argument(
+        "--compact_json",
+        action="store_true",
+        help="Write JSON without indentation (one entry per line), which is much smaller and faster."
+    )
+    parser.add_argument(
+        "--compression",
+        choices=ScanExporter.COMPRESSIONS,
+        default=None,
+        help="Compress the JSON, CSV and Pickle outputs with gzip or xz."
+    )
+    parser.add_argument(
+        "--parallel_export",
+        action="store_true",
+        help="Serialize and compress each output format on its own thread."
+    )
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="Print the largest directories and files and the extensions taking the most space."
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write entries to JSON Lines and CSV files as they are discovered instead of collecting and sorting them in memory."
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Print the number of entries and bytes scanned and the current rate while the scan runs."
+    )
+    parser.add_argument(
+        "--timing_report",
+        type=str,
+        default=None,
+        help="Write per-phase wall/CPU timings and stat call and error counters to this JSON file."
+    )
+    parser.add_argument(
+        "--duplicates",
+        action="store_true",
+        help="Find files with identical content and save the groups to a '_duplicates.json' file."
+    )
 
     args = parser.parse_args()
 
-    input_directory_to_scan = args.input_dir
+    input_directories_to_scan = args.input_dir
     output_directory_for_results = args.output_dir
     dummy_dir_path_for_cleanup = None
 
+    if args.processes is not None and args.processes < 1:
+        parser.error("--processes must be a positive integer.")
+    if args.estimate_seconds <= 0:
+        parser.error("--estimate_seconds must be positive.")
+    if args.resume and not args.checkpoint:
+        parser.error("--resume requires --checkpoint.")
+
     if args.test_dummy:
         print("Running with test dummy directory...")
         dummy_dir_name = "test_scan_dir"
-        input_directory_to_scan = _create_dummy_dir_for_testing(dummy_dir_name)
-        dummy_dir_path_for_cleanup = input_directory_to_scan
+        input_directories_to_scan = [_create_dummy_dir_for_testing(dummy_dir_name)]
+        dummy_dir_path_for_cleanup = input_directories_to_scan[0]
         output_directory_for_results = os.path.join(os.getcwd(), "test_scan_dir_results")
         print(f"Test scan results will be saved to: {output_directory_for_results}")
-    elif not input_directory_to_scan:
+    elif not input_directories_to_scan:
         parser.error("The following arguments are required: input_dir (unless --test_dummy is used)")
         return # Should exit due to parser.error
 
-    if not os.path.isdir(input_directory_to_scan):
-        print(f"Error: Input directory '{input_directory_to_scan}' not found or is not a directory.")
-        if not args.test_dummy: # If not test_dummy, it's a user error
-             parser.print_help()
-        return
-
-    try:
-        # Use the DirectoryScanner from the package
-        scanner = DirectoryScanner(input_directory_to_scan)
-        
-        # The scan_directory method is called lazily by get_collected_data or explicitly.
-        # Let's call it explicitly to make sure data is generated before accessing it.
-        scan_data = scanner.scan_directory()
-
-        if not scan_data:
-            print(f"No items found in directory '{input_directory_to_scan}' or directory is empty.")
+    for input_directory_to_scan in input_directories_to_scan:
+        if not os.path.isdir(input_directory_to_scan):
+            print(f"Error: Input directory '{input_directory_to_scan}' not found or is not a directory.")
+            if not args.test_dummy: # If not test_dummy, it's a user error
+                 parser.print_help()
             return
 
-        os.makedirs(output_directory_for_results, exist_ok=True)
-
-        scanned_dir_name = os.path.basename(os.path.normpath(input_directory_to_scan))
-        if scanned_dir_name == '.' or not scanned_dir_name: # Handle cases like '.' or './'
-            scanned_dir_name = "current_directory"
-        
-        base_output_filename = f"{scanned_dir_name}_scan"
-
-        json_path = os.path.join(output_directory_for_results, f"{base_output_filename}.json")
-        csv_path = os.path.join(output_directory_for_results, f"{base_output_filename}.csv")
-        pickle_path = os.path.join(output_directory_for_results, f"{base_output_filename}.pkl")
-
-        scanner.save_to_json(json_path) # save_to_json will call get_collected_data if needed
-        scanner.save_to_csv(csv_path)
-        scanner.save_to_pickle(pickle_path)
-
-        print(f"\nScan complete. Results saved in '{output_directory_for_results}'.")
-        
-        # Optional: Print some data for quick verification
-        # print("\nSample of Collected Data (first 3 entries):")
-        # for item in scan_data[:3]:
-        #     print(item)
-
-    except ValueError as ve:
-        print(f"Configuration Error: {ve}")
-    except ImportError as ie:
-        print(f"Import Error: {ie}. Ensure the file_processing_suite package is correctly placed and discoverable.")
-        print("If running from the project root, try: python Lesson_8/task_1_directory_serializer.py ...")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-    
+    try:
+        if args.estimate:
+            for input_directory_to_scan in input_directories_to_scan:
+                estimate = DirectoryScanner(input_directory_to_scan).estimate_size(time_budget=args.estimate_seconds)
+                _print_size_estimate(input_directory_to_scan, estimate)
+        elif len(input_directories_to_scan) == 1:
+            input_directory_to_scan = input_directories_to_scan[0]
+            _scan_root(input_directory_to_scan, output_directory_for_results,
+                       _get_base_output_filename(input_directory_to_scan), args)
+        else:
+            _scan_roots_in_parallel(input_directories_to_scan, output_directory_for_results, args)
     finally:
         if args.test_dummy and dummy_dir_path_for_cleanup:
             # Prompt before cleanup, or make cleanup optional via another flag
@@ -174,5 +556,6 @@ if __name__ == "__main__":
     # python Lesson_8/task_1_directory_serializer.py --test_dummy
     # python Lesson_8/task_1_directory_serializer.py . --output_dir "scan_of_current_dir"
     # python Lesson_8/task_1_directory_serializer.py ../Lesson_7 --output_dir "scan_of_lesson7"
+    # python Lesson_8/task_1_directory_serializer.py /mnt/a /mnt/b /mnt/c --processes 3 --summary --output_dir "scan_of_mounts"
 
     main() 
\ No newline at end of file
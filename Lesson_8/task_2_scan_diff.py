@@ -0,0 +1,110 @@
+"""
+Lesson 8, Task 2: Comparing Two Directory Scans (Example Usage)
+
+This script uses ScanDiffer from the file_processing_suite package to report what changed
+between two saved scans: files and directories added, removed or resized, and the
+per-directory size deltas. Binary snapshots (.snap) are compared with bounded memory.
+"""
+import os
+import sys
+import json
+import heapq
+import argparse
+from typing import List, Tuple
+
+try:
+    from file_processing_suite.scan_diff import ScanDiffer, load_entries_by_path
+except ImportError:
+    # Fallback for running the script directly from outside Lesson_8 (see task_1_directory_serializer.py)
+    print("Attempting import with adjusted path for ScanDiffer...")
+    package_parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    if package_parent_dir not in sys.path:
+        sys.path.insert(0, package_parent_dir)
+    from Lesson_8.file_processing_suite.scan_diff import ScanDiffer, load_entries_by_path
+
+
+def main():
+    """Main function to handle argument parsing and print or save the differences between two scans."""
+    parser = argparse.ArgumentParser(
+        description="Compare two scans saved by task_1_directory_serializer.py (.snap, .json, .jsonl, .csv or .pkl)."
+    )
+    parser.add_argument("old_scan", type=str, help="The earlier scan file.")
+    parser.add_argument("new_scan", type=str, help="The later scan file.")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write the changes to this JSON Lines file instead of printing them."
+    )
+    parser.add_argument(
+        "--directories_only",
+        action="store_true",
+        help="Only report changes of directories (their size deltas include everything below them)."
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of directories with the largest size changes to list in the summary. (Default: 10)"
+    )
+    args = parser.parse_args()
+
+    for scan_path in (args.old_scan, args.new_scan):
+        if not os.path.isfile(scan_path):
+            print(f"Error: Scan file '{scan_path}' not found.")
+            return
+
+    counts = {"added": 0, "removed": 0, "resized": 0}
+    total_delta = 0
+    # Min-heap on |delta| keeps only the `top` largest directory changes in memory
+    largest_directory_deltas: List[Tuple[int, str, int]] = []
+    output_file = None
+
+    try:
+        if args.output:
+            os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+            output_file = open(args.output, 'w', encoding='utf-8')
+
+        changes = ScanDiffer().iter_changes(load_entries_by_path(args.old_scan), load_entries_by_path(args.new_scan))
+        for change in changes:
+            if change["path"] == ".":
+                total_delta = change["size_delta"]
+            if change["type"] == "directory" and args.top > 0:
+                item = (abs(change["size_delta"]), change["path"], change["size_delta"])
+                if len(largest_directory_deltas) < args.top:
+                    heapq.heappush(largest_directory_deltas, item)
+                elif item > largest_directory_deltas[0]:
+                    heapq.heapreplace(largest_directory_deltas, item)
+            if args.directories_only and change["type"] != "directory":
+                continue
+
+            counts[change["change"]] += 1
+            if output_file is not None:
+                output_file.write(json.dumps(change, ensure_ascii=False) + "\n")
+            else:
+                print(f"{change['change']:>8} {change['type']:<9} {change['size_delta']:+14d}  {change['path']}")
+
+    except ValueError as ve:
+        print(f"Error: {ve}")
+        return
+    finally:
+        if output_file is not None:
+            output_file.close()
+
+    print(f"\nAdded: {counts['added']}, removed: {counts['removed']}, resized: {counts['resized']}. "
+          f"Total size change: {total_delta:+d} bytes.")
+    if largest_directory_deltas:
+        print("Largest directory size changes:")
+        for _, path, delta in sorted(largest_directory_deltas, reverse=True):
+            print(f"  {delta:+14d}  {path}")
+    if args.output:
+        print(f"Changes saved to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    # Example, from the Lesson_8 directory:
+    # python task_1_directory_serializer.py ../Lesson_7 --output_dir before
+    # ... modify ../Lesson_7 ...
+    # python task_1_directory_serializer.py ../Lesson_7 --output_dir after
+    # python task_2_scan_diff.py before/Lesson_7_scan.snap after/Lesson_7_scan.snap
+    main()
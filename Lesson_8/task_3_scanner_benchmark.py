@@ -0,0 +1,407 @@
+"""
+Lesson 8, Task 3: DirectoryScanner Benchmark Suite
+
+This script generates reproducible synthetic directory trees (wide, deep and mixed shapes,
+from 10^3 up to 10^6 entries), times DirectoryScanner and each exporter on them and writes
+the results as JSON, so runs can be compared across commits.
+
+Every phase is measured in three separate runs, so the measurements do not disturb
+each other:
+    timing       best wall time of --repeat runs, without any instrumentation
+    memory       peak of Python allocations, traced with tracemalloc
+    call counts  os.scandir / DirEntry.stat / os.stat calls, counted through wrappers
+
+With --estimator_seeds, DirectorySizeEstimator is also run with that many seeds on each
+tree, whose exact size is known, and the report records how often its bounds hold.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+try:
+    from file_processing_suite.directory_scanner import DirectoryScanner
+    from file_processing_suite.scan_exporter import ScanExporter
+    from file_processing_suite.binary_snapshot import BinarySnapshotWriter
+    from file_processing_suite.size_estimator import DirectorySizeEstimator
+except ImportError:
+    # Fallback for running the script directly from outside Lesson_8 (see task_1_directory_serializer.py)
+    print("Attempting import with adjusted path for DirectoryScanner...")
+    package_parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    if package_parent_dir not in sys.path:
+        sys.path.insert(0, package_parent_dir)
+    from Lesson_8.file_processing_suite.directory_scanner import DirectoryScanner
+    from Lesson_8.file_processing_suite.scan_exporter import ScanExporter
+    from Lesson_8.file_processing_suite.binary_snapshot import BinarySnapshotWriter
+    from Lesson_8.file_processing_suite.size_estimator import DirectorySizeEstimator
+
+
+TREE_SHAPES = ("wide", "deep", "mixed")
+_FILE_EXTENSIONS = (".txt", ".log", ".dat", ".json", ".jpg", "")
+
+
+def _create_synthetic_tree(base_path: str, shape: str, entry_count: int, seed: int) -> int:
+    """
+    Creates a reproducible directory tree with about entry_count files and directories.
+    Files are sparse (truncated to a random size), so large trees are cheap on disk.
+
+    Shapes:
+        wide:  two levels, hundreds of files per directory
+        deep:  long chains of nested directories with a few files at every level
+        mixed: a random tree with varying fan-out and depth
+
+    Returns the number of entries created (directories and files, the root excluded).
+    """
+    rng = random.Random(f"{shape}-{entry_count}-{seed}")
+    if os.path.exists(base_path):
+        shutil.rmtree(base_path)
+    os.makedirs(base_path)
+
+    directories = [base_path]
+    created = 0
+    while created < entry_count:
+        if shape == "wide":
+            # ~1 directory per 500 files, all directly under the root
+            make_directory = created % 500 == 0
+            parent = base_path if make_directory else directories[-1]
+        elif shape == "deep":
+            # a new nested directory after every 4 files; restart from the root every 200 levels
+            make_directory = created % 5 == 0
+            if make_directory and len(directories) % 200 == 0:
+                parent = base_path
+            else:
+                parent = directories[-1]
+        else:
+            make_directory = rng.random() < 0.08
+            parent = rng.choice(directories[-50:]) if rng.random() < 0.9 else rng.choice(directories)
+
+        if make_directory:
+            path = os.path.join(parent, f"dir_{created}")
+            os.mkdir(path)
+            directories.append(path)
+        else:
+            path = os.path.join(parent, f"file_{created}{rng.choice(_FILE_EXTENSIONS)}")
+            with open(path, 'wb') as f:
+                f.truncate(rng.randint(0, 64 * 1024))
+        created += 1
+    return created
+
+
+def _ensure_tree(work_dir: str, shape: str, entry_count: int, seed: int) -> str:
+    """Returns the path of a synthetic tree, creating it unless an identical one already exists."""
+    tree_path = os.path.join(work_dir, f"{shape}_{entry_count}_{seed}")
+    parameters = {"shape": shape, "entries": entry_count, "seed": seed}
+    # The marker sits next to the tree, so it is not part of the scanned entries
+    marker_path = tree_path + ".json"
+    try:
+        with open(marker_path, 'r', encoding='utf-8') as f:
+            if json.load(f) == parameters:
+                return tree_path
+    except (OSError, ValueError):
+        pass
+
+    print(f"Generating {shape} tree with {entry_count} entries at {tree_path}...")
+    if os.path.exists(marker_path):
+        os.remove(marker_path)
+    _create_synthetic_tree(tree_path, shape, entry_count, seed)
+    with open(marker_path, 'w', encoding='utf-8') as f:
+        json.dump(parameters, f)
+    return tree_path
+
+
+class _CallCounter:
+    """
+    Counts filesystem calls made through the os module while active: os.scandir and
+    os.stat calls, and stat() calls on the DirEntry objects that os.scandir returns
+    (each is at most one lstat/stat syscall, none when the data is cached).
+    """
+
+    def __init__(self):
+        self.counts = {"scandir": 0, "direntry_stat": 0, "os_stat": 0}
+        self._original_scandir = os.scandir
+        self._original_stat = os.stat
+
+    def __enter__(self) -> "_CallCounter":
+        counts = self.counts
+        original_scandir = self._original_scandir
+        original_stat = self._original_stat
+
+        class CountingDirEntry:
+            __slots__ = ("_entry",)
+
+            def __init__(self, entry):
+                self._entry = entry
+
+            def __getattr__(self, name):
+                return getattr(self._entry, name)
+
+            def __fspath__(self):
+                return self._entry.path
+
+            def stat(self, *, follow_symlinks=True):
+                counts["direntry_stat"] += 1
+                return self._entry.stat(follow_symlinks=follow_symlinks)
+
+        class CountingScandir:
+            def __init__(self, path):
+                counts["scandir"] += 1
+                self._iterator = original_scandir(path)
+
+            def __iter__(self):
+                return self
+
+            def __next__(self):
+                return CountingDirEntry(next(self._iterator))
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                self._iterator.close()
+
+        def counting_stat(*args, **kwargs):
+            counts["os_stat"] += 1
+            return original_stat(*args, **kwargs)
+
+        os.scandir = CountingScandir
+        os.stat = counting_stat
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        os.scandir = self._original_scandir
+        os.stat = self._original_stat
+
+
+def _measure(phase: Callable[[], object], repeat: int) -> Dict[str, object]:
+    """Runs a benchmark phase for timing, then for peak memory, then for call counts."""
+    best_seconds = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        phase()
+        elapsed = time.perf_counter() - started
+        best_seconds = elapsed if best_seconds is None else min(best_seconds, elapsed)
+
+    tracemalloc.start()
+    try:
+        phase()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    with _CallCounter() as counter:
+        phase()
+
+    return {"seconds": best_seconds, "peak_memory_bytes": peak_memory, "calls": counter.counts}
+
+
+def run_benchmarks(
+    work_dir: str, shapes: List[str], sizes: List[int], workers_options: List[int], repeat: int, seed: int
+) -> List[Dict[str, object]]:
+    """Benchmarks scanning and every exporter on each synthetic tree. Returns one result per phase and tree."""
+    results = []
+    output_dir = tempfile.mkdtemp(prefix="scanner_benchmark_output_")
+    try:
+        for shape in shapes:
+            for size in sizes:
+                tree_path = _ensure_tree(work_dir, shape, size, seed)
+                tree_info = {"shape": shape, "requested_entries": size, "seed": seed}
+
+                phases: Dict[str, Callable[[], object]] = {}
+                for workers in workers_options:
+                    phases[f"scan_workers_{workers}"] = (
+                        lambda workers=workers: DirectoryScanner(tree_path, workers=workers).scan_directory()
+                    )
+                scan_data = DirectoryScanner(tree_path).scan_directory()
+                tree_info["entries"] = len(scan_data)
+                output_base = os.path.join(output_dir, f"{shape}_{size}")
+                for fmt in ScanExporter.FORMATS:
+                    phases[f"export_{fmt}"] = (
+                        lambda fmt=fmt: ScanExporter((fmt,)).export(scan_data, output_base)
+                    )
+                phases["export_all_formats"] = lambda: ScanExporter(ScanExporter.FORMATS).export(scan_data, output_base)
+                phases["export_binary_snapshot"] = (
+                    lambda: BinarySnapshotWriter().write(scan_data, output_base + ".snap")
+                )
+
+                for phase_name, phase in phases.items():
+                    print(f"Benchmarking {phase_name} on {shape} tree ({len(scan_data)} entries)...")
+                    # Exporters print a line per file; keep the benchmark output readable
+                    with open(os.devnull, 'w') as devnull:
+                        original_stdout, sys.stdout = sys.stdout, devnull
+                        try:
+                            measurement = _measure(phase, repeat)
+                        finally:
+                            sys.stdout = original_stdout
+                    measurement["entries_per_sec"] = (
+                        len(scan_data) / measurement["seconds"] if measurement["seconds"] else None
+                    )
+                    results.append({"tree": tree_info, "phase": phase_name, **measurement})
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return results
+
+
+def check_size_estimates(
+    work_dir: str, shapes: List[str], sizes: List[int], seed: int, estimator_seeds: int
+) -> List[Dict[str, object]]:
+    """
+    Runs DirectorySizeEstimator with several seeds on each synthetic tree and compares it
+    with the exact size. The exact head is kept small, so the estimates come from sampling.
+
+    A bound "holds" if the exact value is within it; an unbounded interval (high = -1)
+    only claims the low bound. For a 95% interval, bounded_coverage should be close to 0.95.
+    Small trees are often sized exactly (all frontier subtrees sampled); the check is
+    meaningful from about 100000 entries.
+    """
+    results = []
+    for shape in shapes:
+        for size in sizes:
+            tree_path = _ensure_tree(work_dir, shape, size, seed)
+            exact = DirectorySizeEstimator(exact_budget=10 ** 9, time_budget=3600).estimate(tree_path)
+            print(f"Checking size estimates on {shape} tree ({exact['files']} files)...")
+            holds = bounded = bounded_holds = files_hold = exact_results = 0
+            relative_errors = []
+            for estimator_seed in range(estimator_seeds):
+                estimate = DirectorySizeEstimator(
+                    exact_budget=50, max_probes=60, time_budget=60, target_relative_error=0, seed=estimator_seed
+                ).estimate(tree_path)
+                exact_results += estimate["exact"]
+                high = estimate["size_bytes_high"]
+                holds_now = estimate["size_bytes_low"] <= exact["size_bytes"] and (high == -1 or exact["size_bytes"] <= high)
+                holds += holds_now
+                if high != -1:
+                    bounded += 1
+                    bounded_holds += holds_now
+                files_hold += estimate["files_low"] <= exact["files"] and (
+                    estimate["files_high"] == -1 or exact["files"] <= estimate["files_high"]
+                )
+                if exact["size_bytes"]:
+                    relative_errors.append(estimate["size_bytes"] / exact["size_bytes"] - 1)
+            results.append({
+                "tree": {"shape": shape, "requested_entries": size, "seed": seed},
+                "exact_size_bytes": exact["size_bytes"],
+                "exact_files": exact["files"],
+                "estimator_seeds": estimator_seeds,
+                "size_bounds_hold": holds / estimator_seeds,
+                "files_bounds_hold": files_hold / estimator_seeds,
+                "exact": exact_results / estimator_seeds,
+                "bounded": bounded / estimator_seeds,
+                "bounded_coverage": bounded_holds / bounded if bounded else None,
+                "mean_relative_error": sum(relative_errors) / len(relative_errors) if relative_errors else 0.0,
+                "max_abs_relative_error": max((abs(error) for error in relative_errors), default=0.0),
+            })
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    """Returns the current git commit of the repository, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """Main function to handle argument parsing, run the benchmarks and save the report."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark DirectoryScanner and its exporters on synthetic directory trees."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Approximate entry counts of the generated trees. (Default: 1000 10000 100000; add 1000000 for the largest)"
+    )
+    parser.add_argument(
+        "--shapes",
+        nargs="+",
+        choices=TREE_SHAPES,
+        default=list(TREE_SHAPES),
+        help="Tree shapes to generate. (Default: all)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 4],
+        help="Worker thread counts to benchmark scanning with. (Default: 1 4)"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per phase; the best is reported. (Default: 3)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the tree generator. (Default: 42)")
+    parser.add_argument(
+        "--estimator_seeds",
+        type=int,
+        default=0,
+        help="Also check DirectorySizeEstimator with this many seeds per tree against the exact size. (Default: 0, off)"
+    )
+    parser.add_argument(
+        "--work_dir",
+        type=str,
+        default=os.path.join(tempfile.gettempdir(), "scanner_benchmark_trees"),
+        help="Where the synthetic trees are generated and reused between runs."
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="benchmark_results.json",
+        help="The JSON report file. (Default: benchmark_results.json)"
+    )
+    args = parser.parse_args()
+
+    if args.repeat < 1 or any(size < 1 for size in args.sizes) or any(workers < 1 for workers in args.workers):
+        parser.error("--repeat, --sizes and --workers must be positive.")
+    if args.estimator_seeds < 0:
+        parser.error("--estimator_seeds must not be negative.")
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    results = run_benchmarks(args.work_dir, args.shapes, args.sizes, args.workers, args.repeat, args.seed)
+    estimator_checks = (
+        check_size_estimates(args.work_dir, args.shapes, args.sizes, args.seed, args.estimator_seeds)
+        if args.estimator_seeds else []
+    )
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+        "estimator_checks": estimator_checks,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+
+    print(f"\n{'phase':<24} {'shape':<6} {'entries':>9} {'seconds':>9} {'entries/s':>12} {'peak MB':>9}")
+    for result in results:
+        print(f"{result['phase']:<24} {result['tree']['shape']:<6} {result['tree']['entries']:>9} "
+              f"{result['seconds']:>9.3f} {result['entries_per_sec'] or 0:>12.0f} "
+              f"{result['peak_memory_bytes'] / 1e6:>9.1f}")
+    if estimator_checks:
+        print(f"\n{'estimator':<24} {'shape':<6} {'files':>9} {'holds':>9} {'exact':>9} {'bounded':>9} {'coverage':>9} {'mean err':>9}")
+        for check in estimator_checks:
+            coverage = check["bounded_coverage"]
+            print(f"{'size_estimate':<24} {check['tree']['shape']:<6} {check['exact_files']:>9} "
+                  f"{check['size_bounds_hold']:>9.2f} {check['exact']:>9.2f} {check['bounded']:>9.2f} "
+                  f"{'-' if coverage is None else f'{coverage:.2f}':>9} {check['mean_relative_error']:>+9.3f}")
+    print(f"\nBenchmark report saved to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    # Example, from the Lesson_8 directory:
+    # python task_3_scanner_benchmark.py --sizes 1000 10000 --output bench/before.json
+    # python task_3_scanner_benchmark.py --sizes 100000 --repeat 1 --estimator_seeds 20
+    main()
@@ -0,0 +1,149 @@
+"""
+Lesson 8, Task 4: Batch Renaming of Files (Example Usage)
+
+This script uses BatchFileRenamer from the file_processing_suite package to rename the files
+of a directory (or a whole tree) once, or, with --watch, to keep running and rename files as
+they arrive in a drop directory.
+"""
+import os
+import sys
+import argparse
+
+try:
+    from file_processing_suite.file_renamer import BatchFileRenamer
+    from file_processing_suite.rename_template import RenameTemplate
+except ImportError:
+    # Fallback for running the script directly from outside Lesson_8 (see task_1_directory_serializer.py)
+    print("Attempting import with adjusted path for BatchFileRenamer...")
+    package_parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    if package_parent_dir not in sys.path:
+        sys.path.insert(0, package_parent_dir)
+    from Lesson_8.file_processing_suite.file_renamer import BatchFileRenamer
+    from Lesson_8.file_processing_suite.rename_template import RenameTemplate
+
+
+def print_renames(renamed_files_log):
+    for old_path, new_path in renamed_files_log:
+        print(f"  {old_path} -> {new_path}")
+
+
+def main():
+    """Main function to handle argument parsing and rename the files once or in watch mode."""
+    parser = argparse.ArgumentParser(description="Rename files in bulk with BatchFileRenamer.")
+    parser.add_argument("directory", type=str, nargs="?", default=None,
+                        help="The directory whose files are renamed (not needed with --resume/--rollback).")
+    parser.add_argument("--source_extension", type=str, default=None, help="Extension of the files to rename, e.g. .txt.")
+    parser.add_argument("--target_extension", type=str, default=None, help="New extension of the renamed files.")
+    parser.add_argument(
+        "--map",
+        type=str,
+        nargs="+",
+        default=None,
+        metavar="SOURCE=TARGET",
+        help="Several extension mappings applied in one pass, e.g. --map .jpeg=.jpg .txt=.log."
+    )
+    parser.add_argument("--num_digits", type=int, default=3, help="Digits of the counter. (Default: 3)")
+    parser.add_argument("--name", type=str, default=None, help="Fixed part of the new names.")
+    parser.add_argument(
+        "--slice",
+        type=int,
+        nargs=2,
+        default=None,
+        metavar=("START", "END"),
+        help="Keep this slice (1-based, inclusive) of the original names in the new names."
+    )
+    parser.add_argument("--template", type=str, default=None,
+                        help="Naming template instead of --name/--slice, e.g. '{mtime:%%Y-%%m-%%d}_{counter}'.")
+    parser.add_argument("--pattern", type=str, default=None,
+                        help="Regular expression whose groups the template can use; other files are not renamed.")
+    parser.add_argument("--recursive", action="store_true", help="Rename the files of the whole directory tree.")
+    parser.add_argument("--global_counter", action="store_true",
+                        help="With --recursive, number the files of all directories with one counter.")
+    parser.add_argument("--workers", type=int, default=1, help="Threads planning and renaming in parallel. (Default: 1)")
+    parser.add_argument("--target_directory", type=str, default=None,
+                        help="Move the renamed files to this directory (may be on another filesystem).")
+    parser.add_argument("--max_concurrent_copies", type=int, default=4,
+                        help="Maximum number of cross-filesystem copies at once. (Default: 4)")
+    parser.add_argument("--journal", type=str, default=None,
+                        help="Write a journal here, so an interrupted run can be resumed or rolled back.")
+    parser.add_argument("--resume", action="store_true", help="Continue the interrupted run recorded in --journal.")
+    parser.add_argument("--rollback", action="store_true", help="Undo the interrupted run recorded in --journal.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and rename files as they arrive in the directory (stop with Ctrl+C).")
+    parser.add_argument("--poll_interval", type=float, default=1.0,
+                        help="With --watch, seconds between checks of the directory. (Default: 1.0)")
+    parser.add_argument("--settle_time", type=float, default=1.0,
+                        help="With --watch, seconds a new file must be unmodified before it is renamed. (Default: 1.0)")
+    parser.add_argument("--skip_existing", action="store_true",
+                        help="With --watch, leave the files present at start alone.")
+    args = parser.parse_args()
+
+    renamer = BatchFileRenamer(max_concurrent_copies=args.max_concurrent_copies)
+
+    if args.resume or args.rollback:
+        if not args.journal:
+            print("Error: --resume and --rollback need --journal.")
+            return
+        try:
+            if args.rollback:
+                renamed_files_log = renamer.rollback(args.journal)
+                print(f"Rolled back {len(renamed_files_log)} renames.")
+            else:
+                renamed_files_log = renamer.resume(args.journal, workers=args.workers)
+                print(f"Resumed: {len(renamed_files_log)} renames.")
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: {e}")
+            return
+        print_renames(renamed_files_log)
+        return
+
+    if not args.directory:
+        parser.error("the directory is required unless --resume or --rollback is given.")
+    if args.pattern and not args.template:
+        parser.error("--pattern requires --template")
+
+    extension_map = None
+    if args.map:
+        extension_map = {}
+        for mapping in args.map:
+            source, separator, target = mapping.partition("=")
+            if not separator:
+                print(f"Error: Invalid mapping '{mapping}', expected SOURCE=TARGET.")
+                return
+            extension_map[source] = target
+    original_name_slice = tuple(args.slice) if args.slice else None
+
+    try:
+        template = RenameTemplate(args.template, args.pattern, args.num_digits) if args.template else None
+        options = dict(
+            source_extension=args.source_extension, target_extension=args.target_extension,
+            num_digits=args.num_digits, desired_final_name=args.name, original_name_slice=original_name_slice,
+            extension_map=extension_map, template=template, target_directory=args.target_directory,
+        )
+        if args.watch:
+            if args.recursive:
+                print("Note: --recursive is ignored with --watch; only the directory itself is watched.")
+            print(f"Watching {args.directory} (every {args.poll_interval}s, Ctrl+C to stop)...")
+            batches = renamer.watch(args.directory, journal_path=args.journal, poll_interval=args.poll_interval,
+                                    settle_time=args.settle_time, process_existing=not args.skip_existing,
+                                    **options)
+            try:
+                for renamed_files_log in batches:
+                    print(f"Renamed {len(renamed_files_log)} new files:")
+                    print_renames(renamed_files_log)
+            except KeyboardInterrupt:
+                print("Stopped watching.")
+            return
+
+        renamed_files_log = renamer.rename_files(args.directory, journal_path=args.journal,
+                                                 recursive=args.recursive, global_counter=args.global_counter,
+                                                 workers=args.workers, **options)
+    except (FileNotFoundError, ValueError, TypeError) as e:
+        print(f"Error: {e}")
+        return
+    print(f"Renamed {len(renamed_files_log)} files.")
+    print_renames(renamed_files_log)
+
+
+if __name__ == "__main__":
+    main()